@@ -0,0 +1,187 @@
+# benchmark_dinheiro.py
+# Compara valores em float (como era) com centavos inteiros (dinheiro.py):
+#  1. propriedades do Dinheiro com valores aleatórios (soma exata, ida e volta
+#     da formatação, SUM no banco igual à soma exata);
+#  2. tempo e erro de somar 1 milhão de transações: sum() no Python sobre
+#     objetos do ORM contra SUM no SQLite, em float e em centavos.
+#
+# Uso: python benchmark_dinheiro.py --linhas 1000000
+#      python benchmark_dinheiro.py --casos 5000 --linhas 0   # só as propriedades
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine, select, func, Column, Integer, Float, DateTime
+from sqlalchemy.orm import Session, declarative_base
+
+from dinheiro import Dinheiro, ColunaDinheiro, formatar_moeda
+
+Base = declarative_base()
+
+
+class TransacaoFloat(Base):
+    """A tabela como era antes da migração (reais em float)."""
+    __tablename__ = 'transacao_float'
+    id = Column(Integer, primary_key=True)
+    valor = Column(Float)
+    data = Column(DateTime)
+
+
+class TransacaoCentavos(Base):
+    __tablename__ = 'transacao'
+    id = Column(Integer, primary_key=True)
+    valor = Column(ColunaDinheiro)
+    data = Column(DateTime)
+
+
+def centavos_aleatorios(rng):
+    # Mistura valores pequenos (ofertas), médios (dízimos) e grandes (despesas)
+    return rng.choice([rng.randint(1, 5000), rng.randint(5000, 100000), rng.randint(100000, 2000000)])
+
+
+# ================================
+# 1. PROPRIEDADES
+# ================================
+def verificar_propriedades(casos, semente):
+    rng = random.Random(semente)
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    falhas = []
+    deriva_float = 0
+
+    for caso in range(casos):
+        centavos = [centavos_aleatorios(rng) * rng.choice([1, 1, 1, -1]) for _ in range(rng.randint(1, 200))]
+        valores = [Dinheiro(c) for c in centavos]
+        exato = sum(centavos)
+
+        if sum(valores).centavos != exato:
+            falhas.append((caso, 'soma'))
+        if round(sum(c / 100 for c in centavos) * 100) != exato or sum(c / 100 for c in centavos) != exato / 100:
+            deriva_float += 1
+
+        d = valores[0]
+        if Dinheiro.de_reais(formatar_moeda(d, simbolo=False)) != d or Dinheiro.de_reais(str(d)) != d:
+            falhas.append((caso, 'formatação'))
+        if Dinheiro.de_reais(float(d)) != d or Dinheiro.de_reais(d.reais) != d:
+            falhas.append((caso, 'conversão'))
+        if len(valores) > 1 and (valores[0] + valores[1]) - valores[1] != valores[0]:
+            falhas.append((caso, 'subtração'))
+
+        # Gravado e somado no banco (passando pelo ColunaDinheiro) dá o mesmo resultado
+        if caso % 50 == 0:
+            with Session(engine) as s:
+                s.query(TransacaoCentavos).delete()
+                s.add_all(TransacaoCentavos(valor=v, data=datetime.now()) for v in valores)
+                s.flush()
+                total = s.scalar(select(func.coalesce(func.sum(TransacaoCentavos.valor), 0)))
+                if total.centavos != exato:
+                    falhas.append((caso, 'SUM no banco'))
+                s.commit()
+
+    print(f"Propriedades: {casos} casos, {len(falhas)} falhas"
+          f" | float com deriva em {deriva_float} ({deriva_float / casos:.0%}) dos casos")
+    for caso, nome in falhas[:10]:
+        print(f"  falhou '{nome}' no caso {caso}")
+    return not falhas
+
+
+# ================================
+# 2. AGREGAÇÃO COM 1 MILHÃO DE LINHAS
+# ================================
+def preparar_banco(caminho, linhas, anos, semente):
+    rng = random.Random(semente)
+    engine = create_engine(f'sqlite:///{caminho}')
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    inicio = datetime.now() - timedelta(days=365 * anos)
+    minutos = 365 * anos * 24 * 60
+    conn = sqlite3.connect(caminho)
+    exato = 0
+    for lote in range(0, linhas, 100000):
+        dados = []
+        for _ in range(min(100000, linhas - lote)):
+            c = centavos_aleatorios(rng)
+            exato += c
+            dados.append((c, (inicio + timedelta(minutes=rng.randrange(minutos))).isoformat(' ')))
+        conn.executemany("INSERT INTO transacao (valor, data) VALUES (?, ?)", dados)
+        conn.executemany("INSERT INTO transacao_float (valor, data) VALUES (?, ?)",
+                         [(c / 100, d) for c, d in dados])
+    conn.commit()
+    conn.execute("CREATE INDEX ix_transacao_data ON transacao (data)")
+    conn.execute("CREATE INDEX ix_transacao_float_data ON transacao_float (data)")
+    conn.commit()
+    conn.close()
+    return Decimal(exato) / 100
+
+
+def cronometrar(funcao, repeticoes):
+    tempos, resultado = [], None
+    for _ in range(repeticoes):
+        t = time.perf_counter()
+        resultado = funcao()
+        tempos.append((time.perf_counter() - t) * 1000)
+    return min(tempos), resultado
+
+
+def medir_agregacao(caminho, exato_total, repeticoes):
+    engine = create_engine(f'sqlite:///{caminho}')
+    fim = datetime.now()
+    inicio = fim - timedelta(days=30)
+
+    def exato_mes():
+        with engine.connect() as c:
+            return Decimal(c.exec_driver_sql("SELECT SUM(valor) FROM transacao WHERE data >= ? AND data < ?",
+                                             (inicio.isoformat(' '), fim.isoformat(' '))).scalar() or 0) / 100
+
+    metodos = [
+        # (nome, modelo, soma no Python?)
+        ('ORM + sum() em float (antes)', TransacaoFloat, True),
+        ('ORM + sum() em Dinheiro', TransacaoCentavos, True),
+        ('SUM(valor) float no SQL', TransacaoFloat, False),
+        ('SUM(valor) centavos no SQL', TransacaoCentavos, False),
+    ]
+    print(f"{'método':<32} {'mês (ms)':>10} {'tudo (ms)':>10} {'erro no total (R$)':>20}")
+    for nome, modelo, python in metodos:
+        def somar(*filtros):
+            with Session(engine) as s:
+                if python:
+                    return sum(t.valor for t in s.scalars(select(modelo).where(*filtros)))
+                return s.scalar(select(func.coalesce(func.sum(modelo.valor), 0)).where(*filtros))
+
+        ms_mes, _ = cronometrar(lambda: somar(modelo.data >= inicio, modelo.data < fim), repeticoes)
+        # Hidratar 1 milhão de objetos do ORM leva muito tempo e memória: mede uma vez só
+        ms_tudo, total = cronometrar(lambda: somar(), 1 if python else repeticoes)
+        erro = Decimal(str(total)) - exato_total if isinstance(total, float) else total.reais - exato_total
+        print(f"{nome:<32} {ms_mes:>10.1f} {ms_tudo:>10.1f} {erro:>20.6f}")
+    print(f"(total exato: {formatar_moeda(exato_total)}; total do mês: {formatar_moeda(exato_mes())})")
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Float x centavos inteiros: exatidão e tempo de agregação.")
+    parser.add_argument('--casos', type=int, default=2000, help="casos aleatórios das propriedades")
+    parser.add_argument('--linhas', type=int, default=1000000, help="transações no benchmark (0 = pular)")
+    parser.add_argument('--anos', type=int, default=3)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    ok = verificar_propriedades(args.casos, args.semente)
+    if args.linhas:
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, 'dinheiro.db')
+            t = time.perf_counter()
+            exato = preparar_banco(caminho, args.linhas, args.anos, args.semente)
+            print(f"\n{args.linhas} transações geradas em {time.perf_counter() - t:.1f}s")
+            medir_agregacao(caminho, exato, args.repeticoes)
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# benchmark_extrato.py
+# Mede a importação de extrato (extrato.py) com um ano de Pix gerado: parte
+# dos lançamentos já existe em transacao (digitada à mão, às vezes com um dia
+# de diferença) e os pagadores são membros cadastrados, identificados pelo
+# nome ou pelo celular. Importa duas vezes: a segunda deve só pular linhas.
+#
+# Uso: python benchmark_extrato.py --linhas 40000 --membros 2000
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+
+
+def gerar_csv(membros, linhas, ja_lancadas, semente):
+    """(bytes do CSV, transações "digitadas à mão" que devem ser conciliadas)."""
+    rng = random.Random(semente)
+    inicio = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=365)
+    saida = ["Data;Descrição;Valor;Telefone"]
+    digitadas = []
+    for _ in range(linhas):
+        data = inicio + timedelta(days=rng.randrange(365))
+        centavos = rng.randint(500, 200000)
+        membro_id, nome, celular = rng.choice(membros)
+        if rng.random() < 0.1:
+            saida.append(f"{data:%d/%m/%Y};PAGAMENTO BOLETO;-{centavos // 100},{centavos % 100:02d};")
+            continue
+        if rng.random() < ja_lancadas:
+            digitadas.append({'data': data + timedelta(days=rng.choice((0, 0, 1))), 'tipo': 'dizimo', 'categoria': 'culto',
+                              'valor': centavos / 100, 'metodo': 'pix', 'membro_id': membro_id, 'is_fixo': False})
+        # Metade das linhas traz só o nome na descrição; a outra metade, só o celular
+        if rng.random() < 0.5:
+            saida.append(f"{data:%d/%m/%Y};Pix recebido de {nome};{centavos // 100},{centavos % 100:02d};")
+        else:
+            saida.append(f"{data:%d/%m/%Y};PIX RECEBIDO;{centavos // 100},{centavos % 100:02d};{celular or ''}")
+    return "\n".join(saida).encode('utf-8'), digitadas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de importação e conciliação de um extrato.")
+    parser.add_argument('--linhas', type=int, default=40000)
+    parser.add_argument('--membros', type=int, default=2000)
+    parser.add_argument('--ja-lancadas', type=float, default=0.2, help="fração já digitada à mão")
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(pasta, 'extrato.db')}"
+        os.environ.setdefault('SQL_LENTA_MS', '1000000')
+        os.environ.setdefault('REQUISICAO_LENTA_MS', '1000000')
+        sys.path.insert(0, BASE_DIR)
+        from app import app
+        from extensions import db
+        from models import User, Membro, Transacao
+        from extrato import importar_extrato
+        import gerar_dados
+
+        with app.app_context():
+            db.create_all()
+            db.session.add(User(nome='Benchmark', email='benchmark@exemplo.com.br', senha='-', nivel_acesso=1))
+            db.session.commit()
+            gerar_dados.gerar(args.membros, 0, 0, 0, 0, verbose=False)
+            membros = db.session.execute(db.select(Membro.id, Membro.nome, Membro.celular)).all()
+            dados, digitadas = gerar_csv(membros, args.linhas, args.ja_lancadas, args.semente)
+            db.session.execute(Transacao.__table__.insert(), digitadas)
+            db.session.commit()
+            print(f"{args.linhas} linhas ({len(dados) / 1024:.0f} KB), {len(membros)} membros, "
+                  f"{len(digitadas)} transações já digitadas")
+
+            for rodada in ('1ª importação', 'reimportação'):
+                t = time.perf_counter()
+                r = importar_extrato(io.BytesIO(dados), 'extrato.csv')
+                ms = (time.perf_counter() - t) * 1000
+                print(f"{rodada:<15} {ms:>8.0f} ms | lidas {r['lidas']}, conciliadas {r['conciliadas']}, "
+                      f"importadas {r['importadas']}, com membro {r['com_membro']}, repetidas {r['repetidas']}")
+
+
+if __name__ == '__main__':
+    main()
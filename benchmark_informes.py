@@ -0,0 +1,65 @@
+# benchmark_informes.py
+# Mede a geração dos informes anuais de contribuições (informes.py) para todos
+# os membros: consulta agrupada, um PDF por membro no pool de processos e o
+# ZIP final. Precisa do wkhtmltopdf (WKHTMLTOPDF_PATH), como o /exportar/pdf.
+#
+# Uso: python benchmark_informes.py --membros 2000 --processos 1 --processos 4
+import argparse
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from datetime import date
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de geração dos informes anuais de contribuições.")
+    parser.add_argument('--membros', type=int, default=2000)
+    parser.add_argument('--transacoes', type=int, default=60000, help="em dois anos de datas")
+    parser.add_argument('--processos', type=int, action='append',
+                        help="repetir para comparar (padrão: um por núcleo)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(pasta, 'informes.db')}"
+        os.environ['INFORMES_DIR'] = os.path.join(pasta, 'informes')
+        os.environ.setdefault('SQL_LENTA_MS', '1000000')
+        sys.path.insert(0, BASE_DIR)
+        from app import app
+        from extensions import db
+        from models import User, InformeAnual
+        from informes import gerar_informes, totais_do_ano, pasta_informes, INFORMES_PROCESSOS
+        import gerar_dados
+
+        ano = date.today().year - 1
+        with app.app_context():
+            db.create_all()
+            db.session.add(User(nome='Benchmark', email='benchmark@exemplo.com.br', senha='-', nivel_acesso=1))
+            db.session.commit()
+            gerar_dados.gerar(args.membros, args.transacoes, 0, 0, 0, anos=2, verbose=False)
+
+            t = time.perf_counter()
+            membros = sum(1 for _ in totais_do_ano(ano))
+            print(f"{ano}: {membros} membros com contribuição (consulta agrupada em "
+                  f"{(time.perf_counter() - t) * 1000:.0f} ms)")
+
+            for processos in args.processos or [INFORMES_PROCESSOS]:
+                informe = InformeAnual(ano=ano)
+                db.session.add(informe)
+                db.session.commit()
+                informe = gerar_informes(informe.id, processos=processos)
+                if informe.status != 'pronto':
+                    raise SystemExit(f"Falha na geração: {informe.erro}")
+                caminho = os.path.join(pasta_informes(), informe.arquivo)
+                with zipfile.ZipFile(caminho) as zip_:
+                    arquivos = len(zip_.namelist())
+                s = informe.duracao_ms / 1000
+                print(f"{processos:>2} processo(s): {arquivos} PDFs em {s:6.1f}s "
+                      f"({arquivos / s:.0f} PDFs/s, ZIP de {os.path.getsize(caminho) / 1024 / 1024:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
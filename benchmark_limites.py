@@ -0,0 +1,148 @@
+# benchmark_limites.py
+# Teste de carga dos limites das rotas públicas (limites.py): visitantes
+# disparam perguntas ao /assistente/pergunta, com o Gemini trocado por uma
+# espera fixa, enquanto um admin navega no /secretaria. O gunicorn roda como no
+# Procfile (gthread), uma vez sem limites e outra com os limites padrão, e a
+# latência do admin é comparada.
+#
+# Uso: python benchmark_limites.py --visitantes 32 --segundos 15 --atraso 2
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from http.cookiejar import CookieJar
+from threading import Event, Lock, Thread
+from types import SimpleNamespace
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, Request, build_opener, urlopen
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+SEM_LIMITES = {'ASSISTENTE_LIMITE_IP': '1000000/1', 'ASSISTENTE_LIMITE_TOTAL': '1000000/1', 'IA_MAX_EM_VOO': '1000'}
+
+
+def servidor(porta, threads):
+    """Sobe o app no gunicorn com o Gemini trocado por uma espera (roda no subprocesso)."""
+    sys.path.insert(0, BASE_DIR)
+    from gunicorn.app.base import BaseApplication
+    from app import app, create_initial_data
+    from extensions import db
+    import rotas.ia
+
+    class GeminiLento:
+        def generate_content(self, prompt, stream=False):
+            time.sleep(float(os.environ['ATRASO_GEMINI']))
+            return SimpleNamespace(text="Resposta de teste.")
+
+    rotas.ia.obter_modelo = GeminiLento
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.app_context():
+        db.create_all()
+    create_initial_data()
+
+    class Servidor(BaseApplication):
+        def load_config(self):
+            for nome, valor in {'bind': f'127.0.0.1:{porta}', 'workers': 1, 'worker_class': 'gthread',
+                                'threads': threads, 'timeout': 120}.items():
+                self.cfg.set(nome, valor)
+
+        def load(self):
+            return app
+
+    Servidor().run()
+
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def esperar(url, limite=60):
+    fim = time.monotonic() + limite
+    while time.monotonic() < fim:
+        try:
+            urlopen(url, timeout=5).read()
+            return
+        except (URLError, ConnectionError):
+            time.sleep(0.2)
+    raise SystemExit("O servidor não subiu.")
+
+def cenario(nome, ambiente, args):
+    porta = porta_livre()
+    base = f'http://127.0.0.1:{porta}'
+    with tempfile.TemporaryDirectory() as pasta:
+        env = {**os.environ, **ambiente, 'ATRASO_GEMINI': str(args.atraso), 'SQL_LENTA_MS': '1000000',
+               'DATABASE_URL': f"sqlite:///{os.path.join(pasta, 'limites.db')}"}
+        proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--servidor', str(porta),
+                                 '--threads', str(args.threads)],
+                                env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            esperar(f'{base}/login')
+            admin = build_opener(HTTPCookieProcessor(CookieJar()))
+            admin.open(f'{base}/login', urlencode({'email': 'combave@gmail.com', 'senha': 'combave2025'}).encode())
+
+            parar, lock, codigos = Event(), Lock(), Counter()
+            def visitante():
+                corpo = json.dumps({'pergunta': 'Qual o horário do culto?'}).encode()
+                while not parar.is_set():
+                    req = Request(f'{base}/assistente/pergunta', corpo, {'Content-Type': 'application/json'})
+                    try:
+                        codigo = urlopen(req, timeout=120).status
+                    except HTTPError as e:
+                        codigo = e.code
+                    except (URLError, OSError):
+                        codigo = 'erro'
+                    if parar.is_set():  # interrompida pelo fim do teste
+                        break
+                    with lock:
+                        codigos[codigo] += 1
+
+            visitantes = [Thread(target=visitante, daemon=True) for _ in range(args.visitantes)]
+            for v in visitantes:
+                v.start()
+            time.sleep(1)  # deixa os visitantes ocuparem as threads
+            tempos = []
+            fim = time.monotonic() + args.segundos
+            while time.monotonic() < fim:
+                t = time.perf_counter()
+                resp = admin.open(f'{base}/secretaria', timeout=120)
+                resp.read()
+                if '/login' in resp.url:
+                    raise SystemExit("O login do admin falhou.")
+                tempos.append((time.perf_counter() - t) * 1000)
+                time.sleep(0.2)
+            parar.set()
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    tempos.sort()
+    p95 = tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))]
+    respostas = ', '.join(f"{n} x {c}" for c, n in sorted(codigos.items(), key=str))
+    print(f"{nome:<12} admin: {len(tempos):>3} páginas, mediana {statistics.median(tempos):7.0f} ms, "
+          f"p95 {p95:7.0f} ms, pior {tempos[-1]:7.0f} ms | visitantes: {respostas}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência do admin com as rotas públicas sob carga.")
+    parser.add_argument('--visitantes', type=int, default=32, help="clientes simultâneos no assistente")
+    parser.add_argument('--segundos', type=int, default=15)
+    parser.add_argument('--atraso', type=float, default=2.0, help="segundos de cada chamada ao Gemini (simulado)")
+    parser.add_argument('--threads', type=int, default=8, help="threads do worker, como no Procfile")
+    parser.add_argument('--servidor', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.servidor:
+        return servidor(args.servidor, args.threads)
+
+    print(f"{args.visitantes} visitantes, Gemini de {args.atraso:g}s, 1 worker gthread com {args.threads} threads")
+    cenario('sem limites', SEM_LIMITES, args)
+    cenario('com limites', {}, args)
+
+
+if __name__ == '__main__':
+    main()
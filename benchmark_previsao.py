@@ -0,0 +1,62 @@
+# benchmark_previsao.py
+# Mede a previsão/anomalias (previsao_financeira.py): a primeira chamada, que lê
+# o histórico inteiro, e as seguintes, que só somam as transações novas.
+#
+# Uso: python benchmark_previsao.py --transacoes 300000 --novas 50
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Previsão com histórico incremental x histórico lido do zero.")
+    parser.add_argument('--transacoes', type=int, default=300000)
+    parser.add_argument('--membros', type=int, default=3000)
+    parser.add_argument('--novas', type=int, default=50, help="transações gravadas entre as chamadas")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(pasta, 'previsao.db')}"
+        os.environ.setdefault('SQL_LENTA_MS', '1000000')
+        sys.path.insert(0, BASE_DIR)
+        from app import app
+        from extensions import db
+        from models import User, inserir_transacoes
+        from dinheiro import Dinheiro
+        from previsao_financeira import analisar
+        import gerar_dados
+
+        with app.app_context():
+            db.create_all()
+            db.session.add(User(nome='Benchmark', email='benchmark@exemplo.com.br', senha='-', nivel_acesso=1))
+            db.session.commit()
+            gerar_dados.gerar(args.membros, args.transacoes, 0, 0, 0, anos=5, verbose=False)
+
+            def medir():
+                t = time.perf_counter()
+                resultado = analisar(datetime.now())
+                return (time.perf_counter() - t) * 1000, resultado
+
+            ms, r = medir()
+            print(f"primeira chamada: {r['atualizacao']['transacoes']} transações lidas em {ms:.0f} ms "
+                  f"({len(r['anomalias'])} anomalias)")
+            for _ in range(args.repeticoes):
+                inserir_transacoes([{'tipo': 'oferta', 'categoria': 'Culto', 'metodo': 'dinheiro', 'data': datetime.now(),
+                                     'valor': Dinheiro(random.randint(100, 50000))} for _ in range(args.novas)])
+                db.session.commit()
+                ms, r = medir()
+                a = r['atualizacao']
+                print(f"+{a['novas']} novas: {ms:6.1f} ms ({'do zero' if a['completa'] else 'incremental'})")
+            ms, r = medir()
+            print(f"sem novas:  {ms:6.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
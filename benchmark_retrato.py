@@ -0,0 +1,88 @@
+# benchmark_retrato.py
+# Compara os pivôs dos relatórios lidos do retrato colunar (retrato_financeiro.py)
+# com o GROUP BY equivalente no banco, sobre transações geradas.
+#
+# Uso: python benchmark_retrato.py --transacoes 500000 --membros 3000
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+
+
+def medir(funcao, repeticoes):
+    funcao()  # aquece cache/mmap
+    t = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - t) / repeticoes * 1e6  # µs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pivôs do retrato colunar x GROUP BY no banco.")
+    parser.add_argument('--transacoes', type=int, default=500000)
+    parser.add_argument('--membros', type=int, default=3000)
+    parser.add_argument('--repeticoes', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(pasta, 'retrato.db')}"
+        os.environ['RETRATO_DIR'] = os.path.join(pasta, 'retrato')
+        os.environ.setdefault('SQL_LENTA_MS', '1000000')
+        sys.path.insert(0, BASE_DIR)
+        from app import app
+        from extensions import db
+        from sqlalchemy import String, cast, func, select
+        from models import User, Transacao, TIPOS_ENTRADA
+        from retrato_financeiro import gerar_retrato, retrato
+        from utils import intervalo_periodo
+        import gerar_dados
+
+        ano = date.today().year - 1
+        with app.app_context():
+            db.create_all()
+            db.session.add(User(nome='Benchmark', email='benchmark@exemplo.com.br', senha='-', nivel_acesso=1))
+            db.session.commit()
+            gerar_dados.gerar(args.membros, args.transacoes, 0, 0, 0, anos=5, verbose=False)
+
+            meta = gerar_retrato()
+            tamanho = sum(os.path.getsize(os.path.join(raiz, a))
+                          for raiz, _, arquivos in os.walk(os.environ['RETRATO_DIR']) for a in arquivos)
+            print(f"retrato: {meta['linhas']} linhas em {meta['duracao_ms']} ms, {tamanho / 1024 / 1024:.1f} MB")
+
+            r = retrato()
+            inicio, fim = intervalo_periodo(ano=ano)
+            anos = list(range(ano - 4, ano + 1))
+            mes = func.substr(cast(Transacao.data, String), 1, 7)
+            ano_sql = func.substr(cast(Transacao.data, String), 1, 4)
+            no_ano = (Transacao.data >= inicio, Transacao.data < fim)
+            entradas = Transacao.tipo.in_(TIPOS_ENTRADA)
+            consultas = {
+                'mês x categoria': (
+                    lambda: r.pivo_mes_categoria(ano, TIPOS_ENTRADA),
+                    lambda: db.session.execute(select(mes, Transacao.categoria, func.sum(Transacao.valor))
+                                               .where(*no_ano, entradas).group_by(mes, Transacao.categoria)).all()),
+                'membro x ano': (
+                    lambda: r.pivo_membro_ano(anos, limite=50),
+                    lambda: db.session.execute(select(Transacao.membro_id, ano_sql, func.sum(Transacao.valor))
+                                               .where(entradas, Transacao.membro_id.isnot(None),
+                                                      Transacao.data >= intervalo_periodo(ano=anos[0])[0],
+                                                      Transacao.data < fim)
+                                               .group_by(Transacao.membro_id, ano_sql)).all()),
+                'métodos': (
+                    lambda: r.participacao_metodos(inicio, fim),
+                    lambda: db.session.execute(select(Transacao.metodo, func.sum(Transacao.valor))
+                                               .where(*no_ano, entradas).group_by(Transacao.metodo)).all()),
+            }
+            print(f"{'pivô':<16} {'retrato':>12} {'banco':>12}")
+            for nome, (colunar, sql) in consultas.items():
+                us_colunar = medir(colunar, args.repeticoes)
+                us_sql = medir(sql, max(1, args.repeticoes // 10))
+                print(f"{nome:<16} {us_colunar:>9.0f} µs {us_sql / 1000:>9.1f} ms  ({us_sql / us_colunar:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
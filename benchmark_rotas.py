@@ -0,0 +1,184 @@
+# benchmark_rotas.py
+# Mede as rotas mais pesadas do painel com o test client do Flask, num banco
+# SQLite temporário populado pelo gerar_dados.py, e guarda o histórico para
+# detectar regressões entre versões.
+#
+# Uso: python benchmark_rotas.py --transacoes 100000 --repeticoes 20
+#      python benchmark_rotas.py --rotas financeiro,membros   # só algumas rotas
+# Sai com código 1 se alguma rota ficou mais lenta (ou fez mais consultas SQL)
+# que a última execução na mesma escala.
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+
+ROTAS = {
+    'financeiro': '/financeiro',
+    'financeiro_transacoes': '/financeiro/transacoes',
+    'membros': '/membros',
+    'exportar_excel': '/exportar/excel',
+    'exportar_pdf': '/exportar/pdf',
+    'secretaria': '/secretaria',
+    'mensagens_enviadas': '/secretaria/mensagens_enviadas',
+}
+ADMIN_EMAIL = 'benchmark@exemplo.com.br'
+ADMIN_SENHA = 'benchmark'
+
+
+def stub_servicos_externos():
+    """Nada sai da máquina: Gemini, wkhtmltopdf e e-mail viram stubs."""
+    import google.generativeai as genai
+    import pdfkit
+
+    class ModeloFalso:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def generate_content(self, prompt, stream=False):
+            raise RuntimeError("Gemini desativado no benchmark")
+
+    genai.GenerativeModel = ModeloFalso
+    genai.list_models = lambda: []
+    # Mede só o que é nosso (consulta + template); a conversão do wkhtmltopdf fica de fora
+    pdfkit.configuration = lambda **kwargs: None
+    pdfkit.from_string = lambda html, saida, **kwargs: html.encode()
+
+
+def preparar_app(args):
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(args.pasta, 'benchmark.db')}"
+    # Não polui a saída com os logs de SQL/requisição lenta do desempenho.py
+    os.environ.setdefault('SQL_LENTA_MS', '1000000')
+    os.environ.setdefault('REQUISICAO_LENTA_MS', '1000000')
+    stub_servicos_externos()
+    sys.path.insert(0, BASE_DIR)
+
+    from werkzeug.security import generate_password_hash
+    from app import app
+    from extensions import db
+    from models import User
+    import gerar_dados
+
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False, MAIL_SUPPRESS_SEND=True)
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(nome='Benchmark', email=ADMIN_EMAIL, senha=generate_password_hash(ADMIN_SENHA),
+                            nivel_acesso=1, is_secretaria=True, is_admin=True))
+        db.session.commit()
+        t = time.perf_counter()
+        gerar_dados.gerar(args.membros, args.transacoes, args.eventos, args.compromissos,
+                          args.mensagens, verbose=False)
+        print(f"Banco populado em {time.perf_counter() - t:.1f}s")
+    return app
+
+
+def medir_rota(cliente, url, repeticoes):
+    import desempenho
+
+    cliente.get(url).close()  # aquecimento (templates, caches do SQLite)
+    desempenho.limpar_amostras()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resp = cliente.get(url)
+        resp.get_data()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        resp.close()
+        if resp.status_code != 200:
+            raise SystemExit(f"{url} respondeu {resp.status_code}")
+    tempos.sort()
+    amostras = desempenho.resumo_por_endpoint()
+    return {
+        'p50_ms': round(statistics.median(tempos), 2),
+        'p95_ms': round(desempenho.percentil(tempos, 95), 2),
+        'min_ms': round(tempos[0], 2),
+        'sql': amostras[0]['sql_p50'] if amostras else 0,
+    }
+
+
+def commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ultima_execucao(caminho, escala):
+    if not os.path.exists(caminho):
+        return None
+    anterior = None
+    with open(caminho, encoding='utf-8') as f:
+        for linha in f:
+            registro = json.loads(linha)
+            if registro['escala'] == escala:
+                anterior = registro
+    return anterior
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das rotas pesadas do painel.")
+    parser.add_argument('--membros', type=int, default=500)
+    parser.add_argument('--transacoes', type=int, default=10000)
+    parser.add_argument('--eventos', type=int, default=50)
+    parser.add_argument('--compromissos', type=int, default=500)
+    parser.add_argument('--mensagens', type=int, default=2000)
+    parser.add_argument('--repeticoes', type=int, default=10)
+    parser.add_argument('--rotas', default=','.join(ROTAS), help="nomes separados por vírgula")
+    parser.add_argument('--historico', default=os.path.join(BASE_DIR, 'benchmark_rotas.jsonl'))
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help="piora aceitável no p50 antes de acusar regressão (0.2 = 20%%)")
+    parser.add_argument('--nao-salvar', action='store_true', help="não grava no histórico")
+    args = parser.parse_args()
+
+    escala = {k: getattr(args, k) for k in ('membros', 'transacoes', 'eventos', 'compromissos', 'mensagens')}
+    with tempfile.TemporaryDirectory() as pasta:
+        args.pasta = pasta
+        app = preparar_app(args)
+        cliente = app.test_client()
+        resp = cliente.post('/login', data={'email': ADMIN_EMAIL, 'senha': ADMIN_SENHA})
+        if resp.status_code != 302:
+            raise SystemExit("Falha no login do benchmark")
+
+        resultados = {}
+        for nome in args.rotas.split(','):
+            resultados[nome] = medir_rota(cliente, ROTAS[nome], args.repeticoes)
+        with app.app_context():
+            from extensions import db
+            db.engine.dispose()  # libera o arquivo antes de apagar a pasta (Windows)
+
+    anterior = ultima_execucao(args.historico, escala)
+    print(f"\n{args.transacoes} transações, {args.membros} membros, {args.repeticoes} repetições"
+          + (f" | comparando com {anterior['commit'] or '?'} de {anterior['data']}" if anterior else ""))
+    print(f"{'rota':<20} {'p50 (ms)':>10} {'p95 (ms)':>10} {'SQL':>6} {'anterior':>10} {'variação':>9}")
+    regressoes = []
+    for nome, r in resultados.items():
+        antes = (anterior or {}).get('rotas', {}).get(nome)
+        variacao = ''
+        if antes:
+            delta = r['p50_ms'] / antes['p50_ms'] - 1 if antes['p50_ms'] else 0
+            variacao = f"{delta:+.0%}"
+            if delta > args.tolerancia or r['sql'] > antes['sql']:
+                regressoes.append(nome)
+                variacao += ' ⚠'
+        p50_antes = f"{antes['p50_ms']:.1f}" if antes else '-'
+        print(f"{nome:<20} {r['p50_ms']:>10.1f} {r['p95_ms']:>10.1f} {r['sql']:>6} {p50_antes:>10} {variacao:>9}")
+
+    if not args.nao_salvar:
+        with open(args.historico, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'data': datetime.now().isoformat(timespec='seconds'), 'commit': commit_atual(),
+                                'escala': escala, 'rotas': resultados}, ensure_ascii=False) + '\n')
+
+    if regressoes:
+        print(f"\nRegressão em: {', '.join(regressoes)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
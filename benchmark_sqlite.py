@@ -0,0 +1,106 @@
+# benchmark_sqlite.py
+# Mede a contenção do SQLite com vários processos (como os workers do gunicorn)
+# lendo e gravando ao mesmo tempo, com e sem o perfil de PRAGMAs do config.py.
+#
+# Uso: python benchmark_sqlite.py --processos 8 --segundos 10
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+from multiprocessing import Pool
+
+import config
+
+TIPOS = ['dizimo', 'oferta', 'doacao', 'despesa']
+
+
+def conectar(caminho, otimizado):
+    if otimizado:
+        conn = sqlite3.connect(caminho, timeout=config.SQLITE_PRAGMAS['busy_timeout'] / 1000)
+        config.aplicar_pragmas_sqlite(conn)
+    else:
+        # Igual ao app antes do perfil: sem PRAGMAs, timeout padrão do driver
+        conn = sqlite3.connect(caminho)
+    return conn
+
+
+def preparar_banco(caminho, linhas):
+    conn = sqlite3.connect(caminho)
+    conn.execute("""
+        CREATE TABLE transacao (
+            id INTEGER PRIMARY KEY, tipo VARCHAR(50), categoria VARCHAR(100), valor FLOAT,
+            metodo VARCHAR(20), data DATETIME, membro_id INTEGER, is_fixo BOOLEAN
+        )""")
+    inicio = datetime.now() - timedelta(days=365)
+    conn.executemany(
+        "INSERT INTO transacao (tipo, categoria, valor, metodo, data, membro_id, is_fixo) VALUES (?, ?, ?, ?, ?, ?, 0)",
+        [(random.choice(TIPOS), 'culto', round(random.uniform(10, 500), 2), 'pix',
+          (inicio + timedelta(minutes=random.randint(0, 525600))).isoformat(' '), random.randint(1, 500))
+         for _ in range(linhas)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def trabalhador(args):
+    caminho, otimizado, segundos, proporcao_escrita, semente = args
+    random.seed(semente)
+    conn = conectar(caminho, otimizado)
+    leituras = escritas = travamentos = 0
+    fim = time.monotonic() + segundos
+    while time.monotonic() < fim:
+        try:
+            if random.random() < proporcao_escrita:
+                conn.execute(
+                    "INSERT INTO transacao (tipo, categoria, valor, metodo, data, membro_id, is_fixo) VALUES (?, 'culto', ?, 'pix', ?, ?, 0)",
+                    (random.choice(TIPOS), 50.0, datetime.now().isoformat(' '), random.randint(1, 500))
+                )
+                conn.commit()
+                escritas += 1
+            else:
+                mes = datetime.now() - timedelta(days=random.randint(0, 330))
+                conn.execute(
+                    "SELECT tipo, SUM(valor) FROM transacao WHERE data >= ? AND data < ? GROUP BY tipo",
+                    (mes.isoformat(' '), (mes + timedelta(days=30)).isoformat(' '))
+                ).fetchall()
+                leituras += 1
+        except sqlite3.OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            travamentos += 1
+            conn.rollback()
+    conn.close()
+    return leituras, escritas, travamentos
+
+
+def rodar(perfil, otimizado, processos, segundos, proporcao_escrita, linhas):
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'bench.db')
+        preparar_banco(caminho, linhas)
+        with Pool(processos) as pool:
+            resultados = pool.map(trabalhador, [
+                (caminho, otimizado, segundos, proporcao_escrita, i) for i in range(processos)
+            ])
+    leituras, escritas, travamentos = (sum(r[i] for r in resultados) for i in range(3))
+    print(f"{perfil:<10} {leituras / segundos:>12.0f} {escritas / segundos:>12.0f} {travamentos:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de contenção do SQLite (vários processos).")
+    parser.add_argument('--processos', type=int, default=os.cpu_count() or 4)
+    parser.add_argument('--segundos', type=float, default=10)
+    parser.add_argument('--escrita', type=float, default=0.2, help="proporção de operações de escrita")
+    parser.add_argument('--linhas', type=int, default=50000, help="transações iniciais no banco")
+    args = parser.parse_args()
+
+    print(f"{args.processos} processos, {args.segundos:.0f}s, {args.escrita:.0%} escritas, {args.linhas} linhas")
+    print(f"{'perfil':<10} {'leituras/s':>12} {'escritas/s':>12} {'locked':>12}")
+    rodar('padrão', False, args.processos, args.segundos, args.escrita, args.linhas)
+    rodar('otimizado', True, args.processos, args.segundos, args.escrita, args.linhas)
+
+
+if __name__ == '__main__':
+    main()
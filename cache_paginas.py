@@ -0,0 +1,112 @@
+import os
+import time
+import shutil
+import hashlib
+import tempfile
+from functools import wraps
+from threading import Lock
+from flask import request, session, make_response
+from flask_login import current_user
+
+# ================================
+# CACHE DAS PÁGINAS PÚBLICAS
+# ================================
+# HTML pronto de /, /eventos e /ministerios para visitantes anônimos. A versão
+# fica num arquivo compartilhado pelos workers e muda a cada gravação de eventos
+# ou ministérios (invalidar_paginas_publicas); cada worker descarta o que tem
+# em memória quando a versão muda. As páginas também são gravadas em disco
+# (PASTA_CACHE/<versão>/), então só o primeiro worker consulta o banco.
+PASTA_CACHE = os.getenv("CACHE_PAGINAS_DIR", os.path.join(tempfile.gettempdir(), 'combave-paginas'))
+GRAVAR_DISCO = os.getenv("CACHE_PAGINAS_DISCO", "1") == "1"
+_ARQUIVO_VERSAO = os.path.join(PASTA_CACHE, 'versao')
+
+_paginas = {}                    # {(versão, caminho): (etag, html)}
+_versao_lida = (None, '0')       # ((inode, mtime) do arquivo, versão)
+_lock = Lock()
+
+
+def versao_atual():
+    global _versao_lida
+    try:
+        st = os.stat(_ARQUIVO_VERSAO)
+    except FileNotFoundError:
+        return '0'
+    assinatura = (st.st_ino, st.st_mtime_ns)
+    if assinatura != _versao_lida[0]:
+        with open(_ARQUIVO_VERSAO, encoding='utf-8') as f:
+            _versao_lida = (assinatura, f.read().strip() or '0')
+    return _versao_lida[1]
+
+def invalidar_paginas_publicas():
+    """Chamar depois de gravar eventos ou ministérios."""
+    os.makedirs(PASTA_CACHE, exist_ok=True)
+    nova = str(time.time_ns())
+    temporario = f"{_ARQUIVO_VERSAO}.{os.getpid()}"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        f.write(nova)
+    os.replace(temporario, _ARQUIVO_VERSAO)
+    with _lock:
+        _paginas.clear()
+    # Versões antigas pré-renderizadas não servem mais
+    for nome in os.listdir(PASTA_CACHE):
+        if nome != nova and os.path.isdir(os.path.join(PASTA_CACHE, nome)):
+            shutil.rmtree(os.path.join(PASTA_CACHE, nome), ignore_errors=True)
+    return nova
+
+def _arquivo_disco(versao, caminho):
+    return os.path.join(PASTA_CACHE, versao, (caminho.strip('/') or 'index') + '.html')
+
+def _pagina(html):
+    corpo = html.encode('utf-8') if isinstance(html, str) else html
+    return hashlib.sha1(corpo).hexdigest(), corpo
+
+def _ler_disco(versao, caminho):
+    try:
+        with open(_arquivo_disco(versao, caminho), 'rb') as f:
+            return _pagina(f.read())
+    except FileNotFoundError:
+        return None
+
+def _gravar_disco(versao, caminho, corpo):
+    arquivo = _arquivo_disco(versao, caminho)
+    os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+    temporario = f"{arquivo}.{os.getpid()}"
+    with open(temporario, 'wb') as f:
+        f.write(corpo)
+    os.replace(temporario, arquivo)
+
+
+def cache_publico(f):
+    """Serve a página do cache para visitantes anônimos, com ETag/304."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        # Logado, com mensagem flash pendente ou com filtros: renderiza normalmente
+        if request.method != 'GET' or request.args or current_user.is_authenticated or session.get('_flashes'):
+            return f(*args, **kwargs)
+
+        versao = versao_atual()
+        chave = (versao, request.path)
+        with _lock:
+            pagina = _paginas.get(chave)
+        if pagina is None:
+            pagina = _ler_disco(versao, request.path)
+            if pagina is None:
+                html = f(*args, **kwargs)
+                if not isinstance(html, str):
+                    return html
+                pagina = _pagina(html)
+                if GRAVAR_DISCO:
+                    _gravar_disco(versao, request.path, pagina[1])
+            with _lock:
+                if any(v != versao for v, _ in _paginas):
+                    _paginas.clear()
+                _paginas[chave] = pagina
+
+        etag, corpo = pagina
+        resp = make_response(corpo)
+        resp.set_etag(etag)
+        # O navegador sempre revalida (304 se nada mudou); proxies não misturam com a versão logada
+        resp.headers['Cache-Control'] = 'public, no-cache'
+        resp.vary.add('Cookie')
+        return resp.make_conditional(request)
+    return decorated
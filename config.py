@@ -1,10 +1,64 @@
 import os
-import config
+import secrets
 from dotenv import load_dotenv
 
 load_dotenv()
 
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+
+# Perfil de desempenho do SQLite, aplicado em cada conexão nova.
+# WAL permite leituras simultâneas às escritas; busy_timeout faz o
+# escritor esperar o lock em vez de falhar com "database is locked".
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 15000)),     # ms
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64000)),        # negativo = KiB (64 MB)
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'temp_store': os.environ.get('SQLITE_TEMP_STORE', 'MEMORY'),
+}
+
+def aplicar_pragmas_sqlite(dbapi_connection, pragmas=None):
+    cursor = dbapi_connection.cursor()
+    for nome, valor in (SQLITE_PRAGMAS if pragmas is None else pragmas).items():
+        cursor.execute(f"PRAGMA {nome}={valor}")
+    cursor.close()
+
+def url_banco():
+    url = os.environ.get('DATABASE_URL') or f"sqlite:///{os.path.join(BASE_DIR, 'app.db')}"
+    # Heroku e similares ainda fornecem o esquema antigo "postgres://"
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+def opcoes_engine(url):
+    if url.startswith('sqlite'):
+        # timeout do driver (segundos) igual ao busy_timeout dos PRAGMAs
+        return {'connect_args': {'timeout': SQLITE_PRAGMAS['busy_timeout'] / 1000}}
+    # PostgreSQL: QueuePool dimensionado por worker do gunicorn
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': True,
+    }
+
+# Segredos só vêm do ambiente (ou do .env, fora do git). Em produção o
+# gunicorn.conf.py se recusa a subir sem eles; no desenvolvimento, sem
+# SECRET_KEY, cada processo sorteia a sua (os logins caem a cada reinício)
+
 class Config:
-    SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key'
-    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///app.db'
+    SECRET_KEY = os.environ.get('SECRET_KEY') or secrets.token_hex(32)
+    SQLALCHEMY_DATABASE_URI = url_banco()
+    SQLALCHEMY_ENGINE_OPTIONS = opcoes_engine(SQLALCHEMY_DATABASE_URI)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLITE_PRAGMAS = SQLITE_PRAGMAS
+
+    # E-mail (Flask-Mail)
+    MAIL_SERVER = 'smtp.gmail.com'
+    MAIL_PORT = 587
+    MAIL_USE_TLS = True
+    MAIL_USERNAME = os.environ.get('MAIL_USERNAME') or 'combavecarapebus@gmail.com'
+    MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
+    MAIL_DEFAULT_SENDER = MAIL_USERNAME
@@ -0,0 +1,133 @@
+import os
+import math
+import time
+import logging
+from collections import defaultdict, deque
+from datetime import datetime
+from threading import Lock
+from flask import g, request, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from metricas import registrar_consulta
+
+logger = logging.getLogger('combave.desempenho')
+
+# ================================
+# INSTRUMENTAÇÃO POR REQUISIÇÃO
+# ================================
+# Amostras em memória (por worker do gunicorn): tempo total da requisição,
+# quantidade de consultas SQL e tempo gasto no banco, por endpoint. O mesmo
+# listener de consultas alimenta o histograma do Prometheus (metricas.py), para
+# cada consulta ser cronometrada uma vez só.
+SQL_LENTA_MS = float(os.getenv("SQL_LENTA_MS", 100))
+REQUISICAO_LENTA_MS = float(os.getenv("REQUISICAO_LENTA_MS", 1000))
+AMOSTRAS_POR_ROTA = int(os.getenv("PERF_AMOSTRAS_POR_ROTA", 500))
+
+_amostras = defaultdict(lambda: deque(maxlen=AMOSTRAS_POR_ROTA))
+_consultas_lentas = deque(maxlen=50)
+_lock = Lock()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _inicio_consulta(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('inicio_consulta', []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _fim_consulta(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get('inicio_consulta')
+    if not inicios:  # descartado pelo _consulta_com_erro
+        return
+    segundos = time.perf_counter() - inicios.pop()
+    registrar_consulta(segundos)
+    duracao = segundos * 1000
+
+    # Só conta nas requisições; CLI e threads de fundo não têm g.perf
+    perf = g.get('perf') if has_app_context() else None
+    if perf is not None:
+        perf['sql'] += 1
+        perf['sql_ms'] += duracao
+
+    if duracao >= SQL_LENTA_MS:
+        endpoint = perf['endpoint'] if perf else None
+        parametros = repr(parameters)[:500]
+        logger.warning("SQL lenta (%.1f ms) em %s: %s | parâmetros: %s",
+                       duracao, endpoint or '-', ' '.join(statement.split()), parametros)
+        with _lock:
+            _consultas_lentas.append({
+                'quando': datetime.now(), 'endpoint': endpoint, 'ms': duracao,
+                'sql': statement, 'parametros': parametros,
+            })
+
+@event.listens_for(Engine, "handle_error")
+def _consulta_com_erro(contexto):
+    # A consulta que falhou não chega ao after_cursor_execute: sem isto a pilha de
+    # inícios cresceria a cada erro (e a conexão volta ao pool com ela)
+    if contexto.connection is not None:
+        contexto.connection.info.pop('inicio_consulta', None)
+
+def _iniciar_requisicao():
+    g.perf = {'inicio': time.perf_counter(), 'endpoint': request.endpoint, 'sql': 0, 'sql_ms': 0.0}
+
+def _finalizar_requisicao(response):
+    perf = g.pop('perf', None)
+    if perf is None or request.endpoint in (None, 'static'):
+        return response
+    # Em respostas em stream (SSE) mede só até o início do envio
+    total_ms = (time.perf_counter() - perf['inicio']) * 1000
+    with _lock:
+        _amostras[request.endpoint].append((total_ms, perf['sql'], perf['sql_ms']))
+
+    # Aparece na aba "Timing" do DevTools do navegador
+    response.headers['Server-Timing'] = (
+        f'app;dur={total_ms:.1f}, db;dur={perf["sql_ms"]:.1f};desc="{perf["sql"]} consultas"'
+    )
+    if total_ms >= REQUISICAO_LENTA_MS:
+        logger.warning("Requisição lenta: %s %s (%s) %.0f ms, %d consultas SQL em %.0f ms",
+                       request.method, request.path, request.endpoint,
+                       total_ms, perf['sql'], perf['sql_ms'])
+    return response
+
+def init_app(app):
+    app.before_request(_iniciar_requisicao)
+    app.after_request(_finalizar_requisicao)
+
+
+# ================================
+# RELATÓRIO (/secretaria/perf)
+# ================================
+def percentil(valores, p):
+    """Percentil pelo método do posto mais próximo (valores já ordenados)."""
+    if not valores:
+        return 0
+    return valores[max(0, math.ceil(p / 100 * len(valores)) - 1)]
+
+def resumo_por_endpoint():
+    with _lock:
+        copia = {endpoint: list(amostras) for endpoint, amostras in _amostras.items()}
+
+    linhas = []
+    for endpoint, amostras in copia.items():
+        tempos = sorted(a[0] for a in amostras)
+        consultas = sorted(a[1] for a in amostras)
+        tempos_sql = sorted(a[2] for a in amostras)
+        linhas.append({
+            'endpoint': endpoint,
+            'requisicoes': len(amostras),
+            'p50_ms': percentil(tempos, 50),
+            'p95_ms': percentil(tempos, 95),
+            'sql_p50': percentil(consultas, 50),
+            'sql_p95': percentil(consultas, 95),
+            'sql_max': consultas[-1],
+            'sql_ms_p50': percentil(tempos_sql, 50),
+            'sql_ms_p95': percentil(tempos_sql, 95),
+        })
+    return sorted(linhas, key=lambda linha: linha['p95_ms'], reverse=True)
+
+def consultas_lentas():
+    with _lock:
+        return list(reversed(_consultas_lentas))
+
+def limpar_amostras():
+    with _lock:
+        _amostras.clear()
+        _consultas_lentas.clear()
@@ -0,0 +1,148 @@
+from decimal import Decimal, ROUND_HALF_UP
+from functools import total_ordering
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+
+# ================================
+# DINHEIRO (centavos inteiros)
+# ================================
+# Os valores são gravados no banco como centavos inteiros: somas no SQL são
+# exatas e não há deriva de ponto flutuante no saldo. No Python cada valor é
+# um Dinheiro, que soma, subtrai e compara como número e formata como R$.
+CENTAVO = Decimal('0.01')
+
+
+def _para_decimal(valor):
+    if isinstance(valor, str):
+        texto = valor.strip().replace('R$', '').replace(' ', '')
+        # "1.234,56" (formato brasileiro) -> "1234.56"
+        if ',' in texto:
+            texto = texto.replace('.', '').replace(',', '.')
+        return Decimal(texto)
+    if isinstance(valor, float):
+        # str() evita levar para o Decimal o erro binário do float (0.1 -> 0.1000000000000000055...)
+        return Decimal(str(valor))
+    return Decimal(valor)
+
+
+@total_ordering
+class Dinheiro:
+    __slots__ = ('centavos',)
+
+    def __init__(self, centavos=0):
+        self.centavos = int(centavos)
+
+    @classmethod
+    def de_reais(cls, valor):
+        """Aceita Dinheiro, Decimal, int, float ou texto ("12.34", "1.234,56", "R$ 10")."""
+        if isinstance(valor, Dinheiro):
+            return valor
+        return cls(int(_para_decimal(valor).quantize(CENTAVO, rounding=ROUND_HALF_UP) * 100))
+
+    @property
+    def reais(self):
+        return Decimal(self.centavos) / 100
+
+    # --- aritmética ---
+    def __add__(self, outro):
+        if isinstance(outro, Dinheiro):
+            return Dinheiro(self.centavos + outro.centavos)
+        if outro == 0:  # sum() começa do 0
+            return self
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, outro):
+        if isinstance(outro, Dinheiro):
+            return Dinheiro(self.centavos - outro.centavos)
+        if outro == 0:
+            return self
+        return NotImplemented
+
+    def __rsub__(self, outro):
+        if outro == 0:
+            return -self
+        return NotImplemented
+
+    def __mul__(self, fator):
+        if isinstance(fator, Dinheiro):
+            return NotImplemented
+        return Dinheiro.de_reais(self.reais * _para_decimal(fator))
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Dinheiro(-self.centavos)
+
+    def __abs__(self):
+        return Dinheiro(abs(self.centavos))
+
+    # --- comparação ---
+    def __eq__(self, outro):
+        if isinstance(outro, Dinheiro):
+            return self.centavos == outro.centavos
+        if isinstance(outro, (int, float, Decimal)):
+            return self.reais == _para_decimal(outro)
+        return NotImplemented
+
+    def __lt__(self, outro):
+        if isinstance(outro, Dinheiro):
+            return self.centavos < outro.centavos
+        if isinstance(outro, (int, float, Decimal)):
+            return self.reais < _para_decimal(outro)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.reais)
+
+    def __bool__(self):
+        return self.centavos != 0
+
+    # --- conversão ---
+    def __float__(self):
+        return self.centavos / 100
+
+    def __str__(self):
+        return str(self.reais.quantize(CENTAVO))
+
+    def __repr__(self):
+        return f"Dinheiro('{self}')"
+
+    def __format__(self, spec):
+        return format(self.reais.quantize(CENTAVO), spec)
+
+
+def formatar_moeda(valor, simbolo=True):
+    """R$ 1.234,56 (substitui o "%.2f"|format nos templates)."""
+    if valor is None:
+        valor = Dinheiro()
+    d = Dinheiro.de_reais(valor)
+    texto = f"{abs(d.reais):,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
+    sinal = '-' if d.centavos < 0 else ''
+    return f"{sinal}R$ {texto}" if simbolo else f"{sinal}{texto}"
+
+
+class ColunaDinheiro(TypeDecorator):
+    """Coluna BIGINT em centavos; no Python sempre Dinheiro.
+
+    Números comuns (float, Decimal, int, texto) são interpretados como reais,
+    então `Transacao.valor > 100` e `Transacao(valor=form.valor.data)` continuam
+    funcionando. SUM/CASE sobre a coluna herdam o tipo e também voltam Dinheiro.
+    """
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, valor, dialect):
+        if valor is None:
+            return None
+        return Dinheiro.de_reais(valor).centavos
+
+    def process_result_value(self, valor, dialect):
+        if valor is None:
+            return None
+        return Dinheiro(valor)
+
+
+def init_app(app):
+    app.add_template_filter(formatar_moeda, 'moeda')
@@ -0,0 +1,31 @@
+import sqlite3
+import config
+from flask_sqlalchemy import SQLAlchemy
+from flask_migrate import Migrate
+from flask_login import LoginManager
+from flask_mail import Mail
+from sqlalchemy import event
+
+# ================================
+# EXTENSÕES (inicializadas em create_app)
+# ================================
+db = SQLAlchemy()
+migrate = Migrate()
+mail = Mail()
+login_manager = LoginManager()
+login_manager.login_view = "publico.login"
+login_manager.login_message = "Faça login para acessar esta página."
+login_manager.login_message_category = "info"
+
+def configurar_sqlite(app):
+    """SQLite: aplica o perfil de desempenho (WAL, busy_timeout, cache...) do
+    app.config['SQLITE_PRAGMAS'] em cada conexão do engine do app. Chamar depois
+    de db.init_app(app)."""
+    pragmas = app.config.get('SQLITE_PRAGMAS', config.SQLITE_PRAGMAS)
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, "connect")
+    def configurar_conexao_sqlite(dbapi_connection, connection_record):
+        if isinstance(dbapi_connection, sqlite3.Connection):
+            config.aplicar_pragmas_sqlite(dbapi_connection, pragmas)
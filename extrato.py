@@ -0,0 +1,340 @@
+import csv
+import hashlib
+import re
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import chain, islice
+from sqlalchemy import bindparam, select, update
+from extensions import db
+from dinheiro import Dinheiro
+from models import Membro, Transacao, LancamentoExtrato, TIPOS_ENTRADA, inserir_transacoes
+from opcoes import normalizar
+from painel import invalidar_painel
+from resumo_financeiro import invalidar_grafico
+
+# ================================
+# IMPORTAÇÃO DE EXTRATO BANCÁRIO (OFX/CSV)
+# ================================
+# O arquivo é lido em fluxo, linha a linha, e cada lançamento vai para a tabela
+# de conciliação lancamento_extrato. Depois o lote é conciliado:
+#   1. com uma Transacao já digitada (mesmo valor, na data ou um dia antes/depois);
+#   2. com um membro, pelo CPF, telefone ou nome do pagador;
+# e o que não casou com nenhuma transação é inserido de uma vez em transacao.
+# Cada busca é um dicionário montado com uma consulta só, então o custo cresce
+# com o número de linhas do extrato, não com linhas x transações x membros.
+# CPF e telefone entram só como hash (chave_documento/chave_telefone).
+TAMANHO_LOTE = 2000
+CATEGORIA_EXTRATO = 'Extrato bancário'
+METODO_EXTRATO = 'transferencia'
+
+# Nomes de coluna aceitos no CSV (já sem acento e em minúsculas)
+COLUNAS_CSV = {
+    'data': ('data', 'data lancamento', 'data do lancamento', 'data movimento', 'data da transacao', 'date'),
+    'valor': ('valor', 'valor (r$)', 'valor r$', 'quantia', 'amount'),
+    'credito': ('credito', 'credito (r$)', 'entrada', 'entradas'),
+    'debito': ('debito', 'debito (r$)', 'saida', 'saidas'),
+    'descricao': ('descricao', 'historico', 'lancamento', 'detalhes', 'descricao do lancamento', 'memo'),
+    'nome': ('nome', 'pagador', 'nome do pagador', 'nome pagador', 'origem', 'remetente', 'favorecido'),
+    'documento': ('cpf', 'cpf/cnpj', 'cpf do pagador', 'documento'),
+    'telefone': ('telefone', 'celular'),
+    'identificador': ('id', 'identificador', 'id da transacao', 'id transacao', 'fitid', 'e2e'),
+}
+FORMATOS_DATA = ('%d/%m/%Y', '%Y-%m-%d', '%d/%m/%y', '%d-%m-%Y')
+
+# Palavras do início da descrição que não fazem parte do nome ("Pix recebido de ...")
+PALAVRAS_DESCRICAO = {
+    'pix', 'ted', 'doc', 'transferencia', 'transf', 'recebido', 'recebida', 'recebimento', 'enviado',
+    'enviada', 'pelo', 'pela', 'de', 'do', 'da', 'para', 'rem', 'remetente', 'credito', 'debito', 'cred',
+    'deb', 'em', 'conta', 'pagamento', 'qr', 'code',
+}
+# CPF inteiro ou mascarado no padrão do Pix (***.123.456-**)
+_CPF = re.compile(r'(?:\d{3}|[*•x]{3})\.?(\d{3})\.?(\d{3})-?(?:\d{2}|[*•x]{2})', re.IGNORECASE)
+_TAG_OFX = re.compile(r'<(\w+)>([^<\r\n]*)')
+_DIGITO = re.compile(r'\d')
+
+
+def _hash(tipo, texto):
+    return hashlib.blake2b(f"{tipo}:{texto}".encode(), digest_size=16).hexdigest()
+
+def _digitos(texto):
+    return re.sub(r'\D', '', texto or '')
+
+def chave_nome(nome):
+    nome = ' '.join(normalizar(nome).split())
+    return _hash('nome', nome) if nome else None
+
+def chave_documento(texto):
+    # Só os 6 dígitos do meio, os únicos que o extrato do Pix mostra
+    digitos = _digitos(texto)
+    if len(digitos) == 11:
+        return _hash('cpf', digitos[3:9])
+    achado = _CPF.search(texto or '')
+    return _hash('cpf', achado.group(1) + achado.group(2)) if achado else None
+
+def chave_telefone(texto):
+    # Últimos 8 dígitos: casa com e sem DDD, +55 ou o nono dígito
+    digitos = _digitos(texto)
+    return _hash('tel', digitos[-8:]) if len(digitos) >= 8 else None
+
+def nome_na_descricao(descricao):
+    """Nome do pagador em descrições como "PIX RECEBIDO - FULANO" ou "Pix recebido de Fulano"."""
+    for parte in re.split(r'\s+-\s+|:', descricao or ''):
+        if _DIGITO.search(parte):
+            continue
+        palavras = parte.split()
+        while palavras and normalizar(palavras[0]) in PALAVRAS_DESCRICAO:
+            palavras.pop(0)
+        if palavras:
+            return ' '.join(palavras)[:100]
+    return None
+
+
+# ================================
+# LEITURA DO ARQUIVO (em fluxo)
+# ================================
+def _linhas_texto(arquivo):
+    for bruto in arquivo:
+        try:
+            linha = bruto.decode('utf-8')
+        except UnicodeDecodeError:
+            linha = bruto.decode('cp1252', errors='replace')  # exportações de banco em Windows-1252
+        yield linha.lstrip('\ufeff')
+
+def _valor(texto):
+    texto = (texto or '').strip().upper()
+    if not texto:
+        return None
+    # "50,00 D", "50,00-" e "(50,00)" são débitos
+    debito = texto.endswith(('D', '-')) or (texto.startswith('(') and texto.endswith(')'))
+    valor = Dinheiro.de_reais(texto.rstrip('CD-').strip('() '))
+    return -valor if debito else valor
+
+@lru_cache(maxsize=1024)  # um extrato de um ano tem no máximo 366 datas distintas
+def _data(texto):
+    texto = (texto or '').strip().split(' ')[0]
+    for formato in FORMATOS_DATA:
+        try:
+            return datetime.strptime(texto, formato)
+        except ValueError:
+            pass
+    return None
+
+def _lancamento(data, valor, descricao, nome=None, documento=None, telefone=None, identificador=None):
+    if data is None or not valor:
+        return None
+    descricao = ' '.join((descricao or '').split())[:200]
+    nome = (nome or '').strip()[:100] or nome_na_descricao(descricao)
+    return {
+        'data': data,
+        'valor': valor,
+        'descricao': descricao,
+        'nome_pagador': nome,
+        'chave_documento': chave_documento(documento) or chave_documento(descricao),
+        'chave_telefone': chave_telefone(telefone),
+        'identificador': identificador,
+    }
+
+def ler_ofx(linhas):
+    """Lançamentos (<STMTTRN>) de um OFX, SGML ou XML, com ou sem quebras de linha."""
+    buffer = ''
+    for linha in linhas:
+        buffer += linha
+        while '</STMTTRN>' in buffer:
+            bloco, buffer = buffer.split('</STMTTRN>', 1)
+            campos = {tag.upper(): valor.strip() for tag, valor in _TAG_OFX.findall(bloco.rpartition('<STMTTRN>')[2])}
+            try:
+                data = datetime.strptime(campos.get('DTPOSTED', '')[:8], '%Y%m%d')
+                valor = Dinheiro.de_reais(campos.get('TRNAMT', ''))
+            except (ValueError, ArithmeticError):
+                yield None
+                continue
+            yield _lancamento(data, valor, campos.get('MEMO') or campos.get('NAME'), nome=campos.get('NAME'),
+                              identificador=campos.get('FITID'))
+        if '<STMTTRN>' not in buffer:
+            buffer = ''
+
+def _coluna(nome):
+    return ' '.join(normalizar(nome).split())
+
+def ler_csv(linhas):
+    """Lançamentos de um CSV de banco (separador ; , ou tab); pula o preâmbulo até o cabeçalho."""
+    linhas = iter(linhas)
+    for cabecalho in islice(linhas, 30):
+        separador = max(';,\t', key=cabecalho.count)
+        nomes = [_coluna(c) for c in next(csv.reader([cabecalho], delimiter=separador), [])]
+        mapa = {campo: next((i for i, n in enumerate(nomes) if n in aceitos), None)
+                for campo, aceitos in COLUNAS_CSV.items()}
+        if mapa['data'] is not None and (mapa['valor'] is not None or mapa['credito'] is not None):
+            break
+    else:
+        raise ValueError("Cabeçalho do CSV não reconhecido (é preciso ter as colunas de data e valor).")
+
+    def campo(linha, nome):
+        i = mapa[nome]
+        return linha[i] if i is not None and i < len(linha) else ''
+
+    for linha in csv.reader(linhas, delimiter=separador):
+        if not any(linha) or normalizar(campo(linha, 'descricao')).startswith('saldo'):
+            continue
+        try:
+            if mapa['valor'] is not None:
+                valor = _valor(campo(linha, 'valor'))
+            else:
+                valor = (_valor(campo(linha, 'credito')) or Dinheiro()) - abs(_valor(campo(linha, 'debito')) or Dinheiro())
+        except (ValueError, ArithmeticError):
+            yield None
+            continue
+        yield _lancamento(_data(campo(linha, 'data')), valor, campo(linha, 'descricao'),
+                          nome=campo(linha, 'nome'), documento=campo(linha, 'documento'),
+                          telefone=campo(linha, 'telefone'), identificador=campo(linha, 'identificador'))
+
+def ler_extrato(arquivo, nome_arquivo=''):
+    """Gera os lançamentos do arquivo (None para linha ilegível), escolhendo OFX ou CSV."""
+    linhas = _linhas_texto(arquivo)
+    primeira = next(linhas, '')
+    linhas = chain([primeira], linhas)
+    if nome_arquivo.lower().endswith(('.ofx', '.qfx')) or 'OFX' in primeira.upper():
+        return ler_ofx(linhas)
+    return ler_csv(linhas)
+
+
+# ================================
+# ÁREA DE CONCILIAÇÃO
+# ================================
+def _gravar_lote(lote, lancamentos):
+    """Grava os lançamentos em lancamento_extrato; os já importados antes (mesma chave) são pulados."""
+    ocorrencias = defaultdict(int)
+    lidas = repetidas = ilegiveis = 0
+    while True:
+        pedaco = list(islice(lancamentos, TAMANHO_LOTE))
+        if not pedaco:
+            break
+        linhas = {}
+        for lancamento in pedaco:
+            if lancamento is None:
+                ilegiveis += 1
+                continue
+            lidas += 1
+            identificador = lancamento.pop('identificador')
+            if identificador:
+                chave = _hash('id', identificador)
+            else:
+                # Duas linhas iguais no mesmo extrato (dois Pix de R$ 10 no mesmo dia) são lançamentos distintos
+                base = (lancamento['data'].date(), lancamento['valor'].centavos, normalizar(lancamento['descricao']))
+                ocorrencias[base] += 1
+                chave = _hash('linha', (*base, ocorrencias[base]))
+            linhas[chave] = {**lancamento, 'chave': chave, 'lote': lote, 'status': 'pendente'}
+        existentes = set(db.session.scalars(select(LancamentoExtrato.chave).where(LancamentoExtrato.chave.in_(list(linhas)))))
+        novas = [linha for chave, linha in linhas.items() if chave not in existentes]
+        repetidas += len(linhas) - len(novas)
+        if novas:
+            db.session.execute(LancamentoExtrato.__table__.insert(), novas)
+    return lidas, repetidas, ilegiveis
+
+def _indice_transacoes(inicio, fim):
+    """{(dia, centavos com sinal): [(id, membro_id)]} das transações do período ainda não conciliadas."""
+    ja_conciliadas = select(LancamentoExtrato.transacao_id).where(LancamentoExtrato.transacao_id.isnot(None))
+    indice = defaultdict(list)
+    for id, data, valor, tipo, membro_id in db.session.execute(
+        select(Transacao.id, Transacao.data, Transacao.valor, Transacao.tipo, Transacao.membro_id)
+        .where(Transacao.data >= inicio, Transacao.data < fim, Transacao.id.notin_(ja_conciliadas))
+        .order_by(Transacao.data, Transacao.id)
+    ):
+        if valor is None:
+            continue
+        centavos = valor.centavos if tipo in TIPOS_ENTRADA else -valor.centavos
+        indice[(data.date(), centavos)].append((id, membro_id))
+    return indice
+
+def _indice_membros():
+    """{chave em hash: membro_id}; chave que aponta para dois membros fica None (ambígua)."""
+    indice = {}
+
+    def incluir(chave, membro_id):
+        if chave:
+            indice[chave] = membro_id if indice.get(chave, membro_id) == membro_id else None
+
+    for id, nome, telefone, celular in db.session.execute(select(Membro.id, Membro.nome, Membro.telefone, Membro.celular)):
+        incluir(chave_nome(nome), id)
+        incluir(chave_telefone(telefone), id)
+        incluir(chave_telefone(celular), id)
+    # O cadastro não tem CPF: vale o membro das linhas já conciliadas com o mesmo CPF
+    for chave, membro_id in db.session.execute(
+        select(LancamentoExtrato.chave_documento, LancamentoExtrato.membro_id).distinct()
+        .where(LancamentoExtrato.chave_documento.isnot(None), LancamentoExtrato.membro_id.isnot(None))
+    ):
+        incluir(chave, membro_id)
+    return indice
+
+def conciliar_lote(lote):
+    """Concilia as linhas pendentes do lote e insere as que não existem em transacao. Retorna as contagens."""
+    pendentes = db.session.execute(
+        select(LancamentoExtrato.id, LancamentoExtrato.data, LancamentoExtrato.valor, LancamentoExtrato.descricao,
+               LancamentoExtrato.nome_pagador, LancamentoExtrato.chave_documento, LancamentoExtrato.chave_telefone)
+        .where(LancamentoExtrato.lote == lote, LancamentoExtrato.status == 'pendente')
+        .order_by(LancamentoExtrato.data, LancamentoExtrato.id)
+    ).all()
+    if not pendentes:
+        return {'conciliadas': 0, 'importadas': 0, 'com_membro': 0}
+
+    transacoes = _indice_transacoes(pendentes[0].data.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1),
+                                    pendentes[-1].data + timedelta(days=2))
+    membros = _indice_membros()
+    atualizacoes, novas, novas_ids = [], [], []
+    for linha in pendentes:
+        membro_id = next((membros[c] for c in (linha.chave_documento, linha.chave_telefone, chave_nome(linha.nome_pagador))
+                          if c and membros.get(c)), None)
+        dia = linha.data.date()
+        candidatos = next((transacoes[k] for k in ((dia, linha.valor.centavos),
+                                                   (dia - timedelta(days=1), linha.valor.centavos),
+                                                   (dia + timedelta(days=1), linha.valor.centavos))
+                           if transacoes.get(k)), None)
+        if candidatos:
+            transacao_id, membro_transacao = candidatos.pop(0)
+            atualizacoes.append({'linha_id': linha.id, 'status': 'conciliado', 'transacao_id': transacao_id,
+                                 'membro_id': membro_transacao or membro_id})
+            continue
+        credito = linha.valor.centavos > 0
+        novas.append({
+            'data': linha.data,
+            'tipo': ('dizimo' if membro_id else 'oferta') if credito else 'despesa',
+            'categoria': (linha.descricao or CATEGORIA_EXTRATO)[:100],
+            'valor': abs(linha.valor),
+            'metodo': 'pix' if 'pix' in normalizar(linha.descricao) else METODO_EXTRATO,
+            'membro_id': membro_id,
+            'is_fixo': False,
+        })
+        novas_ids.append((linha.id, membro_id))
+
+    if novas:
+        ids = inserir_transacoes(novas)
+        atualizacoes.extend({'linha_id': linha_id, 'status': 'importado', 'transacao_id': transacao_id, 'membro_id': membro_id}
+                            for (linha_id, membro_id), transacao_id in zip(novas_ids, ids))
+    tabela = LancamentoExtrato.__table__
+    db.session.execute(
+        update(tabela).where(tabela.c.id == bindparam('linha_id'))
+        .values(status=bindparam('status'), transacao_id=bindparam('transacao_id'), membro_id=bindparam('membro_id')),
+        atualizacoes
+    )
+    return {
+        'conciliadas': len(pendentes) - len(novas),
+        'importadas': len(novas),
+        'com_membro': sum(1 for a in atualizacoes if a['membro_id']),
+    }
+
+def importar_extrato(arquivo, nome_arquivo=''):
+    """Lê o arquivo, grava a área de conciliação e concilia tudo numa transação só."""
+    lote = uuid.uuid4().hex
+    try:
+        lidas, repetidas, ilegiveis = _gravar_lote(lote, ler_extrato(arquivo, nome_arquivo))
+        resultado = conciliar_lote(lote)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    # Os caches que dependem de transações não viram este insert em lote
+    invalidar_grafico()
+    invalidar_painel()
+    return {'lote': lote, 'lidas': lidas, 'repetidas': repetidas, 'ilegiveis': ilegiveis, **resultado}
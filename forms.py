@@ -0,0 +1,116 @@
+from datetime import datetime
+from flask_wtf import FlaskForm
+from flask_wtf.file import FileField, FileAllowed
+from wtforms import (
+    StringField, PasswordField, SubmitField, DecimalField, SelectField,
+    TextAreaField, DateField, BooleanField, IntegerField
+)
+from wtforms.validators import DataRequired, Email, Optional
+from opcoes import opcoes_ministerios, preparar_select_membro
+
+
+# ================================
+# FORMULÁRIOS
+# ================================
+class LoginForm(FlaskForm):
+    email = StringField("Email", validators=[DataRequired(), Email()], render_kw={"autocomplete": "username"})
+    senha = PasswordField("Senha", validators=[DataRequired()], render_kw={"autocomplete": "current-password"})
+    submit = SubmitField("Entrar")
+
+class UsuarioForm(FlaskForm):
+    membro_id = SelectField("Vincular a Membro (opcional)", coerce=int, validators=[Optional()])
+    nome = StringField("Nome", validators=[DataRequired()])
+    email = StringField("Email", validators=[DataRequired(), Email()])
+    senha = PasswordField("Senha", validators=[DataRequired()])
+    nivel_acesso = SelectField("Nível de Acesso", choices=[
+        (1, "Admin (acesso total)"),
+        (2, "Secretária (membros + eventos)"),
+        (3, "Secretária (membros)"),
+        (4, "Financeiro (apenas financeiro)"),
+        (5, "Visualizador (apenas relatórios)")
+    ], coerce=int, validators=[DataRequired()])
+    submit = SubmitField("Criar Usuário")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        preparar_select_membro(self.membro_id)
+
+class MembroForm(FlaskForm):
+    nome = StringField("Nome Completo", validators=[DataRequired()])
+    email = StringField("E-mail", validators=[Email(), Optional()])
+    telefone = StringField("Telefone Fixo")
+    celular = StringField("Celular (WhatsApp)", validators=[DataRequired()])
+    cep = StringField("CEP")
+    endereco = StringField("Endereço")
+    bairro = StringField("Bairro")
+    cidade = StringField("Cidade")
+    estado = StringField("Estado")
+    data_nascimento = DateField("Data de Nascimento", format="%Y-%m-%d")
+    estado_civil = SelectField("Estado Civil", choices=[
+        ('', '--'), ('solteiro', 'Solteiro(a)'), ('casado', 'Casado(a)'),
+        ('viuvo', 'Viúvo(a)'), ('divorciado', 'Divorciado(a)')
+    ])
+    conjuge = StringField("Nome do Cônjuge")
+    filhos = IntegerField("Quantidade de Filhos", default=0)
+    batizado = BooleanField("É Batizado(a)?")
+    data_batismo = DateField("Data do Batismo", format="%Y-%m-%d")
+    foto = FileField("Foto", validators=[FileAllowed(['jpg','png','jpeg','gif','webp','svg','bmp','tiff','heic','avif'], 'Apenas imagens!')])
+    ministerio = SelectField("Ministério", validators=[Optional()])
+    status = SelectField("Status", validators=[DataRequired()])
+    submit = SubmitField("Salvar Membro")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ministerio.choices = [('', '-- Nenhum --')] + [(nome, nome) for nome in opcoes_ministerios()]
+        self.status.choices = [
+            ("ativo", "Ativo"), ("inativo", "Inativo"), ("afastado", "Afastado"),
+            ("nao_membro", "Não Membro"), ("visitante", "Visitante")
+        ]
+
+class TransacaoForm(FlaskForm):
+    data_transacao = DateField("Data da Transação", format="%Y-%m-%d", validators=[DataRequired()], default=datetime.now().date())
+    tipo = SelectField("Tipo", choices=[
+        ("dizimo", "Dízimo"), ("oferta", "Oferta"), ("doacao", "Doação"), ("despesa", "Despesa")
+    ])
+    categoria = StringField("Categoria (ex: culto, aluguel)", validators=[DataRequired()])
+    valor = DecimalField("Valor", places=2, validators=[DataRequired()])
+    metodo = SelectField("Método", choices=[
+        ("dinheiro", "Dinheiro"), ("pix", "Pix"), ("cartao", "Cartão")
+    ])
+    membro_id = SelectField("Membro (opcional)", coerce=int, validators=[Optional()])
+    is_fixo = SelectField("Fixo Mensal?", choices=[(0, "Não"), (1, "Sim")], coerce=int)
+    submit = SubmitField("Registrar")
+
+class EventoForm(FlaskForm):
+    titulo = StringField("Título", validators=[DataRequired()])
+    descricao = TextAreaField("Descrição", validators=[DataRequired()])
+    data = DateField("Data", format="%Y-%m-%d", validators=[DataRequired()])
+    imagem = FileField("Imagem", validators=[FileAllowed(['jpg', 'png', 'jpeg', 'gif'])])
+    submit = SubmitField("Salvar")
+
+class MinisterioForm(FlaskForm):
+    nome = StringField("Nome do Ministério", validators=[DataRequired()])
+    lider = StringField("Líder", validators=[DataRequired()])
+    descricao = TextAreaField("Descrição", validators=[DataRequired()])
+    submit = SubmitField("Salvar")
+
+class CompromissoForm(FlaskForm):
+    titulo = StringField("Título", validators=[DataRequired()])
+    descricao = TextAreaField("Descrição")
+    data = DateField("Data", format="%Y-%m-%d", validators=[DataRequired()])
+    hora = StringField("Hora (HH:MM)", validators=[Optional()])
+    local = StringField("Local", validators=[Optional()])
+    membro_id = SelectField("Membro Relacionado", coerce=int, validators=[Optional()])
+    submit = SubmitField("Salvar Compromisso")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        preparar_select_membro(self.membro_id)
+
+class CustoFixoForm(FlaskForm):
+    nome = StringField("Nome", validators=[DataRequired()])
+    valor = DecimalField("Valor", places=2, validators=[DataRequired()])
+    mes_referencia = StringField("Mês de Referência (YYYY-MM)", validators=[Optional()])
+    replicar_mensal = BooleanField("Replicar todo mês")
+    ativo = BooleanField("Ativo", default=True)
+    submit = SubmitField("Salvar")
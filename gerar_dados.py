@@ -0,0 +1,213 @@
+# gerar_dados.py
+# Popula um banco de testes com dados sintéticos realistas: membros, transações,
+# eventos, compromissos e mensagens. Serve para testar desempenho com volumes de
+# 1 mil a 1 milhão de transações. O banco tem de ser informado (--banco ou
+# DATABASE_URL no ambiente) e nunca é o app.db padrão do app.
+#
+# Uso: python gerar_dados.py --banco /tmp/carga.db --transacoes 100000 --membros 2000
+#      DATABASE_URL=sqlite:////tmp/carga.db python gerar_dados.py --transacoes 1000000
+import argparse
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy.engine import make_url
+
+NOMES = ['Ana', 'Maria', 'José', 'João', 'Antônio', 'Francisco', 'Carlos', 'Paulo', 'Pedro', 'Lucas',
+         'Luiz', 'Marcos', 'Gabriel', 'Rafael', 'Daniel', 'Marcelo', 'Bruno', 'Eduardo', 'Felipe', 'Rodrigo',
+         'Juliana', 'Adriana', 'Márcia', 'Fernanda', 'Patrícia', 'Aline', 'Sandra', 'Camila', 'Amanda', 'Bruna',
+         'Jéssica', 'Letícia', 'Júlia', 'Luciana', 'Vanessa', 'Mariana', 'Gabriela', 'Tatiana', 'Josilaine', 'Wendel']
+SOBRENOMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima',
+              'Gomes', 'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Almeida', 'Lopes', 'Soares', 'Fernandes',
+              'Vieira', 'Barbosa', 'Rocha', 'Dias', 'Nascimento', 'Andrade', 'Moreira', 'Nunes', 'Marques']
+BAIRROS = ['Centro', 'Ubás', 'Praia Campista', 'Caxias', 'Sapecado', 'Lagomar', 'Santa Irene', 'Cidade Nova']
+MINISTERIOS = ['Ministério de Louvor', 'Ministério Infantil', 'Ministério Jovem', 'Intercessão',
+               'Recepção', 'Mídia', None, None, None]
+ESTADOS_CIVIS = ['solteiro', 'casado', 'casado', 'divorciado', 'viúvo']
+METODOS = ['pix', 'pix', 'pix', 'dinheiro', 'dinheiro', 'cartao', 'transferencia']
+CATEGORIAS_ENTRADA = {'dizimo': ['Dízimo'], 'oferta': ['Culto', 'Culto', 'Santa Ceia', 'Missões'],
+                      'doacao': ['Cesta básica', 'Reforma', 'Missões']}
+CATEGORIAS_DESPESA = ['Aluguel', 'Energia', 'Água', 'Internet', 'Manutenção', 'Limpeza',
+                      'Som e mídia', 'Ação social', 'Prebenda pastoral']
+# Peso de cada tipo nas transações geradas
+TIPOS = ['dizimo'] * 40 + ['oferta'] * 35 + ['doacao'] * 10 + ['despesa'] * 15
+LOTE = 10000
+BANCO_PADRAO = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'app.db')
+
+
+def _nome():
+    return f"{random.choice(NOMES)} {random.choice(SOBRENOMES)} {random.choice(SOBRENOMES)}"
+
+def _celular():
+    return f"(22) 9{random.randint(8000, 9999)}-{random.randint(0, 9999):04d}"
+
+def _data_culto(inicio, dias):
+    """Data aleatória no período, com 60% de chance de cair num domingo (dia de culto);
+    nunca depois de agora."""
+    d = inicio + timedelta(days=random.randrange(dias))
+    if random.random() < 0.6:
+        d += timedelta(days=(6 - d.weekday()) % 7)
+        if d > date.today():  # domingo que ainda não chegou: o da semana anterior
+            d -= timedelta(days=7)
+    quando = datetime.combine(d, datetime.min.time()) + timedelta(hours=random.choice([9, 10, 18, 19, 20]),
+                                                                  minutes=random.randrange(60))
+    return min(quando, datetime.now())
+
+def _banco_padrao(url):
+    """A URL aponta para o app.db padrão do app?"""
+    url = make_url(url)
+    return url.get_backend_name() == 'sqlite' and bool(url.database) \
+        and os.path.realpath(url.database) == os.path.realpath(BANCO_PADRAO)
+
+def url_banco(banco=None):
+    """URL do banco de testes (--banco, URL ou arquivo SQLite, ou DATABASE_URL do ambiente)."""
+    url = banco or os.environ.get('DATABASE_URL')
+    if not url:
+        raise SystemExit("Informe o banco de testes com --banco ou DATABASE_URL (o app.db do app não é usado).")
+    if '://' not in url:
+        url = f"sqlite:///{os.path.abspath(url)}"
+    if _banco_padrao(url):
+        raise SystemExit(f"Recusado: {BANCO_PADRAO} é o banco padrão do app. Use outro arquivo.")
+    return url
+
+def inserir_em_lotes(db, tabela, linhas):
+    for i in range(0, len(linhas), LOTE):
+        db.session.execute(tabela.insert(), linhas[i:i + LOTE])
+    db.session.commit()
+
+
+def gerar(membros=500, transacoes=10000, eventos=50, compromissos=500, mensagens=2000,
+          anos=3, semente=42, verbose=True):
+    """Gera os dados dentro do app context atual. Retorna a contagem por tabela."""
+    from extensions import db
+    from dinheiro import Dinheiro
+    from models import (User, Membro, Transacao, Evento, Compromisso, MensagemEnviada,
+                        recalcular_engajamento)
+
+    if _banco_padrao(db.engine.url):
+        raise SystemExit(f"Recusado: {BANCO_PADRAO} é o banco padrão do app. Use outro arquivo.")
+
+    random.seed(semente)
+    hoje = date.today()
+    inicio = hoje - timedelta(days=365 * anos)
+    dias = (hoje - inicio).days + 1
+
+    def etapa(nome, tabela, linhas):
+        t = time.perf_counter()
+        inserir_em_lotes(db, tabela, linhas)
+        if verbose:
+            print(f"{nome:<14} {len(linhas):>9} em {time.perf_counter() - t:6.1f}s")
+
+    # Usuário dono das mensagens e compromissos (o primeiro admin existente)
+    admin = User.query.filter_by(nivel_acesso=1).order_by(User.id).first()
+    if admin is None:
+        raise SystemExit("Nenhum usuário admin no banco. Rode o app (create_initial_data) ou criar_admin.py antes.")
+
+    primeiro_id = (db.session.query(db.func.max(Membro.id)).scalar() or 0) + 1
+    etapa('membros', Membro.__table__, [{
+        'nome': _nome(),
+        'email': f"membro{primeiro_id + i}@exemplo.com.br" if random.random() < 0.7 else None,
+        'telefone': None,
+        'celular': _celular() if random.random() < 0.9 else None,
+        'endereco': f"Rua {random.choice(SOBRENOMES)}, {random.randint(1, 900)}",
+        'bairro': random.choice(BAIRROS),
+        'cidade': 'Carapebus', 'estado': 'RJ',
+        'data_nascimento': date(random.randint(1945, 2015), random.randint(1, 12), random.randint(1, 28)),
+        'estado_civil': random.choice(ESTADOS_CIVIS),
+        'filhos': random.choice([0, 0, 1, 2, 3]),
+        'batizado': random.random() < 0.7,
+        'ministerio': random.choice(MINISTERIOS),
+        'foto': 'default.jpg',
+        'data_cadastro': _data_culto(inicio, dias),
+        'status': 'ativo', 'ativo': random.random() < 0.92,
+    } for i in range(membros)])
+    ids_membros = list(range(primeiro_id, primeiro_id + membros))
+
+    linhas = []
+    for _ in range(transacoes):
+        tipo = random.choice(TIPOS)
+        if tipo == 'despesa':
+            categoria, valor, membro_id = random.choice(CATEGORIAS_DESPESA), random.uniform(50, 3000), None
+        else:
+            categoria = random.choice(CATEGORIAS_ENTRADA[tipo])
+            valor = random.lognormvariate(4.3, 0.8) if tipo != 'doacao' else random.uniform(20, 1000)
+            # Dízimos quase sempre identificados; ofertas, muitas vezes anônimas
+            identificado = tipo == 'dizimo' or random.random() < 0.3
+            membro_id = random.choice(ids_membros) if identificado and ids_membros else None
+        linhas.append({'tipo': tipo, 'categoria': categoria, 'valor': Dinheiro(round(valor * 100)),
+                       'metodo': random.choice(METODOS), 'data': _data_culto(inicio, dias),
+                       'membro_id': membro_id, 'is_fixo': False})
+    etapa('transações', Transacao.__table__, linhas)
+
+    etapa('eventos', Evento.__table__, [{
+        'titulo': random.choice(['Culto de Celebração', 'Santa Ceia', 'Conferência de Jovens',
+                                 'Encontro de Casais', 'Escola Bíblica', 'Vigília', 'Batismo']),
+        'descricao': "Venha participar conosco! Traga sua família e amigos.",
+        'data': inicio + timedelta(days=random.randrange(dias + 90)),
+        'imagem': None,
+    } for _ in range(eventos)])
+
+    etapa('compromissos', Compromisso.__table__, [{
+        'titulo': random.choice(['Visita', 'Aconselhamento', 'Reunião de liderança', 'Oração']),
+        'descricao': None,
+        'data': inicio + timedelta(days=random.randrange(dias + 30)),
+        'hora': f"{random.randint(8, 20):02d}:00",
+        'local': random.choice(['Igreja', 'Casa do membro', 'Online']),
+        'membro_id': random.choice(ids_membros) if ids_membros and random.random() < 0.8 else None,
+        'user_id': admin.id,
+        'criado_em': datetime.now(),
+    } for _ in range(compromissos)])
+
+    linhas = []
+    for _ in range(mensagens):
+        tipo = 'email' if random.random() < 0.6 else 'sms'
+        erro = random.random() < 0.05
+        linhas.append({
+            'tipo': tipo,
+            'destinatario': f"membro{random.choice(ids_membros or [0])}@exemplo.com.br" if tipo == 'email' else _celular(),
+            'assunto': 'Aviso da Igreja' if tipo == 'email' else 'SMS',
+            'corpo': "Paz do Senhor! Lembramos do culto de domingo às 18h.",
+            'status': 'erro' if erro else 'enviado',
+            'erro': 'Destinatário inválido' if erro else None,
+            'enviado_em': _data_culto(inicio, dias),
+            'user_id': admin.id,
+        })
+    etapa('mensagens', MensagemEnviada.__table__, linhas)
+
+    # As inserções em lote não passam pelos eventos do ORM; recalcula o engajamento de uma vez
+    t = time.perf_counter()
+    recalcular_engajamento(db.session.connection())
+    db.session.commit()
+    if verbose:
+        print(f"{'engajamento':<14} {'':>9} em {time.perf_counter() - t:6.1f}s")
+
+    return {'membros': membros, 'transacoes': transacoes, 'eventos': eventos,
+            'compromissos': compromissos, 'mensagens': mensagens}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos para testes de carga.")
+    parser.add_argument('--banco', help="arquivo SQLite ou URL do banco de testes (padrão: DATABASE_URL)")
+    parser.add_argument('--membros', type=int, default=500)
+    parser.add_argument('--transacoes', type=int, default=10000)
+    parser.add_argument('--eventos', type=int, default=50)
+    parser.add_argument('--compromissos', type=int, default=500)
+    parser.add_argument('--mensagens', type=int, default=2000)
+    parser.add_argument('--anos', type=int, default=3, help="período coberto pelas datas geradas")
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+    # Antes de importar o app: a config lê DATABASE_URL (e o .env, que não sobrescreve)
+    os.environ['DATABASE_URL'] = url_banco(args.banco)
+
+    from app import app, db, create_initial_data
+    with app.app_context():
+        db.create_all()
+    create_initial_data()
+    with app.app_context():
+        gerar(args.membros, args.transacoes, args.eventos, args.compromissos, args.mensagens,
+              args.anos, args.semente)
+    print("✅ Dados gerados!")
+
+
+if __name__ == '__main__':
+    main()
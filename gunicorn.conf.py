@@ -0,0 +1,37 @@
+# Configuração lida automaticamente pelo gunicorn (ver Procfile)
+import os
+import shutil
+import tempfile
+from dotenv import load_dotenv
+
+load_dotenv()  # como o config.py: o .env vale para os segredos conferidos abaixo
+
+# Métricas do Prometheus compartilhadas entre os workers (ver metricas.py).
+# A pasta precisa existir antes de o app ser importado (--preload importa o
+# app antes do hook on_starting), então é preparada aqui, zerando a execução anterior.
+PASTA_METRICAS = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'combave-prometheus')
+)
+shutil.rmtree(PASTA_METRICAS, ignore_errors=True)
+os.makedirs(PASTA_METRICAS, exist_ok=True)
+
+# IP dos visitantes (limites.py). Atrás do roteador do Heroku (Procfile) o
+# remote_addr é sempre o do roteador, que acrescenta um X-Forwarded-For: sem
+# confiar nesse salto, todo mundo dividiria o mesmo limite por IP. Fora do
+# Heroku não há como adivinhar quantos proxies existem, então é obrigatório.
+if 'DYNO' in os.environ:
+    os.environ.setdefault('PROXIES_CONFIAVEIS', '1')
+elif 'PROXIES_CONFIAVEIS' not in os.environ:
+    raise SystemExit("Defina PROXIES_CONFIAVEIS: quantos proxies (load balancer, nginx) ficam na frente "
+                     "do gunicorn, ou 0 se ele recebe as conexões direto.")
+
+
+# Produção não sobe sem os segredos, que não têm valor padrão (ver config.py)
+_faltando = [nome for nome in ('SECRET_KEY', 'MAIL_PASSWORD') if not os.environ.get(nome)]
+if _faltando:
+    raise SystemExit(f"Defina no ambiente: {', '.join(_faltando)}.")
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,163 @@
+import os
+import time
+import zipfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from itertools import groupby
+from threading import Thread
+import pdfkit
+from flask import current_app
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from sqlalchemy import String, cast, func, select
+from werkzeug.utils import secure_filename
+from extensions import db
+from dinheiro import Dinheiro, formatar_moeda
+from models import Membro, Transacao, InformeAnual, TIPOS_ENTRADA
+from utils import intervalo_periodo
+
+# ================================
+# INFORME ANUAL DE CONTRIBUIÇÕES (todos os membros, em segundo plano)
+# ================================
+# Os totais do ano de todos os membros saem de uma única consulta agrupada
+# (membro x mês x tipo). O gargalo é o wkhtmltopdf, um processo por PDF: os
+# informes são gerados num ProcessPoolExecutor com um processo por núcleo e
+# cada PDF vai para o ZIP assim que fica pronto, sem juntar todos na memória.
+# O andamento fica gravado em informe_anual, então qualquer worker o mostra.
+INFORMES_PROCESSOS = int(os.getenv('INFORMES_PROCESSOS', 0)) or os.cpu_count() or 1
+INFORMES_RESERVA = timedelta(minutes=10)  # sem progresso por esse tempo, a geração foi interrompida
+CAMINHO_WKHTMLTOPDF = os.getenv('WKHTMLTOPDF_PATH', r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe')
+PASTA_TEMPLATES = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'templates')
+ROTULOS_TIPO = {'dizimo': 'Dízimo', 'oferta': 'Oferta', 'doacao': 'Doação'}
+NOMES_MES = ('Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho', 'Julho',
+             'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro')
+
+
+def totais_do_ano(ano):
+    """Um dicionário por membro com contribuição no ano, pronto para o template do informe."""
+    inicio, fim = intervalo_periodo(ano=ano)
+    # 'YYYY-MM' do texto da data: funciona igual no SQLite e no PostgreSQL
+    mes = func.substr(cast(Transacao.data, String), 1, 7)
+    linhas = db.session.execute(
+        select(Membro.id, Membro.nome, Membro.endereco, Membro.cidade, Membro.estado,
+               mes.label('mes'), Transacao.tipo, func.sum(Transacao.valor).label('valor'))
+        .join(Membro, Transacao.membro_id == Membro.id)
+        .where(Transacao.data >= inicio, Transacao.data < fim, Transacao.tipo.in_(TIPOS_ENTRADA))
+        .group_by(Membro.id, mes, Transacao.tipo)
+        .order_by(Membro.id, mes)
+    )
+    emitido_em = datetime.now().strftime('%d/%m/%Y')
+    tipos = [(tipo, ROTULOS_TIPO.get(tipo, tipo.title())) for tipo in TIPOS_ENTRADA]
+    for membro_id, grupo in groupby(linhas, key=lambda l: l.id):
+        grupo = list(grupo)
+        primeira = grupo[0]
+        meses = [{'nome': nome, 'valores': {}, 'total': Dinheiro()} for nome in NOMES_MES]
+        por_tipo = {}
+        for l in grupo:
+            m = meses[int(l.mes[5:7]) - 1]
+            m['valores'][l.tipo] = l.valor
+            m['total'] += l.valor
+            por_tipo[l.tipo] = por_tipo.get(l.tipo, Dinheiro()) + l.valor
+        yield {
+            'arquivo': f"{membro_id:05d}_{secure_filename(primeira.nome) or 'membro'}.pdf",
+            'ano': ano,
+            'membro': {'nome': primeira.nome, 'endereco': primeira.endereco,
+                       'cidade': primeira.cidade, 'estado': primeira.estado},
+            'tipos': tipos,
+            'meses': meses,
+            'por_tipo': por_tipo,
+            'total': sum(por_tipo.values(), Dinheiro()),
+            'emitido_em': emitido_em,
+        }
+
+
+# --- processos do pool (não usam o app nem o banco) ---
+_template = None
+_config_pdf = None
+
+def _iniciar_processo():
+    global _template, _config_pdf
+    ambiente = Environment(loader=FileSystemLoader(PASTA_TEMPLATES), autoescape=select_autoescape())
+    ambiente.filters['moeda'] = formatar_moeda
+    _template = ambiente.get_template('relatorios/informe_contribuicoes.html')
+    _config_pdf = pdfkit.configuration(wkhtmltopdf=CAMINHO_WKHTMLTOPDF)
+
+def _gerar_pdf(dados):
+    """(nome do arquivo no ZIP, bytes do PDF) de um membro."""
+    html = _template.render(**dados)
+    return dados['arquivo'], pdfkit.from_string(html, False, configuration=_config_pdf, options={'quiet': ''})
+
+
+def pasta_informes():
+    # Fora de /uploads, que é público: os informes só saem pela rota de download
+    return os.getenv('INFORMES_DIR') or os.path.join(current_app.instance_path, 'informes')
+
+def em_andamento(informe):
+    return (informe.status in ('pendente', 'gerando')
+            and informe.atualizado_em > datetime.utcnow() - INFORMES_RESERVA)
+
+def gerar_informes(informe_id, processos=None):
+    """Gera o ZIP do pedido informe_id, gravando o progresso. Retorna o InformeAnual."""
+    informe = db.session.get(InformeAnual, informe_id)
+    t = time.perf_counter()
+    dados = list(totais_do_ano(informe.ano))
+    informe.status, informe.total, informe.gerados = 'gerando', len(dados), 0
+    informe.atualizado_em = datetime.utcnow()
+    db.session.commit()
+
+    pasta = pasta_informes()
+    os.makedirs(pasta, exist_ok=True)
+    nome = f"informes_{informe.ano}_{informe.id}.zip"
+    parcial = os.path.join(pasta, nome + '.parcial')
+    processos = max(1, min(processos or INFORMES_PROCESSOS, len(dados)))
+    ultimo_progresso = time.monotonic()
+    try:
+        # Sem o wkhtmltopdf, falha aqui com a mensagem do pdfkit (no pool viraria "processo encerrado")
+        pdfkit.configuration(wkhtmltopdf=CAMINHO_WKHTMLTOPDF)
+        # "spawn": o fork de um processo com threads (gunicorn) pode herdar locks presos
+        with ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_iniciar_processo) as pool, \
+             zipfile.ZipFile(parcial, 'w', zipfile.ZIP_STORED) as zip_:  # PDF já vem comprimido
+            resultados = pool.map(_gerar_pdf, dados, chunksize=max(1, min(16, len(dados) // (processos * 4))))
+            for gerados, (arquivo, pdf) in enumerate(resultados, start=1):
+                zip_.writestr(arquivo, pdf)
+                # No máximo um commit por segundo
+                if time.monotonic() - ultimo_progresso >= 1:
+                    informe.gerados, informe.atualizado_em = gerados, datetime.utcnow()
+                    db.session.commit()
+                    ultimo_progresso = time.monotonic()
+        os.replace(parcial, os.path.join(pasta, nome))
+    except Exception as e:
+        db.session.rollback()
+        if os.path.exists(parcial):
+            os.remove(parcial)
+        informe.status, informe.erro = 'erro', str(e)[:1000] or e.__class__.__name__
+    else:
+        informe.status, informe.arquivo, informe.gerados = 'pronto', nome, len(dados)
+    informe.duracao_ms = int((time.perf_counter() - t) * 1000)
+    informe.atualizado_em = datetime.utcnow()
+    db.session.commit()
+    return informe
+
+def _executar(app, informe_id):
+    with app.app_context():
+        try:
+            gerar_informes(informe_id)
+        except Exception as e:
+            print("Erro na geração dos informes:", e)
+            db.session.rollback()
+
+def iniciar_informes(ano, usuario_id=None):
+    """Cria o pedido e gera em segundo plano. Retorna (informe, criado); com um
+    pedido ainda em andamento, devolve esse pedido e criado=False."""
+    recentes = InformeAnual.query.filter(InformeAnual.status.in_(['pendente', 'gerando']))\
+        .order_by(InformeAnual.id.desc()).all()
+    for informe in recentes:
+        if em_andamento(informe):
+            return informe, False
+    informe = InformeAnual(ano=ano, solicitado_por=usuario_id)
+    db.session.add(informe)
+    db.session.commit()
+    Thread(target=_executar, args=(current_app._get_current_object(), informe.id),
+           name=f'informes-{informe.id}', daemon=True).start()
+    return informe, True
@@ -0,0 +1,99 @@
+import os
+import time
+from functools import wraps
+from threading import Lock, BoundedSemaphore
+from flask import request, jsonify, make_response
+from cachetools import TTLCache
+
+
+# ================================
+# LIMITE DE REQUISIÇÕES (rotas públicas)
+# ================================
+# Token bucket em memória (por worker do gunicorn): não depende de Redis. Por
+# isso os limites valem por processo: o global (*_LIMITE_TOTAL) é dividido
+# entre os WEB_CONCURRENCY workers, para o teto somado ser o configurado; o por
+# IP não (cada visitante cai num worker qualquer), então um mesmo IP pode chegar
+# a até WEB_CONCURRENCY vezes o limite por IP.
+WORKERS = max(1, int(os.getenv("WEB_CONCURRENCY", 1)))  # o gunicorn lê a mesma variável
+
+class TokenBucket:
+    def __init__(self, capacidade, por_segundo):
+        self.capacidade = capacidade
+        self.por_segundo = por_segundo
+        self.tokens = float(capacidade)
+        self.ultimo = time.monotonic()
+
+    def consumir(self):
+        """Retorna 0 se liberado, ou quantos segundos esperar até o próximo token."""
+        agora = time.monotonic()
+        self.tokens = min(self.capacidade, self.tokens + (agora - self.ultimo) * self.por_segundo)
+        self.ultimo = agora
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.por_segundo
+
+def _limite_env(nome, padrao, workers=1):
+    # Formato "quantidade/segundos", ex.: "10/60" = 10 requisições por minuto,
+    # repartidas entre `workers` processos (capacidade de pelo menos 1 em cada)
+    qtd, segundos = os.getenv(nome, padrao).split('/')
+    return max(1, -(-int(qtd) // workers)), int(qtd) / float(segundos) / workers
+
+_buckets_ip = TTLCache(maxsize=10000, ttl=3600)
+_buckets_globais = {}
+_buckets_lock = Lock()
+
+# Chamadas simultâneas ao Gemini por worker (no total, IA_MAX_EM_VOO x WEB_CONCURRENCY)
+SEMAFORO_IA = BoundedSemaphore(int(os.getenv("IA_MAX_EM_VOO", 4)))
+
+def ip_cliente():
+    # Nunca o X-Forwarded-For cru (o cliente escolhe o valor): atrás de proxies, o
+    # ProxyFix do app (PROXIES_CONFIAVEIS) já coloca o IP real em remote_addr
+    return request.remote_addr
+
+def resposta_429(mensagem, retry_after):
+    if request.is_json:
+        resp = jsonify({"resposta": mensagem})
+    else:
+        resp = make_response(mensagem)
+    resp.status_code = 429
+    resp.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+    return resp
+
+def limitar_requisicoes(nome, por_ip, total, semaforo=None,
+                        mensagem="Muitas requisições. Aguarde alguns instantes e tente novamente."):
+    """Aplica token bucket por IP e global em requisições POST e limita as chamadas em voo."""
+    capacidade_ip, taxa_ip = _limite_env(f"{nome.upper()}_LIMITE_IP", por_ip)
+    capacidade_total, taxa_total = _limite_env(f"{nome.upper()}_LIMITE_TOTAL", total, WORKERS)
+
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if request.method != 'POST':
+                return f(*args, **kwargs)
+
+            with _buckets_lock:
+                chave = (nome, ip_cliente())
+                bucket_ip = _buckets_ip.get(chave)
+                if bucket_ip is None:
+                    bucket_ip = _buckets_ip[chave] = TokenBucket(capacidade_ip, taxa_ip)
+                bucket_total = _buckets_globais.setdefault(nome, TokenBucket(capacidade_total, taxa_total))
+                espera = bucket_ip.consumir() or bucket_total.consumir()
+            if espera:
+                return resposta_429(mensagem, espera)
+
+            if semaforo is None:
+                return f(*args, **kwargs)
+
+            if not semaforo.acquire(blocking=False):
+                return resposta_429(mensagem, 2)
+            try:
+                resp = make_response(f(*args, **kwargs))
+            except Exception:
+                semaforo.release()
+                raise
+            # Libera só quando a resposta terminar de ser enviada (inclui streams SSE)
+            resp.call_on_close(semaforo.release)
+            return resp
+        return decorated
+    return decorator
@@ -0,0 +1,145 @@
+# medir_inicializacao.py
+# Mede o custo de subir o app: tempo de cold start e memória (RSS) por etapa de
+# importação, e o RSS/PSS de cada worker do gunicorn com e sem --preload.
+#
+# Uso:
+#   python medir_inicializacao.py                       # cold start por etapa (5 rodadas)
+#   python medir_inicializacao.py --gunicorn --workers 4  # memória por worker (Linux)
+import argparse
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+
+# Executado num processo novo para cada rodada: importa cada etapa em ordem e
+# registra o tempo acumulado e o RSS máximo (ru_maxrss, em KB no Linux).
+SCRIPT_ETAPAS = r"""
+import json, resource, sys, time
+from importlib import import_module
+inicio = time.perf_counter()
+etapas = []
+def marcar(nome):
+    etapas.append((nome, time.perf_counter() - inicio,
+                   resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+marcar('interpretador')
+import flask, flask_sqlalchemy, flask_login, flask_wtf, flask_mail  # noqa
+marcar('flask')
+import extensions, models, forms  # noqa
+marcar('models/forms')
+for nome in ('publico', 'secretaria', 'financeiro', 'mensagens', 'ia'):
+    import_module('rotas.' + nome)
+    marcar('rotas.' + nome)
+from app import create_app
+create_app()
+marcar('create_app()')
+print(json.dumps(etapas))
+"""
+
+
+def medir_etapas(rodadas):
+    resultados = []
+    for _ in range(rodadas):
+        saida = subprocess.run(
+            [sys.executable, '-c', SCRIPT_ETAPAS], cwd=BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout
+        resultados.append(json.loads(saida.strip().splitlines()[-1]))
+
+    print(f"{rodadas} rodadas, mediana por etapa (tempo acumulado, RSS máximo)")
+    print(f"{'etapa':<20} {'tempo (ms)':>12} {'RSS (MB)':>10}")
+    for i, (nome, _, _) in enumerate(resultados[0]):
+        tempo = statistics.median(r[i][1] for r in resultados) * 1000
+        rss = statistics.median(r[i][2] for r in resultados) / 1024
+        print(f"{nome:<20} {tempo:>12.0f} {rss:>10.1f}")
+
+
+def memoria_processo(pid):
+    """RSS, PSS e memória privada (MB) de um processo, via /proc/<pid>/smaps_rollup."""
+    campos = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for linha in f:
+            partes = linha.split()
+            if len(partes) >= 2 and partes[1].isdigit():
+                campos[partes[0].rstrip(':')] = int(partes[1])
+    privada = campos.get('Private_Clean', 0) + campos.get('Private_Dirty', 0)
+    return campos.get('Rss', 0) / 1024, campos.get('Pss', 0) / 1024, privada / 1024
+
+
+def filhos(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [int(p) for p in f.read().split()]
+
+
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def medir_gunicorn(workers, preload, espera):
+    porta = porta_livre()
+    cmd = [sys.executable, '-m', 'gunicorn', 'app:app', '--worker-class', 'gthread',
+           '--threads', '8', '--workers', str(workers), '--bind', f'127.0.0.1:{porta}']
+    if preload:
+        cmd.append('--preload')
+    inicio = time.monotonic()
+    mestre = subprocess.Popen(cmd, cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        # Sem --preload o mestre já aceita conexões antes dos workers importarem o
+        # app, então "pronto" é quando o RSS de todos os workers para de crescer.
+        anterior = None
+        while time.monotonic() - inicio < espera:
+            time.sleep(0.25)
+            try:
+                pids = filhos(mestre.pid)
+                if len(pids) != workers:
+                    continue
+                socket.create_connection(('127.0.0.1', porta), timeout=0.2).close()
+                atual = [memoria_processo(pid)[0] for pid in pids]
+            except OSError:
+                continue
+            if anterior and all(abs(a - b) < 1 for a, b in zip(atual, anterior)):
+                break
+            anterior = atual
+        else:
+            raise SystemExit(f"gunicorn não subiu em {espera:.0f}s")
+        pronto = time.monotonic() - inicio
+
+        perfil = 'preload' if preload else 'sem preload'
+        medidas = [memoria_processo(pid) for pid in filhos(mestre.pid)]
+        mestre_rss = memoria_processo(mestre.pid)[0]
+        rss, pss, privada = (statistics.mean(m[i] for m in medidas) for i in range(3))
+        total_pss = sum(m[1] for m in medidas) + memoria_processo(mestre.pid)[1]
+        print(f"{perfil:<12} {pronto:>9.2f}s {mestre_rss:>9.1f} {rss:>9.1f} {pss:>9.1f} "
+              f"{privada:>10.1f} {total_pss:>10.1f}")
+    finally:
+        mestre.send_signal(signal.SIGTERM)
+        mestre.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start e memória por worker do app.")
+    parser.add_argument('--rodadas', type=int, default=5)
+    parser.add_argument('--gunicorn', action='store_true', help="mede os workers do gunicorn (Linux)")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--espera', type=float, default=60, help="tempo máximo para o gunicorn subir")
+    args = parser.parse_args()
+
+    if not args.gunicorn:
+        medir_etapas(args.rodadas)
+        return
+
+    print(f"{args.workers} workers gthread; memória em MB (média por worker, exceto mestre/total)")
+    print(f"{'perfil':<12} {'pronto':>10} {'mestre':>9} {'RSS':>9} {'PSS':>9} {'privada':>10} {'PSS total':>10}")
+    medir_gunicorn(args.workers, False, args.espera)
+    medir_gunicorn(args.workers, True, args.espera)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+import os
+import time
+import hmac
+from contextlib import contextmanager
+from flask import Response, abort, g, request, has_request_context
+from flask_login import current_user
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+)
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import func
+from extensions import db
+from models import MensagemContato
+
+# ================================
+# MÉTRICAS (formato Prometheus)
+# ================================
+# Com vários workers do gunicorn cada processo grava seus valores em arquivos
+# na pasta PROMETHEUS_MULTIPROC_DIR (definida no gunicorn.conf.py) e o /metrics
+# soma todos. Sem essa variável (flask run) as métricas ficam só na memória.
+REQUISICOES = Counter(
+    'combave_http_requisicoes_total', "Requisições atendidas",
+    ['endpoint', 'metodo', 'status']
+)
+DURACAO_REQUISICAO = Histogram(
+    'combave_http_requisicao_segundos', "Tempo de resposta por endpoint",
+    ['endpoint', 'metodo']
+)
+CONSULTAS_SQL = Counter(
+    'combave_db_consultas_total', "Consultas SQL executadas", ['endpoint']
+)
+DURACAO_CONSULTA = Histogram(
+    'combave_db_consulta_segundos', "Tempo de cada consulta SQL",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+DURACAO_CHAMADA = Histogram(
+    'combave_chamada_externa_segundos', "Tempo das chamadas a serviços externos",
+    ['servico'], buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+)
+ERROS_CHAMADA = Counter(
+    'combave_chamada_externa_erros_total', "Chamadas a serviços externos que falharam", ['servico']
+)
+BYTES_UPLOADS = Counter(
+    'combave_uploads_bytes_servidos_total', "Bytes de arquivos de /uploads enviados"
+)
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+
+@contextmanager
+def medir_chamada(servico):
+    """Mede uma chamada externa: gemini, google_search, twilio ou smtp."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        ERROS_CHAMADA.labels(servico).inc()
+        raise
+    finally:
+        DURACAO_CHAMADA.labels(servico).observe(time.perf_counter() - inicio)
+
+
+def _endpoint():
+    if not has_request_context():
+        return 'fora_de_requisicao'
+    return request.endpoint or 'sem_rota'
+
+def registrar_consulta(segundos):
+    """Chamada pelo listener de consultas SQL de desempenho.py (um só para os dois)."""
+    DURACAO_CONSULTA.observe(segundos)
+    CONSULTAS_SQL.labels(_endpoint()).inc()
+
+def _iniciar_requisicao():
+    g.metricas_inicio = time.perf_counter()
+
+def _finalizar_requisicao(response):
+    inicio = g.pop('metricas_inicio', None)
+    if inicio is None or request.endpoint == 'static':
+        return response
+    endpoint = _endpoint()
+    DURACAO_REQUISICAO.labels(endpoint, request.method).observe(time.perf_counter() - inicio)
+    REQUISICOES.labels(endpoint, request.method, str(response.status_code)).inc()
+    return response
+
+
+# ================================
+# FILAS (lidas do banco a cada coleta)
+# ================================
+class FilaContatosCollector:
+    def collect(self):
+        fila = GaugeMetricFamily(
+            'combave_fila_contatos', "Mensagens de contato do site por status", labels=['status']
+        )
+        contagem = dict(db.session.query(MensagemContato.status, func.count(MensagemContato.id))
+                        .group_by(MensagemContato.status).all())
+        for status in ('pendente', 'enviando', 'erro', 'enviado'):
+            fila.add_metric([status], contagem.get(status, 0))
+        yield fila
+
+
+def _autorizado():
+    # Prometheus: "Authorization: Bearer <METRICS_TOKEN>"; no navegador, só o Admin
+    if METRICS_TOKEN:
+        enviado = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if hmac.compare_digest(enviado.encode(), METRICS_TOKEN.encode()):
+            return True
+    return current_user.is_authenticated and current_user.nivel_acesso == 1
+
+def metrics():
+    if not _autorizado():
+        abort(404)
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+    else:
+        registro = REGISTRY
+    filas = CollectorRegistry(auto_describe=False)
+    filas.register(FilaContatosCollector())
+    return Response(generate_latest(registro) + generate_latest(filas), content_type=CONTENT_TYPE_LATEST)
+
+def init_app(app):
+    app.before_request(_iniciar_requisicao)
+    app.after_request(_finalizar_requisicao)
+    app.add_url_rule('/metrics', 'metrics', metrics)
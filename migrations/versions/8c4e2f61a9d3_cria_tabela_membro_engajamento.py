@@ -0,0 +1,107 @@
+"""Cria tabela membro_engajamento
+
+Revision ID: 8c4e2f61a9d3
+Revises: 3f1c9a7d2b40
+Create Date: 2026-10-18 10:03:47.118902
+
+"""
+from datetime import date, datetime, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c4e2f61a9d3'
+down_revision = '3f1c9a7d2b40'
+branch_labels = None
+depends_on = None
+
+TIPOS_ENTRADA = ('dizimo', 'oferta', 'doacao')
+
+
+def preencher_engajamento():
+    """Mesmo cálculo de models.recalcular_engajamento, com as tabelas desta revisão
+    (valor ainda em reais): sem isto todo membro apareceria como afastado até
+    alguém rodar `flask recalcular-engajamento`."""
+    conn = op.get_bind()
+    agora = datetime.now()
+    d30, d90 = agora - timedelta(days=30), agora - timedelta(days=90)
+    transacao = sa.table('transacao', sa.column('membro_id', sa.Integer), sa.column('tipo', sa.String),
+                         sa.column('data', sa.DateTime), sa.column('valor', sa.Float))
+    compromisso = sa.table('compromisso', sa.column('membro_id', sa.Integer), sa.column('data', sa.Date))
+    membro = sa.table('membro', sa.column('id', sa.Integer))
+    engajamento = sa.table('membro_engajamento', sa.column('membro_id', sa.Integer),
+                           sa.column('ultima_contribuicao', sa.DateTime), sa.column('ultima_presenca', sa.Date),
+                           sa.column('ultimo_contato', sa.DateTime), sa.column('contribuicoes_30d', sa.Integer),
+                           sa.column('contribuicoes_90d', sa.Integer), sa.column('valor_90d', sa.Float),
+                           sa.column('atualizado_em', sa.DateTime))
+
+    contribuicoes = {r[0]: r[1:] for r in conn.execute(
+        sa.select(transacao.c.membro_id, sa.func.max(transacao.c.data),
+                  sa.func.sum(sa.case((transacao.c.data >= d30, 1), else_=0)),
+                  sa.func.sum(sa.case((transacao.c.data >= d90, 1), else_=0)),
+                  sa.func.sum(sa.case((transacao.c.data >= d90, transacao.c.valor), else_=0)))
+        .where(transacao.c.membro_id.isnot(None), transacao.c.tipo.in_(TIPOS_ENTRADA))
+        .group_by(transacao.c.membro_id))}
+    presencas = dict(conn.execute(
+        sa.select(compromisso.c.membro_id, sa.func.max(compromisso.c.data))
+        .where(compromisso.c.membro_id.isnot(None), compromisso.c.data <= agora.date())
+        .group_by(compromisso.c.membro_id)).all())
+
+    linhas = []
+    for (membro_id,) in conn.execute(sa.select(membro.c.id)):
+        ultima, qtd_30, qtd_90, valor_90 = contribuicoes.get(membro_id, (None, 0, 0, 0))
+        presenca = presencas.get(membro_id)
+        if isinstance(ultima, date) and not isinstance(ultima, datetime):
+            ultima = datetime.combine(ultima, datetime.min.time())
+        datas = [d for d in (ultima, datetime.combine(presenca, datetime.min.time()) if presenca else None) if d]
+        linhas.append({
+            'membro_id': membro_id, 'ultima_contribuicao': ultima, 'ultima_presenca': presenca,
+            'ultimo_contato': max(datas) if datas else None,
+            'contribuicoes_30d': qtd_30 or 0, 'contribuicoes_90d': qtd_90 or 0, 'valor_90d': valor_90 or 0,
+            'atualizado_em': datetime.utcnow(),
+        })
+    if linhas:
+        conn.execute(engajamento.insert(), linhas)
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('membro_engajamento',
+    sa.Column('membro_id', sa.Integer(), nullable=False),
+    sa.Column('ultima_contribuicao', sa.DateTime(), nullable=True),
+    sa.Column('ultima_presenca', sa.Date(), nullable=True),
+    sa.Column('ultimo_contato', sa.DateTime(), nullable=True),
+    sa.Column('contribuicoes_30d', sa.Integer(), nullable=True),
+    sa.Column('contribuicoes_90d', sa.Integer(), nullable=True),
+    sa.Column('valor_90d', sa.Float(), nullable=True),
+    sa.Column('atualizado_em', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['membro_id'], ['membro.id'], ),
+    sa.PrimaryKeyConstraint('membro_id')
+    )
+    with op.batch_alter_table('membro_engajamento', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_membro_engajamento_ultimo_contato'), ['ultimo_contato'], unique=False)
+
+    # O recálculo por membro a cada flush precisa destes índices (senão varre as tabelas)
+    with op.batch_alter_table('transacao', schema=None) as batch_op:
+        batch_op.create_index('ix_transacao_membro_tipo_data', ['membro_id', 'tipo', 'data'], unique=False)
+    with op.batch_alter_table('compromisso', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_compromisso_membro_id'), ['membro_id'], unique=False)
+
+    # ### end Alembic commands ###
+    preencher_engajamento()
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('compromisso', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_compromisso_membro_id'))
+    with op.batch_alter_table('transacao', schema=None) as batch_op:
+        batch_op.drop_index('ix_transacao_membro_tipo_data')
+
+    with op.batch_alter_table('membro_engajamento', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_membro_engajamento_ultimo_contato'))
+
+    op.drop_table('membro_engajamento')
+    # ### end Alembic commands ###
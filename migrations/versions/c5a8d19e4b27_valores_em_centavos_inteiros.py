@@ -0,0 +1,44 @@
+"""Valores monetários em centavos inteiros
+
+Revision ID: c5a8d19e4b27
+Revises: b71d05e3c8f2
+Create Date: 2026-10-18 14:02:41.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a8d19e4b27'
+down_revision = 'b71d05e3c8f2'
+branch_labels = None
+depends_on = None
+
+# (tabela, coluna, aceita nulo)
+COLUNAS = (
+    ('transacao', 'valor', True),
+    ('custos_fixos', 'valor', False),
+    ('configuracao', 'provisao_extras', True),
+    ('configuracao', 'salario_medio', True),
+    ('configuracao_financeira', 'valor_meta', False),
+    ('membro_engajamento', 'valor_90d', True),
+)
+
+
+def upgrade():
+    for tabela, coluna, nulo in COLUNAS:
+        # Primeiro converte os reais em centavos (ainda como float, já sem casas decimais);
+        # ao trocar o tipo o valor passa para BIGINT sem perda
+        op.execute(f"UPDATE {tabela} SET {coluna} = ROUND({coluna} * 100) WHERE {coluna} IS NOT NULL")
+        with op.batch_alter_table(tabela, schema=None) as batch_op:
+            batch_op.alter_column(coluna, existing_type=sa.Float(), type_=sa.BigInteger(),
+                                  existing_nullable=nulo, postgresql_using=f'{coluna}::bigint')
+
+
+def downgrade():
+    for tabela, coluna, nulo in COLUNAS:
+        with op.batch_alter_table(tabela, schema=None) as batch_op:
+            batch_op.alter_column(coluna, existing_type=sa.BigInteger(), type_=sa.Float(),
+                                  existing_nullable=nulo)
+        op.execute(f"UPDATE {tabela} SET {coluna} = {coluna} / 100.0 WHERE {coluna} IS NOT NULL")
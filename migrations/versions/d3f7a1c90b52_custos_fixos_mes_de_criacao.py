@@ -0,0 +1,35 @@
+"""Custos fixos sem mes_referencia recebem o mês de criação
+
+Revision ID: d3f7a1c90b52
+Revises: a6c2e94d7b15
+Create Date: 2026-10-19 09:12:37.402915
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3f7a1c90b52'
+down_revision = 'a6c2e94d7b15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # mes_referencia vazio valia "todos os meses" e fazia meses antigos receberem
+    # os custos de hoje. Agora é o mês de criação: usa o primeiro lançamento já
+    # materializado do custo ou, sem nenhum, o mês atual.
+    op.execute(sa.text(
+        "UPDATE custos_fixos SET mes_referencia = COALESCE("
+        "(SELECT substr(CAST(MIN(transacao.data) AS VARCHAR), 1, 7) FROM transacao "
+        "WHERE transacao.custo_fixo_id = custos_fixos.id), :mes) "
+        "WHERE mes_referencia IS NULL"
+    ).bindparams(mes=datetime.now().strftime('%Y-%m')))
+
+
+def downgrade():
+    # Não há como saber quais custos estavam sem mês: o valor preenchido fica
+    pass
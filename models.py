@@ -0,0 +1,375 @@
+from datetime import datetime, timedelta, date
+from itertools import chain
+from flask_login import UserMixin
+from sqlalchemy import func, case, event
+from sqlalchemy.orm import Session
+from extensions import db, login_manager
+from dinheiro import Dinheiro, ColunaDinheiro
+
+
+# ================================
+# MODELOS
+# ================================
+class Configuracao(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    provisao_extras = db.Column(ColunaDinheiro, default=0)
+    salario_medio = db.Column(ColunaDinheiro, default=2000)
+    data_atualizacao = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ConfiguracaoFinanceira(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    meta_dizimistas = db.Column(db.Integer, nullable=False, default=0)
+    valor_meta = db.Column(ColunaDinheiro, nullable=False, default=0)
+    data_configuracao = db.Column(db.DateTime, default=datetime.utcnow)
+
+class User(UserMixin, db.Model):
+    __tablename__ = 'user'
+    id = db.Column(db.Integer, primary_key=True)
+    nome = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(100), unique=True, nullable=False)
+    senha = db.Column(db.String(200), nullable=False)
+    nivel_acesso = db.Column(db.Integer, default=2)
+    is_secretaria = db.Column(db.Boolean, default=False)
+    is_admin = db.Column(db.Boolean, default=False)
+    membro_id = db.Column(db.Integer, db.ForeignKey('membro.id', name="fk_user_membro"), nullable=True)
+    membro = db.relationship('Membro', backref='usuario', lazy=True)
+
+    def __repr__(self):
+        return f'<User {self.email} - Nível {self.nivel_acesso}>'
+
+class Membro(db.Model):
+    __tablename__ = 'membro'
+    id = db.Column(db.Integer, primary_key=True)
+    nome = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(100))
+    telefone = db.Column(db.String(20))
+    celular = db.Column(db.String(20))
+    endereco = db.Column(db.String(200))
+    cep = db.Column(db.String(10))
+    bairro = db.Column(db.String(50))
+    cidade = db.Column(db.String(50), default="São Paulo")
+    estado = db.Column(db.String(2), default="SP")
+    data_nascimento = db.Column(db.Date)
+    estado_civil = db.Column(db.String(20))
+    conjuge = db.Column(db.String(100))
+    filhos = db.Column(db.Integer, default=0)
+    batizado = db.Column(db.Boolean, default=False)
+    data_batismo = db.Column(db.Date)
+    ministerio = db.Column(db.String(100))
+    foto = db.Column(db.String(100), default='default.jpg')
+    data_cadastro = db.Column(db.DateTime, default=datetime.utcnow)
+    status = db.Column(db.String(20), default='ativo')
+    ativo = db.Column(db.Boolean, default=True)
+
+    def __repr__(self):
+        return f'<Membro {self.nome}>'
+
+class Transacao(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    tipo = db.Column(db.String(50))
+    categoria = db.Column(db.String(100))
+    valor = db.Column(ColunaDinheiro)  # centavos no banco, Dinheiro no Python
+    metodo = db.Column(db.String(20))
+    data = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # filtros por mês/ano
+    membro_id = db.Column(db.Integer, db.ForeignKey('membro.id'), nullable=True)
+    membro = db.relationship('Membro', backref='transacoes')
+    is_fixo = db.Column(db.Boolean, default=False)
+    # Lançamento gerado a partir de um custo fixo (ver recorrencia.py)
+    custo_fixo_id = db.Column(db.Integer, db.ForeignKey('custos_fixos.id', name='fk_transacao_custo_fixo',
+                                                        ondelete='SET NULL'), nullable=True)
+
+    __table_args__ = (
+        # Um lançamento por custo fixo por mês (data = dia 1º do mês)
+        db.UniqueConstraint('custo_fixo_id', 'data', name='uq_transacao_custo_fixo_data'),
+        # Recalcular o engajamento de um membro (ver recalcular_engajamento) sem varrer a tabela
+        db.Index('ix_transacao_membro_tipo_data', 'membro_id', 'tipo', 'data'),
+    )
+
+class Evento(db.Model):
+    __tablename__ = 'evento'
+    id = db.Column(db.Integer, primary_key=True)
+    titulo = db.Column(db.String(100), nullable=False)
+    descricao = db.Column(db.Text, nullable=False)
+    data = db.Column(db.Date, nullable=False)
+    imagem = db.Column(db.String(200))
+
+class Ministerio(db.Model):
+    __tablename__ = 'ministerio'
+    id = db.Column(db.Integer, primary_key=True)
+    nome = db.Column(db.String(100), nullable=False)
+    lider = db.Column(db.String(100), nullable=False)
+    descricao = db.Column(db.Text, nullable=False)
+
+    def __repr__(self):
+        return f'<Ministerio {self.nome}>'
+
+class CustoFixo(db.Model):
+    __tablename__ = 'custos_fixos'
+    id = db.Column(db.Integer, primary_key=True)
+    nome = db.Column(db.String(100), nullable=False)
+    valor = db.Column(ColunaDinheiro, nullable=False)
+    ativo = db.Column(db.Boolean, default=True)
+    replicar_mensal = db.Column(db.Boolean, default=True)
+    mes_referencia = db.Column(db.String(7))   # YYYY-MM
+
+    def __repr__(self):
+        return f"<CustoFixo {self.nome} - R$ {self.valor}>"
+
+class CustosFixosMes(db.Model):
+    """Meses cujos custos fixos já viraram transações (recorrencia.materializar_mes)."""
+    __tablename__ = 'custos_fixos_mes'
+    mes = db.Column(db.String(7), primary_key=True)  # YYYY-MM
+    materializado_em = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<CustosFixosMes {self.mes}>"
+
+class LancamentoExtrato(db.Model):
+    """Linha de extrato bancário importada, à espera ou já conciliada (ver extrato.py)."""
+    __tablename__ = 'lancamento_extrato'
+    id = db.Column(db.Integer, primary_key=True)
+    lote = db.Column(db.String(32), nullable=False, index=True)    # uma importação
+    chave = db.Column(db.String(32), nullable=False, unique=True)  # hash da linha: reimportar não duplica
+    data = db.Column(db.DateTime, nullable=False)
+    valor = db.Column(ColunaDinheiro, nullable=False)  # crédito positivo, débito negativo
+    descricao = db.Column(db.String(200))
+    nome_pagador = db.Column(db.String(100))
+    # Hash do CPF e do telefone do pagador (os números não são gravados)
+    chave_documento = db.Column(db.String(32), index=True)
+    chave_telefone = db.Column(db.String(32))
+    status = db.Column(db.String(20), nullable=False, default='pendente')  # pendente, conciliado, importado
+    transacao_id = db.Column(db.Integer, db.ForeignKey('transacao.id', name='fk_lancamento_extrato_transacao',
+                                                       ondelete='SET NULL'), index=True)
+    membro_id = db.Column(db.Integer, db.ForeignKey('membro.id', name='fk_lancamento_extrato_membro',
+                                                    ondelete='SET NULL'))
+    importado_em = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<LancamentoExtrato {self.data:%d/%m/%Y} {self.valor} {self.status}>"
+
+class InformeAnual(db.Model):
+    """Geração dos informes de contribuições de um ano para todos os membros (ver informes.py)."""
+    __tablename__ = 'informe_anual'
+    id = db.Column(db.Integer, primary_key=True)
+    ano = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pendente')  # pendente, gerando, pronto, erro
+    total = db.Column(db.Integer, default=0)    # membros com contribuição no ano
+    gerados = db.Column(db.Integer, default=0)  # PDFs já no ZIP
+    arquivo = db.Column(db.String(100))         # nome do ZIP na pasta de informes
+    duracao_ms = db.Column(db.Integer)          # tempo total da geração
+    erro = db.Column(db.Text)
+    solicitado_por = db.Column(db.Integer, db.ForeignKey('user.id', name='fk_informe_anual_usuario',
+                                                         ondelete='SET NULL'))
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow)
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<InformeAnual {self.ano} {self.status} {self.gerados}/{self.total}>"
+
+class Compromisso(db.Model):
+    __tablename__ = 'compromisso'
+    id = db.Column(db.Integer, primary_key=True)
+    titulo = db.Column(db.String(100), nullable=False)
+    descricao = db.Column(db.Text)
+    data = db.Column(db.Date, nullable=False)
+    hora = db.Column(db.String(20))
+    local = db.Column(db.String(100))
+    membro_id = db.Column(db.Integer, db.ForeignKey('membro.id'), nullable=True, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow)
+    membro = db.relationship('Membro', backref='compromissos', lazy=True)
+    user = db.relationship('User', backref='compromissos', lazy=True)
+
+    def __repr__(self):
+        return f'<Compromisso {self.titulo} - {self.data}>'
+
+# ================================
+# MODELO PARA MENSAGENS ENVIADAS
+# ================================
+class MensagemEnviada(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    tipo = db.Column(db.String(10), nullable=False)  # 'email' ou 'sms'
+    destinatario = db.Column(db.String(200), nullable=False)  # e-mail ou celular
+    assunto = db.Column(db.String(200))
+    corpo = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), default='enviado')  # enviado, erro, pendente
+    erro = db.Column(db.Text)
+    enviado_em = db.Column(db.DateTime, default=datetime.utcnow)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user = db.relationship('User', backref='mensagens_enviadas')
+
+    def __repr__(self):
+        return f"<Mensagem {self.tipo.upper()} para {self.destinatario}>"
+
+# ================================
+# MENSAGENS DO FORMULÁRIO DE CONTATO (fila de envio)
+# ================================
+class MensagemContato(db.Model):
+    __tablename__ = 'mensagem_contato'
+    id = db.Column(db.Integer, primary_key=True)
+    nome = db.Column(db.String(100))
+    email = db.Column(db.String(100))
+    mensagem = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), default='pendente', index=True)  # pendente, enviando, enviado, erro
+    tentativas = db.Column(db.Integer, default=0)
+    proxima_tentativa = db.Column(db.DateTime, default=datetime.utcnow)
+    erro = db.Column(db.Text)
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow)
+    enviado_em = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f"<MensagemContato {self.id} - {self.status}>"
+
+# ================================
+# MENSAGENS DA IA PARA AFASTADOS (cache semanal)
+# ================================
+class MensagemAfastado(db.Model):
+    __tablename__ = 'mensagem_afastado'
+    id = db.Column(db.Integer, primary_key=True)
+    membro_id = db.Column(db.Integer, db.ForeignKey('membro.id'), nullable=False, index=True)
+    semana = db.Column(db.String(8), nullable=False)  # YYYY-Www (semana ISO)
+    mensagem = db.Column(db.Text, nullable=False)
+    gerada_em = db.Column(db.DateTime, default=datetime.utcnow)
+    membro = db.relationship('Membro', backref=db.backref('mensagens_afastado', cascade='all, delete-orphan'))
+
+    __table_args__ = (
+        db.UniqueConstraint('membro_id', 'semana', name='uq_mensagem_afastado_membro_semana'),
+    )
+
+    def __repr__(self):
+        return f"<MensagemAfastado membro={self.membro_id} semana={self.semana}>"
+
+# ================================
+# ENGAJAMENTO DOS MEMBROS (índice de afastamento)
+# ================================
+TIPOS_ENTRADA = ('dizimo', 'oferta', 'doacao')
+
+class MembroEngajamento(db.Model):
+    __tablename__ = 'membro_engajamento'
+    membro_id = db.Column(db.Integer, db.ForeignKey('membro.id'), primary_key=True)
+    ultima_contribuicao = db.Column(db.DateTime)
+    ultima_presenca = db.Column(db.Date)      # último compromisso/atendimento registrado
+    ultimo_contato = db.Column(db.DateTime, index=True)  # o mais recente dos dois acima
+    contribuicoes_30d = db.Column(db.Integer, default=0)
+    contribuicoes_90d = db.Column(db.Integer, default=0)
+    valor_90d = db.Column(ColunaDinheiro, default=0)
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow)
+    membro = db.relationship('Membro', backref=db.backref('engajamento', uselist=False, cascade='all, delete-orphan'))
+
+    def __repr__(self):
+        return f"<MembroEngajamento membro={self.membro_id} ultimo_contato={self.ultimo_contato}>"
+
+def recalcular_engajamento(conn, membro_ids=None):
+    """Recalcula a tabela membro_engajamento (toda ou só para os membros informados)."""
+    agora = datetime.now()
+    d30 = agora - timedelta(days=30)
+    d90 = agora - timedelta(days=90)
+
+    q_contrib = db.select(
+        Transacao.membro_id,
+        func.max(Transacao.data),
+        func.sum(case((Transacao.data >= d30, 1), else_=0)),
+        func.sum(case((Transacao.data >= d90, 1), else_=0)),
+        func.sum(case((Transacao.data >= d90, Transacao.valor), else_=0))
+    ).where(Transacao.membro_id.isnot(None), Transacao.tipo.in_(TIPOS_ENTRADA))\
+     .group_by(Transacao.membro_id)
+    q_presenca = db.select(Compromisso.membro_id, func.max(Compromisso.data))\
+        .where(Compromisso.membro_id.isnot(None), Compromisso.data <= agora.date())\
+        .group_by(Compromisso.membro_id)
+    q_membros = db.select(Membro.id)
+    tabela = MembroEngajamento.__table__
+    apagar = tabela.delete()
+
+    if membro_ids is not None:
+        membro_ids = list(membro_ids)
+        if not membro_ids:
+            return 0
+        q_contrib = q_contrib.where(Transacao.membro_id.in_(membro_ids))
+        q_presenca = q_presenca.where(Compromisso.membro_id.in_(membro_ids))
+        q_membros = q_membros.where(Membro.id.in_(membro_ids))
+        apagar = apagar.where(tabela.c.membro_id.in_(membro_ids))
+
+    contribuicoes = {r[0]: r[1:] for r in conn.execute(q_contrib)}
+    presencas = {r[0]: r[1] for r in conn.execute(q_presenca)}
+
+    linhas = []
+    for (membro_id,) in conn.execute(q_membros):
+        ultima, qtd_30, qtd_90, valor_90 = contribuicoes.get(membro_id, (None, 0, 0, 0))
+        presenca = presencas.get(membro_id)
+        if isinstance(ultima, date) and not isinstance(ultima, datetime):
+            ultima = datetime.combine(ultima, datetime.min.time())
+        datas = [d for d in (ultima, datetime.combine(presenca, datetime.min.time()) if presenca else None) if d]
+        linhas.append({
+            'membro_id': membro_id,
+            'ultima_contribuicao': ultima,
+            'ultima_presenca': presenca,
+            'ultimo_contato': max(datas) if datas else None,
+            'contribuicoes_30d': qtd_30 or 0,
+            'contribuicoes_90d': qtd_90 or 0,
+            'valor_90d': valor_90 or Dinheiro(),
+            'atualizado_em': datetime.utcnow()
+        })
+
+    conn.execute(apagar)
+    if linhas:
+        conn.execute(tabela.insert(), linhas)
+    return len(linhas)
+
+def inserir_transacoes(linhas):
+    """Insere as transações num executemany só, sem montar objetos do ORM; retorna os ids na ordem das linhas.
+
+    Como o insert não passa pelo flush, o engajamento dos membros é recalculado
+    aqui; os caches do gráfico e do painel ficam por conta de quem faz o commit.
+    """
+    if not linhas:
+        return []
+    tabela = Transacao.__table__
+    # Os ids saem crescentes na ordem das linhas: ordenados, cada um volta para a sua linha
+    # (sort_by_parameter_order faria o SQLite inserir uma linha por vez)
+    ids = sorted(db.session.execute(tabela.insert().returning(tabela.c.id), linhas).scalars())
+    recalcular_engajamento(db.session.connection(), {l['membro_id'] for l in linhas if l.get('membro_id')})
+    return ids
+
+# Colunas que mudam o engajamento: editar a descrição de uma transação, por
+# exemplo, não recalcula nada
+CAMPOS_ENGAJAMENTO = {
+    Transacao: ('membro_id', 'data', 'tipo', 'valor'),
+    Compromisso: ('membro_id', 'data'),
+}
+
+def _membros_afetados(session):
+    ids = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        campos = CAMPOS_ENGAJAMENTO.get(type(obj))
+        if campos is None:
+            continue
+        estado = db.inspect(obj)
+        if estado.persistent and obj not in session.deleted \
+                and not any(estado.attrs[c].history.has_changes() for c in campos):
+            continue
+        if obj.membro_id:
+            ids.add(obj.membro_id)
+        # membro anterior, se a transação/compromisso trocou de membro
+        ids.update(i for i in estado.attrs.membro_id.history.deleted if i)
+    return ids
+
+@event.listens_for(Session, 'before_flush')
+def _marcar_engajamento(session, flush_context, instances):
+    # Flushes sem Transacao/Compromisso (a maioria) saem sem consultar nada
+    ids = _membros_afetados(session)
+    if ids:
+        session.info.setdefault('engajamento_pendente', set()).update(ids)
+
+@event.listens_for(Session, 'after_flush_postexec')
+def _atualizar_engajamento(session, flush_context):
+    ids = session.info.pop('engajamento_pendente', None)
+    if ids:
+        recalcular_engajamento(session.connection(), ids)
+
+# ================================
+# LOGIN
+# ================================
+@login_manager.user_loader
+def load_user(user_id):
+    return User.query.get(int(user_id))
+
@@ -0,0 +1,104 @@
+import os
+import unicodedata
+from itertools import chain
+from threading import Lock
+from cachetools import TTLCache
+from flask import url_for
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from extensions import db
+from models import Membro, Ministerio
+
+# ================================
+# OPÇÕES DOS SELECTS (membros e ministérios)
+# ================================
+# Só (id, nome), sem carregar objetos do ORM, e em cache até alguém gravar um
+# membro/ministério neste worker (nos outros, até vencer o TTL).
+OPCOES_TTL = int(os.getenv("OPCOES_TTL", 300))
+# Acima disso o select de membros vai vazio para o HTML e é preenchido pela busca
+LIMITE_SELECT = int(os.getenv("OPCOES_LIMITE_SELECT", 300))
+
+_cache = TTLCache(maxsize=2, ttl=OPCOES_TTL)
+_lock = Lock()
+
+
+def normalizar(texto):
+    """Minúsculas e sem acentos, para a busca ("jose" encontra "José")."""
+    return unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode().lower()
+
+def _membros():
+    with _lock:
+        dados = _cache.get('membros')
+    if dados is None:
+        opcoes = [tuple(r) for r in db.session.execute(select(Membro.id, Membro.nome).order_by(Membro.nome))]
+        dados = {
+            'opcoes': opcoes,
+            'nomes': dict(opcoes),
+            'busca': [(normalizar(nome), id, nome) for id, nome in opcoes],
+        }
+        with _lock:
+            _cache['membros'] = dados
+    return dados
+
+def opcoes_membros():
+    """Lista [(id, nome)] ordenada por nome."""
+    return _membros()['opcoes']
+
+def opcoes_ministerios():
+    with _lock:
+        opcoes = _cache.get('ministerios')
+    if opcoes is None:
+        opcoes = [nome for (nome,) in db.session.execute(select(Ministerio.nome).order_by(Ministerio.nome))]
+        with _lock:
+            _cache['ministerios'] = opcoes
+    return opcoes
+
+def nome_membro(membro_id):
+    return _membros()['nomes'].get(membro_id)
+
+def buscar_membros(termo, limite=20):
+    """Membros cujo nome contém o termo; os que começam com ele vêm primeiro."""
+    termo = normalizar(termo).strip()
+    if not termo:
+        return []
+    inicio, meio = [], []
+    for nome_normalizado, id, nome in _membros()['busca']:
+        posicao = nome_normalizado.find(termo)
+        if posicao == 0:
+            inicio.append((id, nome))
+        elif posicao > 0:
+            meio.append((id, nome))
+        if len(inicio) >= limite:
+            break
+    return (inicio + meio)[:limite]
+
+def muitos_membros():
+    return len(opcoes_membros()) > LIMITE_SELECT
+
+def preparar_select_membro(campo, nenhum="-- Nenhum --"):
+    """Preenche um SelectField de membros; com muitos membros, só a opção atual vai no HTML."""
+    if not muitos_membros():
+        campo.choices = [(0, nenhum)] + opcoes_membros()
+        return
+    atual = nome_membro(campo.data)
+    campo.choices = [(0, nenhum)] + ([(campo.data, atual)] if atual else [])
+    campo.render_kw = {**(campo.render_kw or {}), 'data-autocomplete': url_for('secretaria.buscar_membros_json')}
+
+def invalidar_opcoes():
+    with _lock:
+        _cache.clear()
+
+
+@event.listens_for(Session, 'before_flush')
+def _marcar_opcoes(session, flush_context, instances):
+    if any(isinstance(obj, (Membro, Ministerio)) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info['opcoes_alteradas'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _invalidar_apos_commit(session):
+    if session.info.pop('opcoes_alteradas', False):
+        invalidar_opcoes()
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_marcacao(session):
+    session.info.pop('opcoes_alteradas', None)
@@ -0,0 +1,85 @@
+import os
+from datetime import date
+from itertools import chain
+from threading import Lock
+from cachetools import TTLCache
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+from extensions import db
+from models import Membro, Transacao, Evento, Ministerio, Compromisso, MensagemEnviada
+
+# ================================
+# ESTATÍSTICAS DOS DASHBOARDS (/secretaria e /lea)
+# ================================
+# Um único snapshot atende os dois dashboards. Fica em cache por PAINEL_TTL
+# segundos e é descartado quando este worker grava algum dos modelos abaixo;
+# nos outros workers do gunicorn a mudança aparece quando o TTL vence.
+PAINEL_TTL = int(os.getenv("PAINEL_TTL", 60))
+MODELOS_PAINEL = (Membro, Transacao, Evento, Ministerio, Compromisso, MensagemEnviada)
+
+_cache = TTLCache(maxsize=4, ttl=PAINEL_TTL)  # chave: data de hoje (compromissos do dia)
+_lock = Lock()
+
+
+def _contagem(modelo, *filtros):
+    return select(func.count()).select_from(modelo).where(*filtros).scalar_subquery()
+
+def _calcular(hoje):
+    # Todos os totais numa ida só ao banco
+    totais = db.session.execute(select(
+        _contagem(Membro).label('membros'),
+        _contagem(Evento).label('eventos'),
+        _contagem(Ministerio).label('ministerios'),
+        _contagem(Compromisso, Compromisso.data == hoje).label('compromissos_hoje'),
+        _contagem(MensagemEnviada).label('mensagens_enviadas'),
+        select(func.coalesce(func.sum(Transacao.valor), 0)).scalar_subquery().label('transacoes_total'),
+    )).one()
+
+    eventos = db.session.execute(
+        select(Evento.id, Evento.titulo, Evento.data, Evento.descricao)
+        .order_by(Evento.data.desc()).limit(5)
+    ).all()
+    compromissos = db.session.execute(
+        select(Compromisso.id, Compromisso.titulo, Compromisso.data, Compromisso.descricao)
+        .where(Compromisso.data >= hoje).order_by(Compromisso.data.asc()).limit(5)
+    ).all()
+
+    def item(linha):
+        return {'id': linha.id, 'titulo': linha.titulo, 'data': linha.data.isoformat(),
+                'descricao': (linha.descricao or '')[:80]}
+
+    return {
+        **totais._asdict(),
+        'transacoes_total': float(totais.transacoes_total),
+        'eventos_recentes': [item(e) for e in eventos],
+        'compromissos_proximos': [item(c) for c in compromissos],
+    }
+
+def estatisticas_painel():
+    hoje = date.today()
+    with _lock:
+        snapshot = _cache.get(hoje)
+    if snapshot is None:
+        snapshot = _calcular(hoje)
+        with _lock:
+            _cache[hoje] = snapshot
+    return snapshot
+
+def invalidar_painel():
+    with _lock:
+        _cache.clear()
+
+
+@event.listens_for(Session, 'before_flush')
+def _marcar_painel(session, flush_context, instances):
+    if any(isinstance(obj, MODELOS_PAINEL) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info['painel_alterado'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _invalidar_apos_commit(session):
+    if session.info.pop('painel_alterado', False):
+        invalidar_painel()
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_marcacao(session):
+    session.info.pop('painel_alterado', None)
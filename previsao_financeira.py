@@ -0,0 +1,417 @@
+import os
+import time
+import tempfile
+from datetime import date
+from itertools import chain
+from statistics import NormalDist
+from threading import Lock
+import numpy as np
+import pandas as pd
+from sqlalchemy import BigInteger, event, select, type_coerce
+from sqlalchemy.orm import Session
+from extensions import db
+from models import Membro, Transacao, TIPOS_ENTRADA
+from retrato_financeiro import RETRATO_LOTE, dia_numero, dia_do_mes, mes_numero
+
+# ================================
+# PREVISÃO E ANOMALIAS DAS ENTRADAS E SAÍDAS
+# ================================
+# O histórico fica em memória (por worker) como totais por dia x tipo (valor e
+# quantidade de lançamentos) e por mês x (tipo, categoria). Só a primeira
+# chamada lê a tabela inteira; depois são lidas apenas as transações com id
+# maior que o último já somado. A previsão e as anomalias usam só os últimos
+# PREVISAO_JANELA_MESES meses desses totais, então o custo não cresce com o
+# histórico.
+#
+# Previsão de cada tipo, mês a mês: (a + b*mês) * sazonal[mês do ano] * composição,
+# em que a composição é o quanto se espera do mês pelos dias da semana que ele
+# tem (um mês com cinco domingos rende mais) e a sazonalidade só entra com dois
+# anos de histórico. A faixa é de CONFIANCA_FAIXA pelo desvio dos resíduos.
+#
+# Edições e exclusões de transações (eventos da sessão, como em
+# resumo_financeiro.py) trocam um arquivo de versão compartilhado pelos workers,
+# como o de cache_paginas.py; cada chamada só confere o stat dele e refaz o
+# histórico quando mudou. Alterações feitas direto no banco, sem passar pelo
+# app, entram no máximo em PREVISAO_MAX_IDADE, ou na hora com
+# `flask invalidar-previsao`.
+PREVISAO_MAX_IDADE = int(os.getenv('PREVISAO_MAX_IDADE', 3600))  # segundos
+PASTA_PREVISAO = os.getenv('PREVISAO_DIR', os.path.join(tempfile.gettempdir(), 'combave-previsao'))
+_ARQUIVO_VERSAO = os.path.join(PASTA_PREVISAO, 'versao')
+PREVISAO_JANELA_MESES = 36   # meses completos usados no ajuste
+PREVISAO_MAX_MESES = 12      # meses à frente
+PREVISAO_ANOMALIAS_DIAS = 90
+PREVISAO_LIMIAR = 4.0        # desvios robustos (1,4826 x MAD) para marcar uma anomalia
+CONFIANCA_FAIXA = 0.8
+DIAS_SEMANA = ('segunda', 'terça', 'quarta', 'quinta', 'sexta', 'sábado', 'domingo')
+
+
+def dia_da_semana(dias):
+    """Dias desde 1970 -> 0 = segunda ... 6 = domingo (1970-01-01 foi uma quinta)."""
+    return (np.asarray(dias) + 3) % 7
+
+def nome_mes(numero):
+    return f"{1970 + numero // 12}-{numero % 12 + 1:02d}"
+
+def _codigos(nomes, valores):
+    """Índice de cada valor na lista nomes, que recebe os valores ainda não vistos."""
+    indice = {nome: i for i, nome in enumerate(nomes)}
+    unicos, inverso = np.unique(np.asarray(valores, dtype=str), return_inverse=True)
+    for nome in unicos.tolist():
+        if nome not in indice:
+            indice[nome] = len(nomes)
+            nomes.append(nome)
+    return np.array([indice[nome] for nome in unicos.tolist()], dtype=np.intp)[inverso]
+
+def _ampliar(matriz, origem, nova_origem, linhas, colunas):
+    """matriz copiada numa maior cuja linha 0 corresponde a nova_origem."""
+    nova = np.zeros((linhas, colunas), dtype=matriz.dtype)
+    desloc = 0 if origem is None else origem - nova_origem
+    nova[desloc:desloc + matriz.shape[0], :matriz.shape[1]] = matriz
+    return nova
+
+def _escala_robusta(referencia, piso):
+    """(mediana, escala) ao longo do eixo 0; a escala nunca fica abaixo de piso."""
+    mediana = np.median(referencia, axis=0)
+    mad = np.median(np.abs(referencia - mediana), axis=0)
+    return mediana, np.maximum(1.4826 * mad, np.maximum(0.25 * np.abs(mediana), piso))
+
+
+class Historico:
+    """Totais acumulados das transações já lidas do banco (centavos em float64: exato até 2**53)."""
+
+    def __init__(self, versao=None):
+        self.criado_em = time.time()
+        self.versao = versao                      # de _versao() antes da primeira leitura
+        self.ultimo_id = 0
+        self.linhas = 0
+        self.dia0 = self.mes0 = None
+        self.tipos, self.chaves = [], []          # chaves: "tipo\tcategoria"
+        self.valores = np.zeros((0, 0))           # [dia - dia0, tipo]
+        self.quantidades = np.zeros((0, 0), np.int64)
+        self.categorias = np.zeros((0, 0))        # [mês - mes0, chave]
+        self.recentes = np.zeros((0, 4), np.int64)  # [dia, membro_id, tipo, centavos] com membro, últimos dias
+
+    @property
+    def idade(self):
+        return time.time() - self.criado_em
+
+    def acrescentar(self, df):
+        """Soma as transações do DataFrame (colunas de _ler) aos totais."""
+        if df.empty:
+            return
+        datas = pd.to_datetime(df['data']).to_numpy(dtype='datetime64[D]')
+        dias = datas.astype(np.int64)
+        meses = datas.astype('datetime64[M]').astype(np.int64)
+        centavos = df['centavos'].to_numpy(dtype=np.float64)
+        tipos = df['tipo'].fillna('').astype(str)
+        tipo = _codigos(self.tipos, tipos)
+        chave = _codigos(self.chaves, tipos + '\t' + df['categoria'].fillna('').astype(str))
+
+        # Cresce as matrizes para os dias/meses e colunas novos (inclusive lançamentos retroativos)
+        dia0 = int(dias.min()) if self.dia0 is None else min(self.dia0, int(dias.min()))
+        fim = max(int(dias.max()) + 1, dia0 + self.valores.shape[0])
+        if (dia0, fim - dia0, len(self.tipos)) != (self.dia0, *self.valores.shape):
+            self.valores = _ampliar(self.valores, self.dia0, dia0, fim - dia0, len(self.tipos))
+            self.quantidades = _ampliar(self.quantidades, self.dia0, dia0, fim - dia0, len(self.tipos))
+        mes0 = int(meses.min()) if self.mes0 is None else min(self.mes0, int(meses.min()))
+        fim_mes = max(int(meses.max()) + 1, mes0 + self.categorias.shape[0])
+        if (mes0, fim_mes - mes0, len(self.chaves)) != (self.mes0, *self.categorias.shape):
+            self.categorias = _ampliar(self.categorias, self.mes0, mes0, fim_mes - mes0, len(self.chaves))
+        self.dia0, self.mes0 = dia0, mes0
+
+        indices = (dias - dia0) * len(self.tipos) + tipo
+        self.valores += np.bincount(indices, centavos, self.valores.size).reshape(self.valores.shape)
+        self.quantidades += np.bincount(indices, minlength=self.quantidades.size).reshape(self.quantidades.shape)
+        indices = (meses - mes0) * len(self.chaves) + chave
+        self.categorias += np.bincount(indices, centavos, self.categorias.size).reshape(self.categorias.shape)
+        self.ultimo_id = max(self.ultimo_id, int(df['id'].max()))
+        self.linhas += len(df)
+
+        # Lançamentos recentes com membro, para achar duplicados sem voltar ao banco
+        limite = dia_numero(date.today()) - PREVISAO_ANOMALIAS_DIAS
+        membros = df['membro_id'].fillna(0).to_numpy(dtype=np.int64)
+        novos = np.column_stack([dias, membros, tipo, df['centavos'].to_numpy(dtype=np.int64)])
+        self.recentes = np.concatenate([self.recentes[self.recentes[:, 0] >= limite],
+                                        novos[(membros > 0) & (dias >= limite)]])
+
+    def dias(self, matriz, inicio, fim):
+        """Linhas de valores/quantidades dos dias [inicio, fim), com zeros fora do histórico."""
+        saida = np.zeros((fim - inicio, matriz.shape[1]), matriz.dtype)
+        if self.dia0 is not None:
+            a, b = max(inicio, self.dia0), min(fim, self.dia0 + matriz.shape[0])
+            if a < b:
+                saida[a - inicio:b - inicio] = matriz[a - self.dia0:b - self.dia0]
+        return saida
+
+    def meses_categoria(self, inicio, fim):
+        """Totais por (tipo, categoria) dos meses [inicio, fim), com zeros fora do histórico."""
+        saida = np.zeros((fim - inicio, self.categorias.shape[1]))
+        if self.mes0 is not None:
+            a, b = max(inicio, self.mes0), min(fim, self.mes0 + self.categorias.shape[0])
+            if a < b:
+                saida[a - inicio:b - inicio] = self.categorias[a - self.mes0:b - self.mes0]
+        return saida
+
+    def duplicados(self, inicio):
+        """(linhas [dia, membro_id, tipo, centavos], vezes) lançadas mais de uma vez desde o dia inicio."""
+        linhas, vezes = np.unique(self.recentes[self.recentes[:, 0] >= inicio], axis=0, return_counts=True)
+        return linhas[vezes > 1], vezes[vezes > 1]
+
+    def semanas(self, matriz, fim, maximo=52):
+        """[semana, dia da semana, tipo] das últimas semanas completas antes de fim
+        (só as que o histórico cobre; no máximo `maximo`)."""
+        n = 0 if self.dia0 is None else max(0, min(maximo, (fim - self.dia0) // 7))
+        bloco = self.dias(matriz, fim - 7 * n, fim).reshape(n, 7, matriz.shape[1])
+        # Linha k do bloco cai no dia da semana (fim + k + 3) % 7
+        return np.roll(bloco, int(dia_da_semana(fim)), axis=1)
+
+
+# ================================
+# PREVISÃO
+# ================================
+def _reta(x, y):
+    """Coeficientes (b, a) de y = a + b*x por coluna; com menos de 3 pontos, só a média."""
+    if len(x) >= 3:
+        return np.polyfit(x, y, 1)
+    return np.zeros(y.shape[1]), (y.mean(axis=0) if len(x) else np.zeros(y.shape[1]))
+
+def _ajustar(y, composicao, mes_do_ano):
+    """(a + b*mês) * sazonal[mês do ano] * composição ajustado aos n meses de y, para todos os meses."""
+    n = len(y)
+    base = np.divide(y, composicao[:n], out=y.copy(), where=composicao[:n] > 0)
+    x = np.arange(len(composicao), dtype=float)
+    sazonal = np.ones((12, y.shape[1]))
+    if n >= 24:
+        b, a = _reta(x[:n], base)
+        nivel = a + b * x[:n, None]
+        razao = np.divide(base, nivel, out=np.ones_like(base), where=nivel > 0)
+        soma = np.zeros_like(sazonal)
+        np.add.at(soma, mes_do_ano[:n], razao)
+        sazonal = soma / np.bincount(mes_do_ano[:n], minlength=12)[:, None]
+        media = sazonal.mean(axis=0)
+        sazonal = np.divide(sazonal, media, out=np.ones_like(sazonal), where=media > 0)
+    b, a = _reta(x[:n], base / sazonal[mes_do_ano[:n]])
+    return np.maximum(a + b * x[:, None], 0) * sazonal[mes_do_ano] * composicao
+
+def prever(h, hoje, meses=6):
+    """Totais mensais previstos (centavos) para cada tipo: mês atual e os seguintes."""
+    atual = mes_numero(hoje.year, hoje.month)
+    primeiro = atual
+    if h.mes0 is not None:
+        # O primeiro mês do histórico só conta se começou no dia 1º
+        primeiro = min(atual, max(atual - PREVISAO_JANELA_MESES, h.mes0 + (h.dia0 > dia_do_mes(h.mes0))))
+    n, total = atual - primeiro, atual - primeiro + meses
+    nt = len(h.tipos)
+    inicio, fim_hist = dia_do_mes(primeiro), dia_do_mes(atual)
+    dias = np.arange(inicio, dia_do_mes(atual + meses))
+    mes_do_dia = dias.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64) - primeiro
+
+    y = np.zeros((n, nt))
+    np.add.at(y, mes_do_dia[:fim_hist - inicio], h.dias(h.valores, inicio, fim_hist))
+
+    # Composição: quanto cada mês rende pelos dias da semana que tem, segundo o último ano
+    semanas = h.semanas(h.valores, fim_hist)
+    perfil = semanas.mean(axis=0) if len(semanas) else np.ones((7, nt))
+    esperado = np.zeros((total, nt))
+    np.add.at(esperado, mes_do_dia, perfil[dia_da_semana(dias)])
+    media = esperado[:n].mean(axis=0) if n else esperado.mean(axis=0)
+    composicao = np.divide(esperado, media, out=np.ones_like(esperado), where=media > 0)
+
+    # Contas mensais (aluguel, por exemplo) não dependem dos dias da semana: cada tipo
+    # fica com o ajuste, com ou sem a composição, de menor erro no histórico
+    mes_do_ano = (primeiro + np.arange(total)) % 12
+    com, sem = _ajustar(y, composicao, mes_do_ano), _ajustar(y, np.ones_like(composicao), mes_do_ano)
+    erro_com, erro_sem = ((y - com[:n]) ** 2).sum(axis=0), ((y - sem[:n]) ** 2).sum(axis=0)
+    ajuste = np.where(erro_com <= erro_sem, com, sem)
+    desvio = np.sqrt(np.minimum(erro_com, erro_sem) / max(n - 2, 1))
+    return {'primeiro': primeiro, 'meses_ajuste': n, 'sazonal': n >= 24, 'historico': y,
+            'previsao': ajuste[n:], 'desvio': desvio}
+
+def _reais(centavos):
+    return (np.rint(centavos) / 100).tolist()
+
+def _grupo(h, ajuste, tipos, z):
+    """Histórico e previsão somados sobre os tipos (desvios somados como independentes)."""
+    codigos = [i for i, tipo in enumerate(h.tipos) if tipo in tipos]
+    valor = ajuste['previsao'][:, codigos].sum(axis=1)
+    margem = z * np.sqrt((ajuste['desvio'][codigos] ** 2).sum())
+    return {
+        'historico': _reais(ajuste['historico'][-12:, codigos].sum(axis=1)),
+        'previsao': _reais(valor),
+        'minimo': _reais(np.maximum(valor - margem, 0)),
+        'maximo': _reais(valor + margem),
+    }
+
+
+# ================================
+# ANOMALIAS
+# ================================
+def anomalias(h, hoje, dias=PREVISAO_ANOMALIAS_DIAS):
+    """Dias e categorias fora do padrão nos últimos `dias` dias, do mais recente ao mais antigo."""
+    achados = []
+    fim = dia_numero(hoje)  # o dia de hoje ainda está em andamento
+    inicio = fim if h.dia0 is None else max(fim - dias, h.dia0)
+    entradas = [i for i, tipo in enumerate(h.tipos) if tipo in TIPOS_ENTRADA]
+    ref_v, ref_q = h.semanas(h.valores, inicio), h.semanas(h.quantidades, inicio)
+    if len(ref_q) >= 8 and inicio < fim:
+        janela = np.arange(inicio, fim)
+        semana = dia_da_semana(janela)
+        valores, quantidades = h.dias(h.valores, inicio, fim), h.dias(h.quantidades, inicio, fim)
+
+        # Picos (lançamentos em dobro, por exemplo): quantidade e valor acima do normal
+        # para aquele dia da semana, ao mesmo tempo
+        med_q, escala_q = _escala_robusta(ref_q, np.maximum(ref_q.mean(axis=(0, 1)), 1))
+        med_v, escala_v = _escala_robusta(ref_v, np.maximum(ref_v.mean(axis=(0, 1)), 100))
+        z_q = (quantidades - med_q[semana]) / escala_q[semana]
+        z_v = (valores - med_v[semana]) / escala_v[semana]
+        for d, t in zip(*np.nonzero((z_q > PREVISAO_LIMIAR) & (z_v > PREVISAO_LIMIAR))):
+            achados.append({
+                'tipo': 'pico', 'data': str(np.datetime64(int(janela[d]), 'D')), 'categoria': h.tipos[t],
+                'descricao': f"{int(quantidades[d, t])} lançamentos de {h.tipos[t]} "
+                             f"(o normal é {med_q[semana[d], t]:g})",
+                'valor': round(float(valores[d, t]) / 100, 2), 'esperado': round(float(med_v[semana[d], t]) / 100, 2),
+            })
+
+        # Dias da semana que quase sempre têm entradas (os cultos) e ficaram sem nenhuma
+        costuma = (ref_q[:, :, entradas].sum(axis=2) > 0).mean(axis=0) >= 0.75
+        vazio = costuma[semana] & (quantidades[:, entradas].sum(axis=1) == 0)
+        media_dia = ref_v[:, :, entradas].sum(axis=2).mean(axis=0)
+        for d in np.flatnonzero(vazio):
+            achados.append({
+                'tipo': 'sem_entradas', 'data': str(np.datetime64(int(janela[d]), 'D')), 'categoria': None,
+                'descricao': f"Nenhuma entrada lançada ({DIAS_SEMANA[semana[d]]})",
+                'valor': 0.0, 'esperado': round(float(media_dia[semana[d]]) / 100, 2),
+            })
+
+    # Categorias do último mês completo comparadas com os 12 anteriores
+    atual = mes_numero(hoje.year, hoje.month)
+    if h.mes0 is not None and h.mes0 <= atual - 7:
+        bloco = h.meses_categoria(max(atual - 13, h.mes0), atual)
+        med, escala = _escala_robusta(bloco[:-1], 10000)
+        z = (bloco[-1] - med) / escala
+        for c in np.flatnonzero(np.abs(z) > PREVISAO_LIMIAR):
+            tipo, categoria = h.chaves[c].split('\t', 1)
+            achados.append({
+                'tipo': 'categoria', 'data': nome_mes(atual - 1), 'categoria': categoria or '(sem categoria)',
+                'descricao': f"{tipo}: {'acima' if z[c] > 0 else 'abaixo'} do normal dos últimos meses",
+                'valor': round(float(bloco[-1, c]) / 100, 2), 'esperado': round(float(med[c]) / 100, 2),
+            })
+
+    # Mesmo membro, tipo e valor mais de uma vez no mesmo dia (inclusive hoje)
+    linhas, vezes = h.duplicados(dia_numero(hoje) - dias)
+    nomes = {}
+    if len(linhas):
+        ids = set(linhas[:, 1].tolist())
+        nomes = dict(db.session.execute(select(Membro.id, Membro.nome).where(Membro.id.in_(ids))).all())
+    for (dia, membro_id, t, centavos), n in zip(linhas.tolist(), vezes.tolist()):
+        achados.append({
+            'tipo': 'duplicado', 'data': str(np.datetime64(dia, 'D')), 'categoria': h.tipos[t],
+            'descricao': f"{nomes.get(membro_id, f'Membro #{membro_id}')}: {n} lançamentos iguais de {h.tipos[t]}",
+            'valor': centavos * n / 100, 'esperado': centavos / 100,
+        })
+    return sorted(achados, key=lambda a: a['data'], reverse=True)
+
+
+# ================================
+# HISTÓRICO INCREMENTAL
+# ================================
+_lock = Lock()
+_historico = None  # Historico deste worker
+
+def _ler(desde_id=0):
+    """DataFrame (id, data, centavos, tipo, categoria, membro_id) das transações com id > desde_id."""
+    t = Transacao.__table__
+    consulta = select(t.c.id, t.c.data, type_coerce(t.c.valor, BigInteger).label('centavos'), t.c.tipo,
+                      t.c.categoria, t.c.membro_id)\
+        .where(t.c.id > desde_id, t.c.data.isnot(None), t.c.valor.isnot(None))
+    resultado = db.session.execute(consulta.execution_options(yield_per=RETRATO_LOTE))
+    partes = [pd.DataFrame(parte, columns=list(resultado.keys())) for parte in resultado.partitions()]
+    if not partes:
+        return pd.DataFrame(columns=list(resultado.keys()))
+    return pd.concat(partes, ignore_index=True)
+
+def _versao():
+    """(inode, mtime) do arquivo de versão, que muda a cada edição ou exclusão de transação."""
+    try:
+        st = os.stat(_ARQUIVO_VERSAO)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns
+
+def _publicar_versao():
+    os.makedirs(PASTA_PREVISAO, exist_ok=True)
+    temporario = f"{_ARQUIVO_VERSAO}.{os.getpid()}"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        f.write(str(time.time_ns()))
+    os.replace(temporario, _ARQUIVO_VERSAO)  # inode novo: os outros workers notam pelo stat
+
+def atualizar_historico():
+    """(Historico com as transações novas já somadas, transações lidas, se foi refeito do zero)."""
+    global _historico
+    with _lock:
+        h = _historico
+        versao = _versao()
+        completo = h is None or h.idade > PREVISAO_MAX_IDADE or h.versao != versao
+        if completo:
+            h = Historico(versao)
+        novas = _ler(h.ultimo_id)
+        h.acrescentar(novas)
+        _historico = h
+        return h, len(novas), completo
+
+def invalidar_previsao():
+    """Descarta o histórico deste worker e, pelo arquivo de versão, o dos demais."""
+    global _historico
+    _publicar_versao()
+    with _lock:
+        _historico = None
+
+
+@event.listens_for(Session, 'before_flush')
+def _marcar_previsao(session, flush_context, instances):
+    # Inserções entram pelo id; só edições e exclusões obrigam a refazer
+    if any(isinstance(obj, Transacao) for obj in chain(session.dirty, session.deleted)):
+        session.info['previsao_alterada'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _invalidar_apos_commit(session):
+    if session.info.pop('previsao_alterada', False):
+        invalidar_previsao()
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_marcacao(session):
+    session.info.pop('previsao_alterada', None)
+
+
+def analisar(hoje, meses=6):
+    """Previsão de entradas e saídas para `meses` meses (a partir do mês de hoje) e anomalias recentes."""
+    if not 1 <= meses <= PREVISAO_MAX_MESES:
+        raise ValueError(f"meses deve estar entre 1 e {PREVISAO_MAX_MESES}")
+    t = time.perf_counter()
+    h, novas, completo = atualizar_historico()
+    with _lock:  # outra requisição pode estar ampliando as matrizes
+        ajuste = prever(h, hoje, meses)
+        z = NormalDist().inv_cdf(0.5 + CONFIANCA_FAIXA / 2)
+        atual = mes_numero(hoje.year, hoje.month)
+        realizado = h.dias(h.valores, dia_do_mes(atual), dia_numero(hoje) + 1).sum(axis=0)
+        por_tipo = {tipo: {'historico': _reais(ajuste['historico'][-12:, i]),
+                           'previsao': _reais(ajuste['previsao'][:, i])}
+                    for i, tipo in enumerate(h.tipos) if tipo in TIPOS_ENTRADA + ('despesa',)}
+        despesa = [i for i, tipo in enumerate(h.tipos) if tipo == 'despesa']
+        entradas = [i for i, tipo in enumerate(h.tipos) if tipo in TIPOS_ENTRADA]
+        resultado = {
+            'meses_historico': [nome_mes(m) for m in range(max(ajuste['primeiro'], atual - 12), atual)],
+            'meses_previsao': [nome_mes(atual + i) for i in range(meses)],
+            'entradas': _grupo(h, ajuste, TIPOS_ENTRADA, z),
+            'saidas': _grupo(h, ajuste, ('despesa',), z),
+            'por_tipo': por_tipo,
+            'mes_atual': {'entradas': float(realizado[entradas].sum()) / 100,
+                          'saidas': float(realizado[despesa].sum()) / 100},
+            'meses_ajuste': ajuste['meses_ajuste'],
+            'sazonal': ajuste['sazonal'],
+            'confianca': CONFIANCA_FAIXA,
+            'anomalias': anomalias(h, hoje),
+        }
+    resultado['atualizacao'] = {'transacoes': h.linhas, 'novas': novas, 'completa': completo,
+                                'tempo_ms': round((time.perf_counter() - t) * 1000, 1)}
+    return resultado
@@ -0,0 +1,88 @@
+from datetime import date
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models import Transacao, CustoFixo, CustosFixosMes
+from utils import intervalo_periodo
+
+# ================================
+# CUSTOS FIXOS RECORRENTES
+# ================================
+# Cada custo fixo vira uma transação (despesa, is_fixo) com data no dia 1º do
+# mês. Isso acontece uma vez por mês: pelo comando agendado `flask
+# materializar-custos-fixos`, ao criar/editar um custo ou pelo botão do
+# financeiro (nunca numa simples visita ao /financeiro). Depois disso o mês é um
+# fato gravado: editar ou desativar um custo vale dali em diante e não reescreve
+# meses anteriores. Meses futuros só são materializados quando chegam.
+#
+# Quais custos entram em cada mês (mes_referencia é o mês de criação):
+#   replicar_mensal  -> todo mês a partir de mes_referencia, nunca antes
+#   não replicar     -> só no mes_referencia
+METODO_CUSTO_FIXO = 'fixo'
+
+
+def mes_atual():
+    return date.today().strftime('%Y-%m')
+
+def custo_aplica(custo, mes):
+    if not custo.ativo or not custo.mes_referencia:
+        return False
+    if custo.replicar_mensal:
+        return custo.mes_referencia <= mes
+    return custo.mes_referencia == mes
+
+def mes_pendente(mes):
+    """O mês (YYYY-MM) é o atual e seus custos fixos ainda não foram lançados?"""
+    return mes == mes_atual() and db.session.get(CustosFixosMes, mes) is None
+
+def materializar_mes(mes, sincronizar=False):
+    """Grava as transações dos custos fixos do mês (YYYY-MM); idempotente.
+
+    Sem `sincronizar`, um mês já materializado custa uma consulta pela chave.
+    Com `sincronizar` (usado depois de criar/editar custos, só para o mês atual),
+    inclui os custos que faltam e atualiza nome/valor dos que já foram lançados.
+    Retorna quantas transações foram criadas.
+    """
+    if mes > mes_atual():
+        return 0
+    if not sincronizar and db.session.get(CustosFixosMes, mes):
+        return 0
+
+    inicio, fim = intervalo_periodo(mes=mes)
+    # (pelo mês inteiro: a data do lançamento pode ter sido editada na tabela)
+    lancados = {t.custo_fixo_id: t for t in db.session.scalars(
+        select(Transacao).where(Transacao.data >= inicio, Transacao.data < fim, Transacao.custo_fixo_id.isnot(None))
+    )}
+    novos = []
+    for custo in db.session.scalars(select(CustoFixo).where(CustoFixo.ativo.is_(True))):
+        if not custo_aplica(custo, mes):
+            continue
+        transacao = lancados.get(custo.id)
+        if transacao is None:
+            novos.append(Transacao(tipo='despesa', categoria=custo.nome, valor=custo.valor,
+                                   metodo=METODO_CUSTO_FIXO, data=inicio, is_fixo=True,
+                                   custo_fixo_id=custo.id))
+        elif sincronizar:
+            transacao.categoria, transacao.valor = custo.nome, custo.valor
+
+    db.session.add_all(novos)
+    if db.session.get(CustosFixosMes, mes) is None:
+        db.session.add(CustosFixosMes(mes=mes))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Outro worker materializou o mesmo mês ao mesmo tempo
+        db.session.rollback()
+        return 0
+    return len(novos)
+
+def materializar_periodo(desde, ate=None):
+    """Materializa todos os meses de `desde` até `ate` (padrão: mês atual). Retorna {mês: criadas}."""
+    ate = min(ate or mes_atual(), mes_atual())
+    ano, mes = map(int, desde.split('-'))
+    criadas = {}
+    while f"{ano}-{mes:02d}" <= ate:
+        chave = f"{ano}-{mes:02d}"
+        criadas[chave] = materializar_mes(chave)
+        ano, mes = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+    return criadas
@@ -0,0 +1,138 @@
+import os
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from itertools import chain
+from threading import Lock
+from cachetools import TTLCache
+from sqlalchemy import and_, case, event, func, select
+from sqlalchemy.orm import Session
+from extensions import db
+from dinheiro import Dinheiro
+from models import Transacao, Configuracao, TIPOS_ENTRADA
+from utils import gerar_dados_grafico
+
+# ================================
+# RESUMO FINANCEIRO (KPIs do /financeiro)
+# ================================
+# Todos os totais do período saem de uma única consulta de agregação (SUM com
+# CASE WHEN, que usa o índice de transacao.data) e de uma leitura da
+# configuração; nenhuma transação vira objeto do ORM. O tempo não depende de
+# quantas transações o mês tem. Os custos fixos entram como as transações que
+# recorrencia.materializar_mes() lança no mês, sem consultar custos_fixos aqui.
+SALARIO_MEDIO_PADRAO = Dinheiro.de_reais(2000)
+PERCENTUAL_DIZIMO = Decimal('0.10')
+
+
+def _soma_se(condicao):
+    return func.coalesce(func.sum(case((condicao, Transacao.valor), else_=0)), 0)
+
+
+@dataclass(frozen=True)
+class ResumoFinanceiro:
+    entradas: Dinheiro
+    saidas: Dinheiro
+    fixos: Dinheiro          # despesas fixas (inclui os custos fixos materializados no mês)
+    provisao: Dinheiro
+    salario_medio: Dinheiro
+    quantidade: int          # transações no período
+
+    @classmethod
+    def do_periodo(cls, inicio, fim, membro_id=None):
+        """Totais de [inicio, fim); com membro_id, só as transações daquele membro."""
+        filtros = [Transacao.data >= inicio, Transacao.data < fim]
+        if membro_id is not None:
+            filtros.append(Transacao.membro_id == membro_id)
+
+        # Despesa fixa conta só em "fixos", para não ser descontada duas vezes do saldo
+        totais = db.session.execute(select(
+            _soma_se(Transacao.tipo.in_(TIPOS_ENTRADA)).label('entradas'),
+            _soma_se(and_(Transacao.tipo == 'despesa', Transacao.is_fixo.isnot(True))).label('saidas'),
+            _soma_se(and_(Transacao.tipo == 'despesa', Transacao.is_fixo.is_(True))).label('fixos'),
+            func.count(Transacao.id).label('quantidade'),
+        ).where(*filtros)).one()
+
+        # Sem gravar nada: se ainda não existe configuração, valem os padrões
+        config = db.session.execute(
+            select(Configuracao.provisao_extras, Configuracao.salario_medio).order_by(Configuracao.id).limit(1)
+        ).first()
+        provisao, salario = config if config else (None, None)
+
+        return cls(
+            entradas=totais.entradas,
+            saidas=totais.saidas,
+            fixos=totais.fixos,
+            provisao=provisao or Dinheiro(),
+            salario_medio=salario or SALARIO_MEDIO_PADRAO,
+            quantidade=totais.quantidade,
+        )
+
+    @property
+    def dizimo_medio(self):
+        return self.salario_medio * PERCENTUAL_DIZIMO
+
+    @property
+    def despesa_total(self):
+        """Despesa que precisa ser coberta: saídas + fixos + provisão."""
+        return self.saidas + self.fixos + self.provisao
+
+    @property
+    def saldo_final(self):
+        return self.entradas - (self.saidas + self.fixos)
+
+    @property
+    def saldo_real(self):
+        return self.saldo_final - self.provisao
+
+    @property
+    def saldo_status(self):
+        return "positivo" if self.saldo_real >= 0 else "negativo"
+
+    @property
+    def dizimistas_necessarios(self):
+        # Divisão arredondada para cima, em centavos
+        if self.dizimo_medio <= 0:
+            return 0
+        return -(-self.despesa_total.centavos // self.dizimo_medio.centavos)
+
+
+# ================================
+# GRÁFICO DOS ÚLTIMOS 12 MESES (cache)
+# ================================
+# O gráfico varre um ano de transações, então fica em cache até alguém gravar
+# uma transação neste worker (nos outros workers, até vencer GRAFICO_TTL).
+GRAFICO_TTL = int(os.getenv("GRAFICO_TTL", 300))
+
+_cache_grafico = TTLCache(maxsize=2, ttl=GRAFICO_TTL)  # chave: mês atual
+_lock = Lock()
+
+
+def grafico_saldos():
+    """(meses, saldos) de gerar_dados_grafico(), em cache."""
+    chave = date.today().strftime('%Y-%m')
+    with _lock:
+        grafico = _cache_grafico.get(chave)
+    if grafico is None:
+        grafico = gerar_dados_grafico()
+        with _lock:
+            _cache_grafico[chave] = grafico
+    return grafico
+
+def invalidar_grafico():
+    with _lock:
+        _cache_grafico.clear()
+
+
+@event.listens_for(Session, 'before_flush')
+def _marcar_grafico(session, flush_context, instances):
+    if any(isinstance(obj, Transacao) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info['grafico_alterado'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _invalidar_apos_commit(session):
+    if session.info.pop('grafico_alterado', False):
+        invalidar_grafico()
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_marcacao(session):
+    session.info.pop('grafico_alterado', None)
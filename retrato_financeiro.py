@@ -0,0 +1,278 @@
+import json
+import os
+import shutil
+import time
+from threading import Lock
+import numpy as np
+import pandas as pd
+from flask import current_app
+from sqlalchemy import BigInteger, select, type_coerce
+from extensions import db
+from models import Transacao, TIPOS_ENTRADA
+
+# ================================
+# RETRATO COLUNAR DAS TRANSAÇÕES (relatórios)
+# ================================
+# Os relatórios agregam o histórico inteiro. Em vez de ler linhas do banco a
+# cada requisição, as transações são exportadas para colunas NumPy (um .npy
+# por coluna) abertas com mmap: as páginas ficam no cache do sistema
+# operacional e são as mesmas para todos os workers do gunicorn. Os pivôs são
+# np.bincount sobre essas colunas. Cada retrato fica numa pasta própria e
+# "atual.json" aponta para o mais novo (troca atômica com os.replace).
+# Um retrato mais velho que RETRATO_MAX_IDADE é refeito antes de ser usado;
+# `flask gerar-retrato` no agendador mantém o retrato novo sem custo nas requisições.
+RETRATO_MAX_IDADE = int(os.getenv('RETRATO_MAX_IDADE', 300))  # segundos
+RETRATO_VERSOES = 3      # pastas mantidas no disco: um worker pode ainda estar lendo a anterior
+RETRATO_ESPERA = 60      # segundos esperando outro worker terminar de gerar
+RETRATO_LOTE = 50000     # linhas lidas do banco por vez
+COLUNAS = {  # todas ordenadas por dia: um período é uma fatia contínua (np.searchsorted)
+    'dia': np.int32,        # dias desde 1970-01-01
+    'mes': np.int32,        # meses desde 1970-01 (ano = mes // 12 + 1970)
+    'centavos': np.int64,
+    'tipo': np.int8,        # índice em meta['tipos']
+    'metodo': np.int8,      # índice em meta['metodos']
+    'categoria': np.int32,  # índice em meta['categorias']
+    'membro': np.int32,     # índice em membro_ids.npy (0 = sem membro)
+    'fixo': np.bool_,
+}
+
+
+def dia_numero(data):
+    """date/datetime -> dias desde 1970-01-01 (a escala da coluna 'dia')."""
+    return int(np.datetime64(data, 'D').astype(np.int64))
+
+def mes_numero(ano, mes=1):
+    return (ano - 1970) * 12 + mes - 1
+
+def dia_do_mes(numero):
+    """Primeiro dia (em dias desde 1970) do mês número `numero`."""
+    return int(np.datetime64(numero, 'M').astype('datetime64[D]').astype(np.int64))
+
+
+class Retrato:
+    """Colunas de um retrato (somente leitura, mapeadas do disco) e os pivôs sobre elas.
+
+    Os pivôs somam com um único np.bincount sobre a fatia do período: o tipo
+    entra no índice e os tipos pedidos são escolhidos depois, no resultado
+    pequeno, em vez de filtrar as colunas linha a linha.
+    """
+
+    def __init__(self, pasta, meta):
+        self.pasta = pasta
+        self.gerado_em = meta['gerado_em']
+        self.linhas = meta['linhas']
+        self.tipos = meta['tipos']
+        self.metodos = meta['metodos']
+        self.categorias = meta['categorias']
+        for nome in COLUNAS:
+            setattr(self, nome, np.load(os.path.join(pasta, f'{nome}.npy'), mmap_mode='r'))
+        self.membro_ids = np.load(os.path.join(pasta, 'membro_ids.npy'))
+
+    @property
+    def idade(self):
+        return time.time() - self.gerado_em
+
+    def codigos_tipo(self, tipos):
+        return [i for i, tipo in enumerate(self.tipos) if tipos is None or tipo in tipos]
+
+    def fatia(self, inicio=None, fim=None):
+        """slice das linhas com data em [inicio, fim) (datas ou dias desde 1970)."""
+        if inicio is not None and not isinstance(inicio, int):
+            inicio = dia_numero(inicio)
+        if fim is not None and not isinstance(fim, int):
+            fim = dia_numero(fim)
+        a = 0 if inicio is None else int(np.searchsorted(self.dia, inicio, 'left'))
+        b = self.linhas if fim is None else int(np.searchsorted(self.dia, fim, 'left'))
+        return slice(a, max(a, b))
+
+    def somar(self, f, indices, tamanho):
+        """Soma dos centavos da fatia f por índice (bincount em float64: exato até 2**53)."""
+        soma = np.bincount(indices, weights=self.centavos[f], minlength=tamanho)
+        return np.rint(soma).astype(np.int64)
+
+    def pivo_mes_categoria(self, ano, tipos=None):
+        """(categorias, matriz 12 x categorias em centavos) do ano; só categorias com movimento."""
+        f = self.fatia(dia_do_mes(mes_numero(ano)), dia_do_mes(mes_numero(ano + 1)))
+        nt, nc = len(self.tipos), len(self.categorias)
+        indices = ((self.mes[f] - mes_numero(ano)) * nt + self.tipo[f]) * nc + self.categoria[f]
+        soma = self.somar(f, indices, 12 * nt * nc).reshape(12, nt, nc)[:, self.codigos_tipo(tipos)].sum(axis=1)
+        usadas = np.flatnonzero(soma.any(axis=0))
+        usadas = usadas[np.argsort(-soma[:, usadas].sum(axis=0), kind='stable')]
+        return [self.categorias[i] for i in usadas], soma[:, usadas]
+
+    def pivo_membro_ano(self, anos, tipos=TIPOS_ENTRADA, limite=None):
+        """(membro_ids, matriz membros x anos em centavos), dos que mais contribuíram no período."""
+        primeiro, n = anos[0], anos[-1] - anos[0] + 1
+        f = self.fatia(dia_do_mes(mes_numero(primeiro)), dia_do_mes(mes_numero(primeiro + n)))
+        nt = len(self.tipos)
+        indices = (self.membro[f] * n + (self.mes[f] // 12 + 1970 - primeiro)) * nt + self.tipo[f]
+        soma = self.somar(f, indices, len(self.membro_ids) * n * nt).reshape(len(self.membro_ids), n, nt)
+        soma = soma[1:, :, self.codigos_tipo(tipos)].sum(axis=2)  # linha 0: sem membro
+        totais = soma.sum(axis=1)
+        ordem = np.argsort(-totais, kind='stable')[:limite]
+        ordem = ordem[totais[ordem] != 0]
+        return self.membro_ids[ordem + 1].tolist(), soma[ordem]
+
+    def serie_mensal(self, primeiro_mes, meses):
+        """Totais mês a mês (centavos) a partir do mês número primeiro_mes: entradas,
+        saídas (despesas não fixas) e fixos (despesas fixas), como no ResumoFinanceiro."""
+        f = self.fatia(dia_do_mes(primeiro_mes), dia_do_mes(primeiro_mes + meses))
+        nt = len(self.tipos)
+        indices = ((self.mes[f] - primeiro_mes) * nt + self.tipo[f]) * 2 + self.fixo[f]
+        soma = self.somar(f, indices, meses * nt * 2).reshape(meses, nt, 2)
+        despesa = self.codigos_tipo(('despesa',))
+        return {
+            'entradas': soma[:, self.codigos_tipo(TIPOS_ENTRADA)].sum(axis=(1, 2)),
+            'saidas': soma[:, despesa, 0].sum(axis=1),
+            'fixos': soma[:, despesa, 1].sum(axis=1),
+        }
+
+    def dizimistas_por_mes(self, primeiro_mes, meses):
+        """Quantos membros diferentes deram dízimo em cada mês."""
+        f = self.fatia(dia_do_mes(primeiro_mes), dia_do_mes(primeiro_mes + meses))
+        m = np.isin(self.tipo[f], self.codigos_tipo(('dizimo',))) & (self.membro[f] > 0)
+        pares = np.unique((self.mes[f][m] - primeiro_mes).astype(np.int64) * len(self.membro_ids) + self.membro[f][m])
+        return np.bincount(pares // len(self.membro_ids), minlength=meses)
+
+    def participacao_metodos(self, inicio=None, fim=None, tipos=TIPOS_ENTRADA):
+        """[(método, centavos, fração do total)] do período, do maior para o menor."""
+        f = self.fatia(inicio, fim)
+        nt, nm = len(self.tipos), len(self.metodos)
+        soma = self.somar(f, self.tipo[f].astype(np.intp) * nm + self.metodo[f], nt * nm)
+        soma = soma.reshape(nt, nm)[self.codigos_tipo(tipos)].sum(axis=0)
+        total = soma.sum()
+        return [(self.metodos[i], int(soma[i]), float(soma[i] / total) if total else 0.0)
+                for i in np.argsort(-soma, kind='stable') if soma[i]]
+
+
+# ================================
+# GERAÇÃO E CARGA
+# ================================
+_lock = Lock()
+_carregado = None  # (pasta, Retrato) aberto neste worker
+
+def pasta_retrato():
+    return os.getenv('RETRATO_DIR') or os.path.join(current_app.instance_path, 'retrato')
+
+def _ler_transacoes():
+    """DataFrame com as colunas cruas de transacao, lido do banco em lotes."""
+    t = Transacao.__table__
+    consulta = select(t.c.data, type_coerce(t.c.valor, BigInteger).label('centavos'), t.c.tipo, t.c.metodo,
+                      t.c.categoria, t.c.membro_id, t.c.is_fixo)\
+        .where(t.c.data.isnot(None), t.c.valor.isnot(None))
+    resultado = db.session.execute(consulta.execution_options(yield_per=RETRATO_LOTE))
+    partes = [pd.DataFrame(parte, columns=list(resultado.keys())) for parte in resultado.partitions()]
+    if not partes:
+        return pd.DataFrame(columns=list(resultado.keys()))
+    return pd.concat(partes, ignore_index=True)
+
+def gerar_retrato():
+    """Exporta transacao para uma pasta nova de colunas e aponta atual.json para ela."""
+    t = time.perf_counter()
+    df = _ler_transacoes()
+    datas = pd.to_datetime(df['data']).to_numpy(dtype='datetime64[ns]')
+    ordem = np.argsort(datas, kind='stable')
+    datas = datas[ordem]
+    colunas = {
+        'dia': datas.astype('datetime64[D]').astype(np.int64),
+        'mes': datas.astype('datetime64[M]').astype(np.int64),
+        'centavos': df['centavos'].to_numpy(dtype=np.int64)[ordem],
+        'fixo': df['is_fixo'].fillna(False).to_numpy(dtype=bool)[ordem],
+    }
+    meta = {'linhas': len(df), 'gerado_em': time.time()}
+    for nome, lista in (('tipo', 'tipos'), ('metodo', 'metodos'), ('categoria', 'categorias')):
+        codigos, nomes = pd.factorize(df[nome].fillna('').astype(str), sort=True)
+        colunas[nome], meta[lista] = codigos[ordem], nomes.tolist()
+    # Membros com índices densos (0 = sem membro) para servirem de posição no bincount
+    membro_ids = df['membro_id'].fillna(0).to_numpy(dtype=np.int64)[ordem]
+    ids, colunas['membro'] = np.unique(np.append(membro_ids, 0), return_inverse=True)
+    colunas['membro'] = colunas['membro'][:-1]
+
+    base = pasta_retrato()
+    pasta = os.path.join(base, f"v{time.time_ns()}")
+    os.makedirs(pasta)
+    for nome, dtype in COLUNAS.items():
+        np.save(os.path.join(pasta, f'{nome}.npy'), np.ascontiguousarray(colunas[nome], dtype=dtype))
+    np.save(os.path.join(pasta, 'membro_ids.npy'), ids.astype(np.int32))
+    meta['duracao_ms'] = int((time.perf_counter() - t) * 1000)
+    with open(os.path.join(pasta, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    temporario = os.path.join(base, f'atual.json.{os.getpid()}')
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump({'pasta': os.path.basename(pasta)}, f)
+    os.replace(temporario, os.path.join(base, 'atual.json'))
+    _remover_antigos(base)
+    return meta
+
+def _remover_antigos(base):
+    versoes = sorted(nome for nome in os.listdir(base) if nome.startswith('v'))
+    for nome in versoes[:-RETRATO_VERSOES]:
+        # No Windows um arquivo mapeado não pode ser apagado: fica para a próxima
+        shutil.rmtree(os.path.join(base, nome), ignore_errors=True)
+
+def _pasta_atual(base):
+    try:
+        with open(os.path.join(base, 'atual.json'), encoding='utf-8') as f:
+            return os.path.join(base, json.load(f)['pasta'])
+    except (FileNotFoundError, KeyError, ValueError):
+        return None
+
+def _abrir(base):
+    """Retrato apontado por atual.json (o deste worker, se já estiver aberto), ou None."""
+    global _carregado
+    pasta = _pasta_atual(base)
+    if pasta is None:
+        return None
+    with _lock:
+        if _carregado and _carregado[0] == pasta:
+            return _carregado[1]
+    try:
+        with open(os.path.join(pasta, 'meta.json'), encoding='utf-8') as f:
+            atual = Retrato(pasta, json.load(f))
+    except FileNotFoundError:  # removido por outro worker entre as duas leituras
+        return None
+    with _lock:
+        _carregado = (pasta, atual)
+    return atual
+
+def _gerar_com_trava(base, max_idade):
+    """Gera o retrato; se outro worker já está gerando, espera ele terminar."""
+    os.makedirs(base, exist_ok=True)
+    trava = os.path.join(base, 'gerando.lock')
+    limite = time.monotonic() + RETRATO_ESPERA
+    while True:
+        try:
+            fd = os.open(trava, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                # Trava de um worker que morreu no meio da geração
+                if time.time() - os.stat(trava).st_mtime > RETRATO_ESPERA:
+                    os.remove(trava)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > limite:
+                return
+            time.sleep(0.1)
+            atual = _abrir(base)
+            if atual and atual.idade <= max_idade:
+                return
+    try:
+        os.close(fd)
+        atual = _abrir(base)
+        if not atual or atual.idade > max_idade:
+            gerar_retrato()
+    finally:
+        os.remove(trava)
+
+def retrato(max_idade=RETRATO_MAX_IDADE):
+    """Retrato com no máximo max_idade segundos; gera um novo se preciso."""
+    base = pasta_retrato()
+    atual = _abrir(base)
+    if atual is None or atual.idade > max_idade:
+        _gerar_com_trava(base, max_idade)
+        atual = _abrir(base)
+        if atual is None:
+            raise RuntimeError("Não foi possível gerar o retrato das transações.")
+    return atual
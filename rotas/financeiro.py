@@ -0,0 +1,815 @@
+import os
+from datetime import datetime
+from io import BytesIO
+import click
+from flask import Blueprint, render_template, request, redirect, url_for, flash, send_file, make_response, jsonify
+from flask_login import login_required, current_user
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models import (Membro, Transacao, CustoFixo, Configuracao, LancamentoExtrato, InformeAnual, TIPOS_ENTRADA,
+                    inserir_transacoes)
+from dinheiro import Dinheiro, formatar_moeda
+from forms import TransacaoForm
+from resumo_financeiro import ResumoFinanceiro, grafico_saldos, invalidar_grafico
+from painel import invalidar_painel
+from opcoes import preparar_select_membro, muitos_membros, opcoes_membros, nome_membro
+from extrato import importar_extrato
+from informes import iniciar_informes, gerar_informes, em_andamento, pasta_informes
+from retrato_financeiro import retrato, gerar_retrato, RETRATO_MAX_IDADE
+from simulador import simular
+from previsao_financeira import analisar, invalidar_previsao
+from recorrencia import materializar_mes, materializar_periodo, mes_atual, mes_pendente
+from utils import financeiro_required, intervalo_periodo
+import pandas as pd
+import pdfkit
+
+bp = Blueprint('financeiro', __name__, cli_group=None)
+
+# ================================
+# CUSTOS FIXOS
+# ================================
+@bp.route('/custos-fixos')
+@login_required
+def custos_fixos():
+    custos = CustoFixo.query.order_by(CustoFixo.nome.asc()).all()
+    return render_template('secretaria/custos_fixos.html', custos=custos)
+
+@bp.route('/custos-fixos/adicionar', methods=['POST'])
+@financeiro_required
+@login_required
+def adicionar_custo_fixo():
+    nome = request.form['nome']
+    valor = Dinheiro.de_reais(request.form['valor'])
+    replicar = 'replicar_mensal' in request.form
+    # Sem mês informado vale a partir do mês atual (nunca para meses já passados)
+    mes_ref = request.form.get('mes_referencia') or mes_atual()
+    ativo = 'ativo' in request.form
+    novo = CustoFixo(nome=nome, valor=valor, ativo=ativo, mes_referencia=mes_ref, replicar_mensal=replicar)
+    db.session.add(novo)
+    db.session.commit()
+    materializar_mes(mes_atual(), sincronizar=True)
+    flash('Custo fixo adicionado com sucesso!', 'success')
+    return redirect(url_for('financeiro.custos_fixos'))
+
+@bp.route('/custos-fixos/editar/<int:id>', methods=['POST'])
+@financeiro_required
+@login_required
+def editar_custo_fixo(id):
+    custo = CustoFixo.query.get_or_404(id)
+    custo.nome = request.form['nome']
+    custo.valor = Dinheiro.de_reais(request.form['valor'])
+    custo.replicar_mensal = 'replicar_mensal' in request.form
+    custo.mes_referencia = request.form.get('mes_referencia') or custo.mes_referencia or mes_atual()
+    custo.ativo = 'ativo' in request.form
+    db.session.commit()
+    # Vale do mês atual em diante; meses já materializados não mudam
+    materializar_mes(mes_atual(), sincronizar=True)
+    flash('Custo fixo atualizado com sucesso!', 'success')
+    return redirect(url_for('financeiro.custos_fixos'))
+
+@bp.route('/custos-fixos/materializar', methods=['POST'])
+@financeiro_required
+@login_required
+def materializar_custos_fixos():
+    criadas = materializar_mes(mes_atual(), sincronizar=True)
+    flash(f'{criadas} custo(s) fixo(s) lançado(s) no mês atual.', 'success')
+    if request.form.get('voltar') == 'financeiro':
+        return redirect(url_for('financeiro.financeiro'))
+    return redirect(url_for('financeiro.configurar_financeiro'))
+
+@bp.cli.command('materializar-custos-fixos')
+@click.option('--mes', help="Mês YYYY-MM (padrão: mês atual).")
+@click.option('--desde', help="Materializa de YYYY-MM até o mês atual.")
+def materializar_custos_fixos_cmd(mes, desde):
+    """Lança os custos fixos do mês como transações (agendar para o dia 1º)."""
+    if desde:
+        criadas = materializar_periodo(desde)
+    else:
+        mes = mes or mes_atual()
+        criadas = {mes: materializar_mes(mes)}
+    for chave, quantidade in criadas.items():
+        print(f"{chave}: {quantidade} lançamento(s) criado(s)")
+
+# ================================
+# FINANCEIRO
+# ================================
+@bp.route('/financeiro', methods=['GET', 'POST'])
+@login_required
+def financeiro():
+    form = TransacaoForm()
+    preparar_select_membro(form.membro_id)
+    # Selects de exportação por membro: com muitos membros vão vazios e usam a busca
+    membros = [] if muitos_membros() else opcoes_membros()
+
+    mes = request.args.get('mes', datetime.now().strftime('%Y-%m'))
+    inicio_mes, fim_mes = intervalo_periodo(mes=mes)
+
+    # Inserção de transação (apenas níveis <= 3)
+    if form.validate_on_submit() and current_user.nivel_acesso <= 3:
+        nova = Transacao(
+            data=form.data_transacao.data,
+            tipo=form.tipo.data,
+            categoria=form.categoria.data,
+            valor=form.valor.data,
+            metodo=form.metodo.data,
+            membro_id=form.membro_id.data if form.membro_id.data else None,
+            is_fixo=bool(int(form.is_fixo.data))
+        )
+        db.session.add(nova)
+        db.session.commit()
+        flash('Transação registrada com sucesso!', 'success')
+        return redirect(url_for('financeiro.financeiro', mes=mes))
+
+    is_restrito = current_user.nivel_acesso > 3
+    membro_id = None
+    if is_restrito:
+        membro = current_user.membro
+        if not membro:
+            flash("Você ainda não está vinculado a um membro no sistema.", "warning")
+            return redirect(url_for('publico.index'))
+        membro_id = membro.id
+        form = None
+
+    # As transações do mês não vêm no HTML: a tabela carrega por /financeiro/transacoes
+
+    # === KPIs: uma agregação + a configuração (ver resumo_financeiro.py) ===
+    resumo = ResumoFinanceiro.do_periodo(inicio_mes, fim_mes, membro_id=membro_id)
+
+    # === CARREGAR CUSTOS FIXOS ===
+    custos_fixos = CustoFixo.query.filter_by(ativo=True).order_by(CustoFixo.nome).all()
+    # Mês atual ainda sem os custos fixos (sem o agendador): o financeiro lança pelo botão
+    custos_pendentes = not is_restrito and mes_pendente(mes)
+
+    # === GRÁFICO E MÊS ATUAL ===
+    meses_grafico, saldos_grafico = grafico_saldos()
+    mes_atual = inicio_mes.strftime('%B/%Y').capitalize()
+
+    # === RENDERIZAR TEMPLATE ===
+    return render_template(
+        'secretaria/financeiro.html',
+        form=form,
+        quantidade_transacoes=resumo.quantidade,
+        total_entradas=resumo.entradas,
+        total_saidas=resumo.saidas,
+        total_fixos=resumo.fixos,
+        saldo_final=resumo.saldo_final,
+        saldo_real=resumo.saldo_real,
+        provisao_extras=resumo.provisao,
+        dizimistas_necessarios=resumo.dizimistas_necessarios,
+        despesa_total=resumo.despesa_total,
+        dizimo_medio=resumo.dizimo_medio,
+        salario_medio=resumo.salario_medio,
+        mes=mes,
+        meses_grafico=meses_grafico,
+        saldos_grafico=saldos_grafico,
+        mes_atual=mes_atual,
+        saldo_status=resumo.saldo_status,
+        is_membro=is_restrito,
+        custos_fixos=custos_fixos,
+        custos_pendentes=custos_pendentes,
+        membros=membros,
+        busca_membros=not membros
+    )
+
+# ================================
+# LANÇAMENTOS DO MÊS (JSON paginado para a tabela do /financeiro)
+# ================================
+LANCAMENTOS_POR_PAGINA = 50
+LANCAMENTOS_MAX_PAGINA = 200
+
+def _cursor(data, id):
+    return f"{data.isoformat()}_{id}"
+
+def _ler_cursor(cursor):
+    data, id = cursor.rsplit('_', 1)
+    return datetime.fromisoformat(data), int(id)
+
+@bp.route('/financeiro/transacoes')
+@login_required
+def transacoes_json():
+    """Uma página de transações, da mais recente para a mais antiga.
+
+    Paginação por chave (data, id): `depois` é o cursor devolvido em `proximo`,
+    então cada página custa o mesmo, seja a primeira ou a centésima.
+    Filtros: mes (YYYY-MM), tipo, metodo, membro_id, categoria (contém).
+    """
+    mes = request.args.get('mes') or datetime.now().strftime('%Y-%m')
+    limite = min(request.args.get('limite', LANCAMENTOS_POR_PAGINA, type=int), LANCAMENTOS_MAX_PAGINA)
+    try:
+        inicio, fim = intervalo_periodo(mes=mes)
+        depois = _ler_cursor(request.args['depois']) if request.args.get('depois') else None
+    except ValueError:
+        return jsonify({'error': 'Parâmetro inválido.'}), 400
+
+    q = select(Transacao.id, Transacao.data, Transacao.tipo, Transacao.categoria, Transacao.metodo,
+               Transacao.valor, Transacao.is_fixo, Transacao.membro_id, Membro.nome.label('membro'))\
+        .outerjoin(Membro, Membro.id == Transacao.membro_id)\
+        .where(Transacao.data >= inicio, Transacao.data < fim)
+
+    # Membros (nível 4) só enxergam as próprias transações
+    if current_user.nivel_acesso > 3:
+        if not current_user.membro_id:
+            return jsonify({'itens': [], 'proximo': None})
+        q = q.where(Transacao.membro_id == current_user.membro_id)
+    elif request.args.get('membro_id', type=int):
+        q = q.where(Transacao.membro_id == request.args.get('membro_id', type=int))
+    for campo in ('tipo', 'metodo'):
+        if request.args.get(campo):
+            q = q.where(getattr(Transacao, campo) == request.args[campo])
+    if request.args.get('categoria', '').strip():
+        q = q.where(Transacao.categoria.ilike(f"%{request.args['categoria'].strip()}%"))
+    if depois:
+        data, id = depois
+        q = q.where(or_(Transacao.data < data, and_(Transacao.data == data, Transacao.id < id)))
+
+    linhas = db.session.execute(q.order_by(Transacao.data.desc(), Transacao.id.desc()).limit(limite + 1)).all()
+    pagina = linhas[:limite]
+    return jsonify({
+        'itens': [{
+            'id': t.id,
+            'data': t.data.strftime('%d/%m/%Y'),
+            'tipo': t.tipo,
+            'categoria': t.categoria,
+            'metodo': t.metodo,
+            'valor': str(t.valor),
+            'valor_formatado': formatar_moeda(t.valor),
+            'is_fixo': bool(t.is_fixo),
+            'membro_id': t.membro_id,
+            'membro': t.membro,
+        } for t in pagina],
+        'proximo': _cursor(pagina[-1].data, pagina[-1].id) if len(linhas) > limite else None,
+    })
+
+# ================================
+# LANÇAMENTO EM LOTE (envelopes do culto)
+# ================================
+LOTE_MAX_LINHAS = 500
+TIPOS_TRANSACAO = TIPOS_ENTRADA + ('despesa',)
+METODOS_TRANSACAO = ('dinheiro', 'pix', 'cartao')
+
+def _data_lote(texto):
+    for formato in ('%Y-%m-%d', '%d/%m/%Y'):
+        try:
+            return datetime.strptime(texto, formato)
+        except ValueError:
+            pass
+    raise ValueError("data inválida")
+
+def _validar_linha_lote(linha, padrao):
+    """Transação pronta para o insert, ou ValueError com o motivo."""
+    if not isinstance(linha, dict):
+        raise ValueError("linha inválida")
+    dados = {**padrao, **{k: v for k, v in linha.items() if v not in (None, '')}}
+    tipo, metodo = dados.get('tipo'), dados.get('metodo')
+    if tipo not in TIPOS_TRANSACAO:
+        raise ValueError("tipo inválido")
+    if metodo not in METODOS_TRANSACAO:
+        raise ValueError("método inválido")
+    categoria = str(dados.get('categoria') or '').strip()
+    if not categoria:
+        raise ValueError("categoria obrigatória")
+    try:
+        valor = Dinheiro.de_reais(dados.get('valor', ''))
+    except (ArithmeticError, TypeError):
+        raise ValueError("valor inválido")
+    if valor <= 0:
+        raise ValueError("valor deve ser maior que zero")
+    membro_id = dados.get('membro_id') or None
+    if membro_id is not None:
+        try:
+            membro_id = int(membro_id)
+        except (TypeError, ValueError):
+            raise ValueError("membro inválido")
+    return {
+        'data': _data_lote(str(dados['data'])) if dados.get('data') else datetime.now(),
+        'tipo': tipo,
+        'categoria': categoria[:100],
+        'valor': valor,
+        'metodo': metodo,
+        'membro_id': membro_id,
+        'is_fixo': False,
+    }
+
+@bp.route('/financeiro/lote', methods=['POST'])
+@financeiro_required
+@login_required
+def lancar_lote():
+    """Lança várias transações de uma vez (ex.: os envelopes de um culto).
+
+    JSON: {"mes": "YYYY-MM", "padrao": {data, tipo, categoria, metodo}, "linhas": [{membro_id, valor, ...}]}.
+    Cada linha herda de "padrao" o que não informar; sem data, vale agora. Valida tudo antes: com
+    qualquer erro nada é gravado e a resposta (400) lista os erros por linha.
+    Com sucesso, grava tudo num executemany e devolve só os totais do mês.
+    """
+    corpo = request.get_json(silent=True) or {}
+    linhas, padrao = corpo.get('linhas'), corpo.get('padrao') or {}
+    if not isinstance(linhas, list) or not linhas or not isinstance(padrao, dict):
+        return jsonify({'error': 'Envie as linhas do lote.'}), 400
+    if len(linhas) > LOTE_MAX_LINHAS:
+        return jsonify({'error': f'No máximo {LOTE_MAX_LINHAS} linhas por lote.'}), 400
+    try:
+        inicio_mes, fim_mes = intervalo_periodo(mes=corpo.get('mes') or datetime.now().strftime('%Y-%m'))
+    except ValueError:
+        return jsonify({'error': 'Parâmetro inválido.'}), 400
+
+    validas, erros = [], []
+    for numero, linha in enumerate(linhas, start=1):
+        try:
+            validas.append((numero, _validar_linha_lote(linha, padrao)))
+        except ValueError as e:
+            erros.append({'linha': numero, 'erro': str(e)})
+    # Membros informados: uma consulta para todos
+    membro_ids = {t['membro_id'] for _, t in validas if t['membro_id']}
+    existentes = set(db.session.scalars(select(Membro.id).where(Membro.id.in_(membro_ids)))) if membro_ids else set()
+    erros += [{'linha': numero, 'erro': 'membro não encontrado'}
+              for numero, t in validas if t['membro_id'] and t['membro_id'] not in existentes]
+    if erros:
+        return jsonify({'error': 'Nenhuma transação foi gravada.', 'erros': sorted(erros, key=lambda e: e['linha'])}), 400
+
+    transacoes = [t for _, t in validas]
+    inserir_transacoes(transacoes)
+    db.session.commit()
+    # O executemany não passa pelo flush: os caches que dependem de transações são limpos aqui
+    invalidar_grafico()
+    invalidar_painel()
+
+    resumo = ResumoFinanceiro.do_periodo(inicio_mes, fim_mes)
+    totais = {
+        'entradas': resumo.entradas, 'saidas': resumo.saidas, 'fixos': resumo.fixos,
+        'saldo_final': resumo.saldo_final, 'saldo_real': resumo.saldo_real,
+    }
+    return jsonify({
+        'inseridas': len(transacoes),
+        'total_lote': formatar_moeda(sum(t['valor'] for t in transacoes)),
+        'quantidade_transacoes': resumo.quantidade,
+        'dizimistas_necessarios': resumo.dizimistas_necessarios,
+        'totais': {nome: formatar_moeda(valor) for nome, valor in totais.items()},
+        'negativos': [nome for nome, valor in totais.items() if valor < 0],
+    })
+
+@bp.route('/financeiro_membro')
+@login_required
+def financeiro_membro():
+    membro = current_user.membro
+    if not membro:
+        flash("Você ainda não está vinculado a um membro no sistema.", "warning")
+        return redirect(url_for('publico.index'))
+
+    mes = request.args.get('mes', datetime.now().strftime('%Y-%m'))
+    inicio, fim = intervalo_periodo(mes=mes)
+
+    transacoes = Transacao.query.filter_by(membro_id=membro.id)\
+        .filter(Transacao.data >= inicio, Transacao.data < fim)\
+        .order_by(Transacao.data.desc()).all()
+
+    resumo = ResumoFinanceiro.do_periodo(inicio, fim, membro_id=membro.id)
+    total_entradas, total_saidas = resumo.entradas, resumo.saidas
+    saldo_final = total_entradas - total_saidas
+
+    meses_grafico, saldos_grafico = grafico_saldos()
+    return render_template(
+        'secretaria/financeiro_membro.html',
+        transacoes=transacoes,
+        total_entradas=total_entradas,
+        total_saidas=total_saidas,
+        saldo_final=saldo_final,
+        meses_grafico=meses_grafico,
+        saldos_grafico=saldos_grafico,
+        mes=mes,
+        mes_atual=datetime.now().strftime('%B/%Y').capitalize()
+    )
+
+# ================================
+# TRANSAÇÕES – EDITAR / EXCLUIR
+# ================================
+@bp.route('/financeiro/editar/<int:id>', methods=['POST'])
+@financeiro_required
+@login_required
+def editar_transacao_ajax(id):
+    transacao = Transacao.query.get_or_404(id)
+    data = request.get_json()
+
+    try:
+        transacao.data = datetime.strptime(data['data'], '%d/%m/%Y').date()
+        transacao.tipo = data['tipo']
+        transacao.categoria = data['categoria']
+        transacao.valor = Dinheiro.de_reais(data['valor'])
+        transacao.metodo = data['metodo']
+        transacao.is_fixo = data['is_fixo'] == 'true'
+        db.session.commit()
+        return jsonify({'success': True})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@bp.route('/financeiro/excluir/<int:id>', methods=['POST'])
+@financeiro_required
+@login_required
+def excluir_transacao(id):
+    transacao = Transacao.query.get_or_404(id)
+    db.session.delete(transacao)
+    db.session.commit()
+    flash("Transação excluída!", "info")
+    return redirect(url_for('financeiro.financeiro', mes=request.args.get('mes', datetime.now().strftime('%Y-%m'))))
+
+# ================================
+# CONFIGURAÇÃO FINANCEIRA
+# ================================
+@bp.route('/financeiro/configuracao', methods=['GET', 'POST'])
+@financeiro_required
+@login_required
+def configurar_financeiro():
+    config = Configuracao.query.first()
+    if not config:
+        config = Configuracao()
+        db.session.add(config)
+        db.session.commit()
+
+    if request.method == 'POST' and 'provisao_extras' in request.form:
+        config.provisao_extras = Dinheiro.de_reais(request.form['provisao_extras'])
+        config.salario_medio = Dinheiro.de_reais(request.form['salario_medio'])
+        db.session.commit()
+        flash("Configuração salva!", "success")
+        return redirect(url_for('financeiro.configurar_financeiro'))
+
+    if request.method == 'POST' and 'novo_custo_nome' in request.form:
+        nome = request.form['novo_custo_nome']
+        valor = Dinheiro.de_reais(request.form['novo_custo_valor'])
+        replicar = request.form.get('replicar_mensal') == 'on'
+        novo = CustoFixo(nome=nome, valor=valor, replicar_mensal=replicar, mes_referencia=mes_atual())
+        db.session.add(novo)
+        db.session.commit()
+        materializar_mes(mes_atual(), sincronizar=True)
+        flash(f"Custo fixo '{nome}' adicionado!", "success")
+        return redirect(url_for('financeiro.configurar_financeiro'))
+
+    if request.method == 'POST' and 'editar_custo_id' in request.form:
+        custo = CustoFixo.query.get(int(request.form['editar_custo_id']))
+        if custo:
+            custo.nome = request.form['editar_custo_nome']
+            custo.valor = Dinheiro.de_reais(request.form['editar_custo_valor'])
+            custo.replicar_mensal = request.form.get('editar_replicar') == 'on'
+            if not custo.mes_referencia:
+                custo.mes_referencia = mes_atual()
+            db.session.commit()
+            materializar_mes(mes_atual(), sincronizar=True)
+            flash(f"Custo fixo '{custo.nome}' atualizado!", "success")
+            return redirect(url_for('financeiro.configurar_financeiro'))
+
+    custos = CustoFixo.query.all()
+    return render_template('secretaria/configuracao_financeiro.html', config=config, custos=custos)
+
+@bp.route('/financeiro/custo_fixo/excluir/<int:id>', methods=['POST'])
+@financeiro_required
+@login_required
+def excluir_custo_fixo(id):
+    custo = CustoFixo.query.get_or_404(id)
+    # Os lançamentos já feitos continuam no histórico, só perdem o vínculo
+    Transacao.query.filter_by(custo_fixo_id=id).update({'custo_fixo_id': None})
+    db.session.delete(custo)
+    db.session.commit()
+    flash("Custo fixo excluído!", "success")
+    return redirect(url_for('financeiro.configurar_financeiro'))
+
+# ================================
+# IMPORTAÇÃO DE EXTRATO BANCÁRIO (OFX/CSV, ver extrato.py)
+# ================================
+EXTENSOES_EXTRATO = ('.ofx', '.qfx', '.csv', '.txt')
+LINHAS_POR_LOTE_TELA = 500
+
+@bp.route('/financeiro/extrato', methods=['GET', 'POST'])
+@financeiro_required
+@login_required
+def importar_extrato_bancario():
+    if request.method == 'POST':
+        arquivo = request.files.get('arquivo')
+        if not arquivo or not arquivo.filename.lower().endswith(EXTENSOES_EXTRATO):
+            flash("Envie o extrato em OFX ou CSV.", "danger")
+            return redirect(url_for('financeiro.importar_extrato_bancario'))
+        try:
+            resultado = importar_extrato(arquivo.stream, arquivo.filename)
+        except ValueError as e:
+            flash(f"Não foi possível ler o extrato: {e}", "danger")
+            return redirect(url_for('financeiro.importar_extrato_bancario'))
+        except IntegrityError:
+            flash("Este extrato está sendo importado em outra sessão. Tente de novo em instantes.", "warning")
+            return redirect(url_for('financeiro.importar_extrato_bancario'))
+        flash(f"{resultado['lidas']} lançamentos lidos: {resultado['conciliadas']} já estavam lançados, "
+              f"{resultado['importadas']} importados, {resultado['repetidas']} de extratos anteriores.", "success")
+        return redirect(url_for('financeiro.extrato_lote', lote=resultado['lote']))
+
+    importacoes = db.session.execute(
+        select(LancamentoExtrato.lote, func.max(LancamentoExtrato.importado_em).label('importado_em'),
+               func.min(LancamentoExtrato.data).label('inicio'), func.max(LancamentoExtrato.data).label('fim'),
+               func.count(LancamentoExtrato.id).label('linhas'))
+        .group_by(LancamentoExtrato.lote).order_by(func.max(LancamentoExtrato.importado_em).desc()).limit(10)
+    ).all()
+    return render_template('secretaria/extrato.html', importacoes=importacoes)
+
+@bp.route('/financeiro/extrato/<lote>')
+@financeiro_required
+@login_required
+def extrato_lote(lote):
+    filtros = [LancamentoExtrato.lote == lote]
+    contagem = dict(db.session.execute(
+        select(LancamentoExtrato.status, func.count()).where(*filtros).group_by(LancamentoExtrato.status)
+    ).all())
+    if not contagem:
+        flash("Importação não encontrada.", "warning")
+        return redirect(url_for('financeiro.importar_extrato_bancario'))
+    sem_membro = db.session.scalar(select(func.count()).select_from(LancamentoExtrato).where(
+        *filtros, LancamentoExtrato.membro_id.is_(None), LancamentoExtrato.valor > 0))
+    linhas = LancamentoExtrato.query.filter(*filtros)\
+        .order_by(LancamentoExtrato.data, LancamentoExtrato.id).limit(LINHAS_POR_LOTE_TELA).all()
+    return render_template('secretaria/extrato_lote.html', lote=lote, contagem=contagem, sem_membro=sem_membro,
+                           linhas=linhas, total=sum(contagem.values()), nome_membro=nome_membro,
+                           limite=LINHAS_POR_LOTE_TELA)
+
+# ================================
+# INFORMES ANUAIS DE CONTRIBUIÇÕES (ZIP com um PDF por membro, ver informes.py)
+# ================================
+def _situacao_informe(informe):
+    situacao = {
+        'id': informe.id, 'ano': informe.ano, 'status': informe.status,
+        'total': informe.total or 0, 'gerados': informe.gerados or 0,
+        'duracao_s': round(informe.duracao_ms / 1000, 1) if informe.duracao_ms is not None else None,
+        'erro': informe.erro, 'download': None,
+    }
+    if informe.status in ('pendente', 'gerando') and not em_andamento(informe):
+        situacao['status'] = 'interrompido'
+    if informe.status == 'pronto':
+        situacao['download'] = url_for('financeiro.baixar_informes', id=informe.id)
+    return situacao
+
+@bp.route('/financeiro/informes', methods=['GET', 'POST'])
+@financeiro_required
+@login_required
+def informes_anuais():
+    if request.method == 'POST':
+        ano = request.form.get('ano', type=int)
+        if not ano or not 2000 <= ano <= datetime.now().year:
+            flash("Informe um ano válido.", "danger")
+            return redirect(url_for('financeiro.informes_anuais'))
+        informe, criado = iniciar_informes(ano, current_user.id)
+        if criado:
+            flash(f"Gerando os informes de {ano}. Acompanhe o andamento abaixo.", "info")
+        else:
+            flash(f"Os informes de {informe.ano} ainda estão sendo gerados; aguarde terminar.", "warning")
+        return redirect(url_for('financeiro.informes_anuais'))
+
+    informes = InformeAnual.query.order_by(InformeAnual.id.desc()).limit(10).all()
+    return render_template('secretaria/informes.html', informes=[_situacao_informe(i) for i in informes],
+                           ano_padrao=datetime.now().year - 1)
+
+@bp.route('/financeiro/informes/<int:id>')
+@financeiro_required
+@login_required
+def situacao_informes(id):
+    return jsonify(_situacao_informe(InformeAnual.query.get_or_404(id)))
+
+@bp.route('/financeiro/informes/<int:id>/download')
+@financeiro_required
+@login_required
+def baixar_informes(id):
+    informe = InformeAnual.query.get_or_404(id)
+    caminho = os.path.join(pasta_informes(), informe.arquivo or '')
+    if informe.status != 'pronto' or not os.path.isfile(caminho):
+        flash("Arquivo de informes não encontrado. Gere novamente.", "warning")
+        return redirect(url_for('financeiro.informes_anuais'))
+    return send_file(caminho, as_attachment=True, download_name=f'informes_{informe.ano}.zip',
+                     mimetype='application/zip')
+
+@bp.cli.command('gerar-informes')
+@click.option('--ano', type=int, help="Ano dos informes (padrão: ano passado).")
+@click.option('--processos', type=int, help="Processos em paralelo (padrão: um por núcleo).")
+def gerar_informes_cmd(ano, processos):
+    """Gera os informes de contribuições de todos os membros num ZIP, sem passar pela web."""
+    informe = InformeAnual(ano=ano or datetime.now().year - 1)
+    db.session.add(informe)
+    db.session.commit()
+    informe = gerar_informes(informe.id, processos=processos)
+    if informe.status != 'pronto':
+        raise click.ClickException(f"Falha na geração: {informe.erro}")
+    print(f"{informe.gerados} informes de {informe.ano} em {informe.duracao_ms / 1000:.1f}s: "
+          f"{os.path.join(pasta_informes(), informe.arquivo)}")
+
+# ================================
+# RELATÓRIOS (pivôs sobre o retrato colunar, ver retrato_financeiro.py)
+# ================================
+RELATORIO_ANOS = 5           # colunas do pivô membro x ano
+RELATORIO_MAX_MEMBROS = 50   # maiores contribuintes listados
+RELATORIO_ANO_MIN = 1900
+
+def _relatorios(ano, atualizar=False):
+    """Pivôs do ano (valores em centavos) e o retrato de onde saíram."""
+    ano_max = datetime.now().year + 1
+    if not RELATORIO_ANO_MIN <= ano <= ano_max:
+        raise ValueError(f"ano deve estar entre {RELATORIO_ANO_MIN} e {ano_max}")
+    r = retrato(max_idade=0 if atualizar else RETRATO_MAX_IDADE)
+    inicio, fim = intervalo_periodo(ano=ano)
+    categorias_entrada, entradas = r.pivo_mes_categoria(ano, TIPOS_ENTRADA)
+    categorias_despesa, despesas = r.pivo_mes_categoria(ano, ('despesa',))
+    anos = list(range(ano - RELATORIO_ANOS + 1, ano + 1))
+    membros, por_ano = r.pivo_membro_ano(anos, limite=RELATORIO_MAX_MEMBROS)
+    return r, {
+        'ano': ano,
+        'entradas': {'categorias': categorias_entrada, 'meses': entradas.tolist()},
+        'despesas': {'categorias': categorias_despesa, 'meses': despesas.tolist()},
+        'metodos': [{'metodo': m, 'centavos': c, 'fracao': f} for m, c, f in r.participacao_metodos(inicio, fim)],
+        'membros': {'anos': anos, 'ids': membros, 'valores': por_ano.tolist()},
+    }
+
+@bp.route('/financeiro/relatorios')
+@financeiro_required
+@login_required
+def relatorios():
+    ano = request.args.get('ano', datetime.now().year, type=int)
+    try:
+        r, dados = _relatorios(ano, atualizar=request.args.get('atualizar') == '1')
+    except ValueError as e:
+        flash(f'Ano inválido: {e}.', 'danger')
+        return redirect(url_for('financeiro.relatorios'))
+    return render_template('secretaria/relatorios.html', dados=dados, nome_membro=nome_membro,
+                           dinheiro=Dinheiro, gerado_em=datetime.fromtimestamp(r.gerado_em),
+                           linhas=r.linhas, ano_atual=datetime.now().year)
+
+@bp.route('/financeiro/relatorios.json')
+@financeiro_required
+@login_required
+def relatorios_json():
+    ano = request.args.get('ano', datetime.now().year, type=int)
+    try:
+        r, dados = _relatorios(ano)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({**dados, 'gerado_em': datetime.fromtimestamp(r.gerado_em).isoformat(timespec='seconds'),
+                    'idade_s': round(r.idade, 1)})
+
+# ================================
+# SIMULADOR DE DIZIMISTAS NECESSÁRIOS (ver simulador.py)
+# ================================
+def _lista_numeros(nome):
+    """?nome=1,2.5,3 -> [1.0, 2.5, 3.0] (vazio -> None, para usar o padrão)."""
+    texto = request.args.get(nome, '').strip()
+    if not texto:
+        return None
+    return [float(v) for v in texto.split(',') if v.strip()]
+
+@bp.route('/financeiro/simulador')
+@financeiro_required
+@login_required
+def simulador():
+    return render_template('secretaria/simulador.html')
+
+@bp.route('/financeiro/simulador.json')
+@financeiro_required
+@login_required
+def simulador_json():
+    """Grade de cenários. Parâmetros opcionais: meses, dispersao, confianca e as listas
+    salarios, taxas, provisoes e variacoes_fixos (números separados por vírgula)."""
+    try:
+        resultado = simular(
+            retrato(), datetime.now(),
+            meses=request.args.get('meses', 12, type=int),
+            salarios=_lista_numeros('salarios'),
+            taxas=_lista_numeros('taxas'),
+            provisoes=_lista_numeros('provisoes'),
+            variacoes_fixos=_lista_numeros('variacoes_fixos'),
+            dispersao=request.args.get('dispersao', 0.0, type=float),
+            confianca=request.args.get('confianca', 0.5, type=float),
+        )
+    except (ValueError, ArithmeticError) as e:
+        return jsonify({'error': str(e) or 'Parâmetro inválido.'}), 400
+    return jsonify(resultado)
+
+@bp.cli.command('gerar-retrato')
+def gerar_retrato_cmd():
+    """Refaz o retrato colunar das transações (agendar a cada poucos minutos)."""
+    meta = gerar_retrato()
+    print(f"{meta['linhas']} transações exportadas em {meta['duracao_ms']} ms.")
+
+# ================================
+# PREVISÃO E ANOMALIAS (ver previsao_financeira.py)
+# ================================
+@bp.route('/financeiro/previsao')
+@financeiro_required
+@login_required
+def previsao():
+    return render_template('secretaria/previsao.html')
+
+@bp.route('/financeiro/previsao.json')
+@financeiro_required
+@login_required
+def previsao_json():
+    try:
+        resultado = analisar(datetime.now(), meses=request.args.get('meses', 6, type=int))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(resultado)
+
+@bp.cli.command('invalidar-previsao')
+def invalidar_previsao_cmd():
+    """Faz os workers refazerem o histórico da previsão (após alterar transações direto no banco)."""
+    invalidar_previsao()
+    print("Histórico da previsão descartado em todos os workers.")
+
+# ================================
+# EXPORTAÇÃO (MELHORADA COM FILTROS POR ANO E MEMBRO)
+# ================================
+@bp.route('/exportar/pdf')
+@financeiro_required
+@login_required
+def exportar_pdf():
+    mes = request.args.get('mes')
+    ano = request.args.get('ano')
+    membro_id = request.args.get('membro_id')
+    tipo = request.args.get('tipo', 'todos')
+
+    q = Transacao.query
+    try:
+        if membro_id:
+            q = q.filter(Transacao.membro_id == int(membro_id))
+            titulo = f'Relatório por Membro ID {membro_id}'
+        else:
+            titulo = 'Relatório Financeiro'
+
+        if mes:
+            inicio, fim = intervalo_periodo(mes=mes)
+            q = q.filter(Transacao.data >= inicio, Transacao.data < fim)
+            titulo += f' (Mês: {mes})'
+        elif ano:
+            inicio, fim = intervalo_periodo(ano=ano)
+            q = q.filter(Transacao.data >= inicio, Transacao.data < fim)
+            titulo += f' (Ano: {ano})'
+    except ValueError:
+        flash('Filtro de exportação inválido: use o mês como AAAA-MM e o ano como AAAA.', 'danger')
+        return redirect(url_for('financeiro.financeiro'))
+
+    if tipo != 'todos':
+        q = q.filter(Transacao.tipo == tipo)
+
+    transacoes = q.order_by(Transacao.data.desc()).all()
+    total = q.with_entities(func.coalesce(func.sum(Transacao.valor), 0)).scalar()
+
+    html = render_template('relatorios/pdf_financeiro.html',
+                           transacoes=transacoes, total_geral=total, titulo=titulo)
+    caminho_wk = os.getenv('WKHTMLTOPDF_PATH', r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe')
+    cfg = pdfkit.configuration(wkhtmltopdf=caminho_wk)
+    pdf = pdfkit.from_string(html, False, configuration=cfg)
+
+    filename = f'relatorio_{mes or ano or "completo"}.pdf'
+    resp = make_response(pdf)
+    resp.headers['Content-Type'] = 'application/pdf'
+    resp.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return resp
+
+@bp.route('/exportar/excel')
+@financeiro_required
+@login_required
+def exportar_excel():
+    mes = request.args.get('mes')
+    ano = request.args.get('ano')
+    membro_id = request.args.get('membro_id')
+    tipo = request.args.get('tipo', 'todos')
+
+    q = Transacao.query
+    try:
+        if membro_id:
+            q = q.filter(Transacao.membro_id == int(membro_id))
+
+        if mes:
+            inicio, fim = intervalo_periodo(mes=mes)
+            q = q.filter(Transacao.data >= inicio, Transacao.data < fim)
+        elif ano:
+            inicio, fim = intervalo_periodo(ano=ano)
+            q = q.filter(Transacao.data >= inicio, Transacao.data < fim)
+    except ValueError:
+        flash('Filtro de exportação inválido: use o mês como AAAA-MM e o ano como AAAA.', 'danger')
+        return redirect(url_for('financeiro.financeiro'))
+
+    if tipo != 'todos':
+        q = q.filter(Transacao.tipo == tipo)
+
+    transacoes = q.order_by(Transacao.data.desc()).all()
+
+    data = [{
+        'Data': t.data.strftime('%d/%m/%Y'),
+        'Tipo': t.tipo.title(),
+        'Categoria': t.categoria,
+        'Método': t.metodo.title(),
+        'Membro': t.membro.nome if t.membro else '-',
+        'Valor': float(t.valor)
+    } for t in transacoes]
+
+    df = pd.DataFrame(data)
+    output = BytesIO()
+    df.to_excel(output, index=False)
+    output.seek(0)
+
+    filename = f'relatorio_{mes or ano or "completo"}.xlsx'
+    return send_file(
+        output,
+        as_attachment=True,
+        download_name=filename,
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
@@ -0,0 +1,357 @@
+import os
+import re
+import json
+from datetime import datetime, timedelta
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, render_template, request, jsonify, Response, stream_with_context
+from flask_login import login_required
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import contains_eager
+from cachetools import TTLCache
+import google.generativeai as genai
+from googleapiclient.discovery import build
+from extensions import db
+from models import Membro, MembroEngajamento, MensagemAfastado, recalcular_engajamento
+from utils import secretaria_required
+from limites import limitar_requisicoes, SEMAFORO_IA
+from metricas import medir_chamada
+
+bp = Blueprint('ia', __name__, cli_group=None)
+
+# Cache das buscas no Google (evita repetir a mesma consulta a cada mensagem)
+BUSCA_CACHE_TTL = int(os.getenv("BUSCA_CACHE_TTL", 6 * 60 * 60))
+_busca_cache = TTLCache(maxsize=256, ttl=BUSCA_CACHE_TTL)
+_busca_cache_lock = Lock()
+
+def pesquisar_google(query, num_results=5):
+    chave = (" ".join(query.lower().split()), num_results)
+    with _busca_cache_lock:
+        if chave in _busca_cache:
+            return _busca_cache[chave]
+
+    try:
+        with medir_chamada('google_search'):
+            service = build("customsearch", "v1", developerKey=os.getenv("GOOGLE_SEARCH_API_KEY"))
+            result = service.cse().list(
+                q=query,
+                cx=os.getenv("GOOGLE_SEARCH_CX"),
+                num=num_results
+            ).execute()
+
+        items = result.get("items", [])
+        texto = ""
+
+        for item in items:
+            titulo = item.get("title", "")
+            snippet = item.get("snippet", "")
+            link = item.get("link", "")
+            texto += f"• {titulo}\n{snippet}\nFonte: {link}\n\n"
+
+        texto = texto if texto else None
+
+    except Exception as e:
+        print("Erro ao pesquisar:", e)
+        return None
+
+    with _busca_cache_lock:
+        _busca_cache[chave] = texto
+    return texto
+
+# Classificador local: decide se a pergunta precisa de dados atualizados da
+# internet sem gastar uma chamada extra ao Gemini.
+PADRAO_BUSCA_INTERNET = re.compile(
+    r"\b("
+    r"hoje|agora|atual(?:mente|izad[oa]s?)?|recente(?:s|mente)?|[uú]ltim[oa]s?|"
+    r"not[ií]cias?|aconteceu|acontecendo|previs[aã]o|clima|tempo em|temperatura|"
+    r"cota[cç][aã]o|d[oó]lar|pre[cç]o|resultado|placar|elei[cç][aã]o|"
+    r"esta semana|este m[eê]s|este ano|amanh[aã]|ontem|20[2-9]\d"
+    r")\b",
+    re.IGNORECASE
+)
+
+def precisa_busca_internet(pergunta):
+    return bool(PADRAO_BUSCA_INTERNET.search(pergunta))
+
+# ================================
+# GEMINI (IA) - CONFIGURAÇÃO 2025 (CORRIGIDA)
+# ================================
+_modelo = None
+_modelo_lock = Lock()
+
+def obter_modelo():
+    """Cria o cliente do Gemini na primeira chamada, e não na importação do módulo."""
+    global _modelo
+    with _modelo_lock:
+        if _modelo is None:
+            genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+            # Modelo compatível com a API v1beta — 100% funcional
+            _modelo = genai.GenerativeModel("models/gemini-2.5-flash")
+    return _modelo
+
+CONTEXTO_IGREJA = """
+Você é o Assistente Inteligente oficial da Comunidade Batista Vida Efatá, em Carapebus/RJ.
+Fale com amor, respeito e base bíblica. Seja acolhedor e pastoral.
+
+Informações oficiais:
+- Igreja: Comunidade Batista Vida Efatá
+- Pastor titular: Pr. Waldir Júnior
+- Pastores auxiliares: Pr. Waldir Franco e Pra. Maria de Lourdes
+- Secretaria: Diaconisa Maria de Fátima
+- Cultos: Quarta 19h30 | Domingo 18h30
+- Endereço: Rua Silas Fontes Caetano, 91 – Carapebus/RJ
+- Pix: sibcarapebus@gmail.com
+- Hoje é {hoje}
+
+Nunca invente informações. Se não souber, diga: "Vou verificar com a secretaria!"
+"""
+
+def contexto_igreja():
+    # A data é preenchida a cada chamada: com --preload o processo vive vários dias
+    return CONTEXTO_IGREJA.format(hoje=datetime.now().strftime("%d de %B de %Y"))
+
+# ================================
+# IA FUNCIONANDO 100%
+# ================================
+@bp.route('/secretaria/ia_chat')
+@login_required
+@secretaria_required
+def ia_chat():
+    return render_template('secretaria/ia_chat.html')
+
+
+def montar_prompt_ia(pergunta):
+    # A busca só acontece quando o classificador local indicar que a
+    # pergunta depende da internet
+    resposta_google = pesquisar_google(pergunta) if precisa_busca_internet(pergunta) else None
+
+    if resposta_google:
+        return (
+            contexto_igreja() +
+            f"\n\nPergunta do usuário: {pergunta}\n"
+            "Aqui estão os dados encontrados na internet:\n\n"
+            f"{resposta_google}\n\n"
+            "Resuma de forma clara, amorosa e pastoral."
+        )
+    return contexto_igreja() + f"\n\nPergunta: {pergunta}"
+
+
+def evento_sse(dados, evento=None):
+    linhas = f"event: {evento}\n" if evento else ""
+    return linhas + f"data: {json.dumps(dados, ensure_ascii=False)}\n\n"
+
+
+def resposta_sse(gerador):
+    # Cabeçalhos que impedem proxies (nginx/Heroku) de acumular os pedaços
+    return Response(stream_with_context(gerador), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+def transmitir_gemini(montar_prompt, mensagem_erro, log_prefixo="Erro Gemini"):
+    """Gera eventos SSE com os pedaços de texto à medida que o Gemini responde."""
+    enviou_algo = False
+    try:
+        # Fora da medição: o prompt pode incluir a busca no Google (medida à parte)
+        prompt = montar_prompt()
+        with medir_chamada('gemini'):
+            for pedaco in obter_modelo().generate_content(prompt, stream=True):
+                texto = getattr(pedaco, 'text', '')
+                if texto:
+                    enviou_algo = True
+                    yield evento_sse({"texto": texto})
+    except Exception as e:
+        print(f"{log_prefixo} (stream):", e)
+        if not enviou_algo:
+            yield evento_sse({"texto": mensagem_erro})
+    yield evento_sse({}, evento="fim")
+
+
+@bp.route('/ia/pergunta', methods=['POST'])
+@login_required
+@secretaria_required
+def ia_pergunta():
+    pergunta = request.json.get('pergunta', '').strip()
+    if not pergunta:
+        return jsonify({"resposta": "Digite sua pergunta, por favor!"})
+
+    try:
+        prompt = montar_prompt_ia(pergunta)  # a busca no Google tem a sua própria métrica
+        with medir_chamada('gemini'):
+            resposta_final = obter_modelo().generate_content(prompt).text.strip()
+    except Exception as e:
+        print("Erro Gemini:", e)
+        resposta_final = "Desculpe, não consegui responder agora. Tente novamente em alguns minutos."
+
+    return jsonify({"resposta": resposta_final})
+
+
+@bp.route('/ia/pergunta/stream', methods=['POST'])
+@login_required
+@secretaria_required
+def ia_pergunta_stream():
+    pergunta = (request.get_json(silent=True) or {}).get('pergunta', '').strip()
+    if not pergunta:
+        return resposta_sse(iter([
+            evento_sse({"texto": "Digite sua pergunta, por favor!"}),
+            evento_sse({}, evento="fim")
+        ]))
+
+    return resposta_sse(transmitir_gemini(
+        lambda: montar_prompt_ia(pergunta),
+        "Desculpe, não consegui responder agora. Tente novamente em alguns minutos."
+    ))
+
+
+AFASTADOS_DIAS = 35
+IA_MAX_CONCORRENCIA = int(os.getenv("IA_MAX_CONCORRENCIA", 5))
+
+def semana_atual():
+    ano, semana, _ = datetime.now().isocalendar()
+    return f"{ano}-W{semana:02d}"
+
+def query_afastados(ordem='nome'):
+    # Consulta por faixa no índice de ultimo_contato (membro_engajamento)
+    data_limite = datetime.now() - timedelta(days=AFASTADOS_DIAS)
+    query = Membro.query.outerjoin(MembroEngajamento).options(contains_eager(Membro.engajamento)).filter(
+        Membro.status == 'ativo',
+        or_(MembroEngajamento.ultimo_contato.is_(None), MembroEngajamento.ultimo_contato < data_limite)
+    )
+    if ordem == 'dias':
+        return query.order_by(MembroEngajamento.ultimo_contato.asc().nullsfirst(), Membro.nome)
+    return query.order_by(Membro.nome)
+
+def mensagem_padrao_afastado(nome):
+    return f"Querido(a) {nome}, sentimos sua falta! Você é muito especial para nós."
+
+def gerar_mensagem_afastado(nome):
+    # Roda em thread separada: não acessa o banco, apenas o Gemini
+    prompt = (
+        f"Escreva uma mensagem curta, delicada e cheia de amor para "
+        f"{nome}, que não vem à igreja há mais de 30 dias."
+    )
+    try:
+        with medir_chamada('gemini'):
+            return obter_modelo().generate_content(prompt).text.strip()
+    except Exception as e:
+        print(f"Erro Gemini (afastados - {nome}):", e)
+        return None
+
+def mensagens_afastados(membros):
+    """Retorna {membro_id: mensagem}. Usa o cache da semana e gera o que faltar em paralelo."""
+    semana = semana_atual()
+    ids = [m.id for m in membros]
+    textos = {
+        c.membro_id: c.mensagem
+        for c in MensagemAfastado.query.filter(
+            MensagemAfastado.semana == semana,
+            MensagemAfastado.membro_id.in_(ids)
+        )
+    } if ids else {}
+
+    faltando = [m for m in membros if m.id not in textos]
+    if not faltando:
+        return textos
+
+    with ThreadPoolExecutor(max_workers=min(IA_MAX_CONCORRENCIA, len(faltando))) as pool:
+        geradas = list(pool.map(gerar_mensagem_afastado, [m.nome for m in faltando]))
+
+    for membro, texto in zip(faltando, geradas):
+        if texto:
+            db.session.add(MensagemAfastado(membro_id=membro.id, semana=semana, mensagem=texto))
+            textos[membro.id] = texto
+        else:
+            # Falhas não vão para o cache: tentamos de novo na próxima vez
+            textos[membro.id] = mensagem_padrao_afastado(membro.nome)
+
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Outro worker gerou a mesma mensagem ao mesmo tempo
+        db.session.rollback()
+
+    return textos
+
+@bp.route('/ia/afastados')
+@login_required
+@secretaria_required
+def ia_afastados():
+    page = request.args.get('page', 1, type=int)
+    ordem = request.args.get('ordem', 'nome')
+    afastados = query_afastados(ordem).paginate(page=page, per_page=20, error_out=False)
+
+    textos = mensagens_afastados(afastados.items)
+    mensagens = [{"membro": m, "mensagem": textos[m.id]} for m in afastados.items]
+
+    # Mesmo relógio (local) de ultimo_contato; o `now` dos templates é UTC
+    return render_template('secretaria/ia_afastados.html', mensagens=mensagens, afastados=afastados, ordem=ordem,
+                           agora=datetime.now())
+
+@bp.cli.command('recalcular-engajamento')
+def recalcular_engajamento_cmd():
+    """Recalcula o índice de engajamento de todos os membros (rodar 1x por noite)."""
+    with db.engine.begin() as conn:
+        total = recalcular_engajamento(conn)
+    print(f"Engajamento recalculado para {total} membros.")
+
+@bp.cli.command('gerar-mensagens-afastados')
+def gerar_mensagens_afastados_cmd():
+    """Pré-gera as mensagens da semana para todos os afastados (rodar 1x por noite)."""
+    removidas = MensagemAfastado.query.filter(MensagemAfastado.semana != semana_atual()).delete()
+    db.session.commit()
+
+    total = 0
+    page = 1
+    while True:
+        lote = query_afastados().paginate(page=page, per_page=50, error_out=False)
+        mensagens_afastados(lote.items)
+        total += len(lote.items)
+        if not lote.has_next:
+            break
+        page += 1
+
+    print(f"{total} mensagens de afastados prontas ({removidas} antigas removidas).")
+
+# ================================
+# ASSISTENTE PÚBLICO (sem login!)
+# ================================
+@bp.route('/assistente')
+def assistente():
+    return render_template('public/assistente.html')
+
+@bp.route('/assistente/pergunta', methods=['POST'])
+@limitar_requisicoes('assistente', por_ip="10/60", total="60/60", semaforo=SEMAFORO_IA,
+                     mensagem="Muitas perguntas ao mesmo tempo. Aguarde alguns segundos e tente novamente.")
+def assistente_pergunta_publica():
+    pergunta = request.json.get('pergunta', '').strip()
+    if not pergunta:
+        return jsonify({"resposta": "Por favor, digite sua pergunta."})
+
+    try:
+        with medir_chamada('gemini'):
+            resposta = obter_modelo().generate_content(contexto_igreja() + f"\n\nPergunta do visitante: {pergunta}")
+            texto = resposta.text.strip()
+    except Exception as e:
+        print("Erro Gemini (público):", e)
+        texto = "Oi! No momento estou com uma pequena instabilidade, mas já já volto! Pode tentar novamente em alguns segundos."
+
+    return jsonify({"resposta": texto})
+
+@bp.route('/assistente/pergunta/stream', methods=['POST'])
+@limitar_requisicoes('assistente', por_ip="10/60", total="60/60", semaforo=SEMAFORO_IA,
+                     mensagem="Muitas perguntas ao mesmo tempo. Aguarde alguns segundos e tente novamente.")
+def assistente_pergunta_publica_stream():
+    pergunta = (request.get_json(silent=True) or {}).get('pergunta', '').strip()
+    if not pergunta:
+        return resposta_sse(iter([
+            evento_sse({"texto": "Por favor, digite sua pergunta."}),
+            evento_sse({}, evento="fim")
+        ]))
+
+    return resposta_sse(transmitir_gemini(
+        lambda: contexto_igreja() + f"\n\nPergunta do visitante: {pergunta}",
+        "Oi! No momento estou com uma pequena instabilidade, mas já já volto! Pode tentar novamente em alguns segundos.",
+        log_prefixo="Erro Gemini (público)"
+    ))
@@ -0,0 +1,368 @@
+import os
+from datetime import datetime, timedelta
+from smtplib import SMTP
+from email.mime.text import MIMEText
+from threading import Lock, Event, Thread
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash
+from flask_login import login_required, current_user
+from flask_mail import Message
+from twilio.rest import Client
+from extensions import db, mail
+from models import Membro, Ministerio, MensagemEnviada, MensagemContato
+from utils import secretaria_required
+from limites import limitar_requisicoes
+from metricas import medir_chamada
+
+bp = Blueprint('mensagens', __name__, cli_group=None)
+
+# Twilio (SMS)
+TWILIO_SID = os.getenv('TWILIO_SID')
+TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN')
+TWILIO_PHONE = os.getenv('TWILIO_PHONE')
+twilio_client = Client(TWILIO_SID, TWILIO_AUTH_TOKEN) if TWILIO_SID and TWILIO_AUTH_TOKEN else None
+
+# ================================
+# ENVIO DAS MENSAGENS DE CONTATO (em segundo plano)
+# ================================
+CONTATO_EMAIL_USER = os.getenv("CONTATO_EMAIL_USER", "combavecarapebus@gmail.com")
+CONTATO_EMAIL_PASS = os.getenv("CONTATO_EMAIL_PASS")
+CONTATO_MAX_TENTATIVAS = 5
+CONTATO_RESERVA = timedelta(minutes=10)  # tempo máximo de um item em "enviando"
+
+def montar_email_contato(contato):
+    conteudo = f"""
+        Nova mensagem enviada pelo site:
+
+        Nome: {contato.nome}
+        Email: {contato.email}
+        Mensagem:
+        {contato.mensagem}
+        """
+
+    msg = MIMEText(conteudo)
+    msg["Subject"] = "Nova mensagem enviada pelo site COMBAVE"
+    msg["From"] = CONTATO_EMAIL_USER
+    msg["To"] = CONTATO_EMAIL_USER
+    if contato.email:
+        msg["Reply-To"] = contato.email
+    return msg
+
+def reservar_contatos(limite):
+    """Marca como 'enviando' os itens prontos para envio e retorna seus ids."""
+    agora = datetime.utcnow()
+    prontos = db.session.query(MensagemContato.id, MensagemContato.status).filter(
+        MensagemContato.status.in_(['pendente', 'enviando']),
+        MensagemContato.proxima_tentativa <= agora
+    ).order_by(MensagemContato.id).limit(limite).all()
+
+    reservados = []
+    for contato_id, status in prontos:
+        # UPDATE condicional: se outro worker já reservou, rowcount == 0
+        resultado = db.session.execute(
+            db.update(MensagemContato)
+            .where(MensagemContato.id == contato_id,
+                   MensagemContato.status == status,
+                   MensagemContato.proxima_tentativa <= agora)
+            .values(status='enviando', proxima_tentativa=agora + CONTATO_RESERVA)
+        )
+        if resultado.rowcount:
+            reservados.append(contato_id)
+    db.session.commit()
+    return reservados
+
+def enviar_contatos_pendentes(limite=50):
+    """Envia a fila de contatos usando uma única conexão SMTP. Retorna quantos foram enviados."""
+    if not CONTATO_EMAIL_PASS:
+        print("CONTATO_EMAIL_PASS não configurada; mensagens de contato ficam na fila.")
+        return 0
+
+    reservados = reservar_contatos(limite)
+    if not reservados:
+        return 0
+
+    smtp = None
+    enviados = 0
+    for contato in MensagemContato.query.filter(MensagemContato.id.in_(reservados)).order_by(MensagemContato.id):
+        try:
+            with medir_chamada('smtp'):
+                if smtp is None:
+                    smtp = SMTP("smtp.gmail.com", 587, timeout=30)
+                    smtp.starttls()
+                    smtp.login(CONTATO_EMAIL_USER, CONTATO_EMAIL_PASS)
+                smtp.send_message(montar_email_contato(contato))
+            contato.status = 'enviado'
+            contato.enviado_em = datetime.utcnow()
+            contato.erro = None
+            enviados += 1
+        except Exception as e:
+            print("Erro ao enviar contato:", e)
+            contato.tentativas = (contato.tentativas or 0) + 1
+            contato.erro = str(e)
+            if contato.tentativas >= CONTATO_MAX_TENTATIVAS:
+                contato.status = 'erro'
+            else:
+                # Backoff exponencial: 2, 4, 8, 16 minutos
+                contato.status = 'pendente'
+                contato.proxima_tentativa = datetime.utcnow() + timedelta(minutes=2 ** contato.tentativas)
+            # A conexão pode ter caído; abre outra no próximo item
+            if smtp is not None:
+                try:
+                    smtp.close()
+                except Exception:
+                    pass
+                smtp = None
+        db.session.commit()
+
+    if smtp is not None:
+        try:
+            smtp.quit()
+        except Exception:
+            pass
+    return enviados
+
+_remetente_evento = Event()
+_remetente_lock = Lock()
+_remetente_thread = None
+
+def _loop_remetente_contatos(app):
+    while True:
+        _remetente_evento.wait(timeout=60)
+        _remetente_evento.clear()
+        with app.app_context():
+            try:
+                enviar_contatos_pendentes()
+            except Exception as e:
+                print("Erro no envio da fila de contatos:", e)
+                db.session.rollback()
+
+def acordar_remetente_contatos():
+    """Inicia (uma vez por worker) a thread de envio e pede para ela processar a fila."""
+    global _remetente_thread
+    with _remetente_lock:
+        if _remetente_thread is None or not _remetente_thread.is_alive():
+            _remetente_thread = Thread(target=_loop_remetente_contatos, args=(current_app._get_current_object(),),
+                                       name='remetente-contatos', daemon=True)
+            _remetente_thread.start()
+    _remetente_evento.set()
+
+@bp.cli.command('enviar-contatos')
+def enviar_contatos_cmd():
+    """Processa a fila de mensagens de contato uma vez (para agendador/cron)."""
+    total = enviar_contatos_pendentes(limite=500)
+    print(f"{total} mensagens de contato enviadas.")
+
+@bp.route('/contato', methods=['GET', 'POST'])
+@limitar_requisicoes('contato', por_ip="3/600", total="30/60",
+                     mensagem="Recebemos muitas mensagens agora. Tente novamente em alguns minutos.")
+def contato():
+    if request.method == 'POST':
+        # Grava na fila e responde na hora; o envio por e-mail acontece em segundo plano
+        db.session.add(MensagemContato(
+            nome=request.form.get('nome'),
+            email=request.form.get('email'),
+            mensagem=request.form.get('mensagem') or ''
+        ))
+        db.session.commit()
+        acordar_remetente_contatos()
+
+        flash("Mensagem enviada com sucesso!", "success")
+        return redirect(url_for("mensagens.contato"))
+
+    return render_template('public/contato.html')
+
+@bp.route('/secretaria/contatos')
+@secretaria_required
+@login_required
+def contatos_recebidos():
+    page = request.args.get('page', 1, type=int)
+    filtro = request.args.get('filtro', 'pendentes')  # pendentes, erro, enviados, todos
+
+    query = MensagemContato.query
+    if filtro == 'pendentes':
+        query = query.filter(MensagemContato.status.in_(['pendente', 'enviando']))
+    elif filtro == 'erro':
+        query = query.filter_by(status='erro')
+    elif filtro == 'enviados':
+        query = query.filter_by(status='enviado')
+
+    contatos = query.order_by(MensagemContato.criado_em.desc())\
+                    .paginate(page=page, per_page=20, error_out=False)
+
+    return render_template('secretaria/contatos.html', contatos=contatos, filtro=filtro)
+
+@bp.route('/secretaria/contatos/<int:id>/reenviar', methods=['POST'])
+@secretaria_required
+@login_required
+def reenviar_contato(id):
+    contato = MensagemContato.query.get_or_404(id)
+    contato.status = 'pendente'
+    contato.tentativas = 0
+    contato.proxima_tentativa = datetime.utcnow()
+    db.session.commit()
+    acordar_remetente_contatos()
+    flash("Mensagem colocada novamente na fila de envio.", "info")
+    return redirect(url_for('mensagens.contatos_recebidos', filtro=request.args.get('filtro', 'pendentes')))
+
+
+# ================================
+# ENVIO DE MENSAGENS (CORRIGIDO!)
+# ================================
+@bp.route('/secretaria/enviar_mensagem', methods=['GET', 'POST'])
+@secretaria_required
+@login_required
+def enviar_mensagem():
+    if request.method == 'POST':
+        tipo = request.form['tipo']
+        destinatario_tipo = request.form['destinatario_tipo']
+        ministerio_nomes = request.form.getlist('ministerio_nomes[]')
+        membro_ids = request.form.getlist('membro_ids[]')
+        assunto = request.form.get('assunto', '').strip()
+        corpo = request.form['corpo']
+
+        # === COLETA DOS DESTINATÁRIOS ===
+        membros = []
+        if destinatario_tipo == 'todos':
+            membros = Membro.query.all()
+        elif destinatario_tipo == 'ministerio' and ministerio_nomes:
+            for mn in ministerio_nomes:
+                membros.extend(Membro.query.filter_by(ministerio=mn).all())
+        elif destinatario_tipo == 'individual' and membro_ids:
+            for mid in membro_ids:
+                m = Membro.query.get(int(mid))
+                if m:
+                    membros.append(m)
+
+        # Remove duplicados
+        membros = list({m.id: m for m in membros}.values())
+
+        enviados = 0
+        erros = []
+
+        # ============================================
+        # ENVIO DAS MENSAGENS (EMAIL OU SMS)
+        # ============================================
+        for membro in membros:
+            destinatario = membro.email if tipo == 'email' else membro.celular
+            if not destinatario:
+                continue
+
+            try:
+                # =======================
+                # ENVIO DE EMAIL
+                # =======================
+                if tipo == 'email':
+                    msg = Message(
+                        subject=assunto or "Mensagem da Igreja Vida Efatá",
+                        sender=current_app.config['MAIL_USERNAME'],
+                        recipients=[destinatario],
+                        body=corpo
+                    )
+                    with medir_chamada('smtp'):
+                        mail.send(msg)
+
+                    db.session.add(MensagemEnviada(
+                        tipo='email',
+                        destinatario=destinatario,
+                        assunto=assunto,
+                        corpo=corpo,
+                        status='enviado',
+                        user_id=current_user.id
+                    ))
+                    enviados += 1
+
+                # =======================
+                # ENVIO DE SMS (TWILIO)
+                # =======================
+                elif tipo == 'sms' and twilio_client:
+                    celular = ''.join(filter(str.isdigit, destinatario))
+
+                    if not celular:
+                        continue
+
+                    # Formato internacional
+                    if not celular.startswith('+'):
+                        celular = '+55' + celular
+
+                    with medir_chamada('twilio'):
+                        twilio_client.messages.create(
+                            body=corpo,
+                            from_=TWILIO_PHONE,
+                            to=celular
+                        )
+
+                    db.session.add(MensagemEnviada(
+                        tipo='sms',
+                        destinatario=celular,
+                        assunto="SMS",
+                        corpo=corpo,
+                        status='enviado',
+                        user_id=current_user.id
+                    ))
+                    enviados += 1
+
+            except Exception as e:
+                erro_msg = str(e)
+                erros.append(f"{membro.nome} ({destinatario}): {erro_msg}")
+
+                db.session.add(MensagemEnviada(
+                    tipo=tipo,
+                    destinatario=destinatario,
+                    assunto=assunto,
+                    corpo=corpo,
+                    status='erro',
+                    erro=erro_msg,
+                    user_id=current_user.id
+                ))
+
+        db.session.commit()
+
+        flash(f"Mensagens enviadas: {enviados}. Erros: {len(erros)}", "info")
+        return redirect(url_for('mensagens.enviar_mensagem'))
+
+    # GET → carregar página
+    ministerios = Ministerio.query.order_by(Ministerio.nome).all()
+    membros = Membro.query.order_by(Membro.nome).all()
+    return render_template('secretaria/enviar_mensagem.html',
+                           ministerios=ministerios,
+                           membros=membros)
+
+
+@bp.route('/mensagem/<int:id>/excluir', methods=['POST'])
+@secretaria_required
+@login_required
+def excluir_mensagem(id):
+    msg = MensagemEnviada.query.get_or_404(id)
+    if msg.user_id != current_user.id and not current_user.is_admin:
+        flash("Você não tem permissão para excluir esta mensagem.", "danger")
+        return redirect(url_for('mensagens.mensagens_enviadas'))
+    db.session.delete(msg)
+    db.session.commit()
+    flash('Mensagem excluída com sucesso!', 'success')
+    return redirect(url_for('mensagens.mensagens_enviadas'))
+
+
+# ================================
+# VER MENSAGENS ENVIADAS
+# ================================
+@bp.route('/secretaria/mensagens_enviadas')
+@secretaria_required
+@login_required
+def mensagens_enviadas():
+    page = request.args.get('page', 1, type=int)
+    filtro = request.args.get('filtro', 'todas')  # todas, email, sms, erro
+
+    query = MensagemEnviada.query.filter_by(user_id=current_user.id)
+
+    if filtro == 'email':
+        query = query.filter_by(tipo='email')
+    elif filtro == 'sms':
+        query = query.filter_by(tipo='sms')
+    elif filtro == 'erro':
+        query = query.filter_by(status='erro')
+
+    mensagens = query.order_by(MensagemEnviada.enviado_em.desc())\
+                     .paginate(page=page, per_page=20, error_out=False)
+
+    return render_template('secretaria/mensagens_enviadas.html',
+                           mensagens=mensagens,
+                           filtro=filtro)
@@ -0,0 +1,88 @@
+import os
+from flask import Blueprint, current_app, render_template, redirect, url_for, flash, send_file
+from flask_login import login_user, logout_user, login_required
+from werkzeug.security import check_password_hash
+from models import User, Evento, Ministerio
+from forms import LoginForm
+from metricas import BYTES_UPLOADS
+from cache_paginas import cache_publico, invalidar_paginas_publicas, PASTA_CACHE
+
+bp = Blueprint('publico', __name__, cli_group=None)
+
+# ================================
+# ROTAS PÚBLICAS
+# ================================
+@bp.route('/')
+@cache_publico
+def index():
+    eventos = Evento.query.order_by(Evento.data.asc()).limit(3).all()
+    return render_template('public/public_index.html', eventos=eventos)
+
+@bp.route('/eventos')
+@cache_publico
+def eventos():
+    eventos = Evento.query.order_by(Evento.data.desc()).all()
+    return render_template('public/eventos.html', eventos=eventos)
+
+@bp.route('/ministerios')
+@cache_publico
+def ministerios():
+    ministerios = Ministerio.query.order_by(Ministerio.nome).all()
+    return render_template('public/ministerios.html', ministerios=ministerios)
+
+PAGINAS_CACHEADAS = ('/', '/eventos', '/ministerios')
+
+@bp.cli.command('prerenderizar-paginas')
+def prerenderizar_paginas_cmd():
+    """Invalida o cache e gera em disco as páginas públicas (ex.: antes do culto de domingo)."""
+    versao = invalidar_paginas_publicas()
+    cliente = current_app.test_client()
+    for caminho in PAGINAS_CACHEADAS:
+        print(f"{caminho}: {cliente.get(caminho).status_code}")
+    print(f"Páginas da versão {versao} em {PASTA_CACHE}")
+
+@bp.route('/sobre')
+def sobre():
+    return render_template('public/sobre.html')
+
+# ================================
+# LOGIN / LOGOUT
+# ================================
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    form = LoginForm()
+    if form.validate_on_submit():
+        user = User.query.filter_by(email=form.email.data).first()
+        if user and check_password_hash(user.senha, form.senha.data):
+            login_user(user)
+            flash("Login realizado com sucesso!", "success")
+
+            if user.membro_id:
+                return redirect(url_for("financeiro.financeiro_membro"))
+
+            if user.nivel_acesso <= 3:
+                return redirect(url_for("secretaria.secretaria"))
+            elif user.nivel_acesso == 4:
+                return redirect(url_for("secretaria.listar_membros"))
+            else:
+                return redirect(url_for("financeiro.financeiro_membro"))
+
+        flash("Credenciais inválidas!", "danger")
+    return render_template('auth/login.html', form=form)
+
+@bp.route('/logout')
+@login_required
+def logout():
+    logout_user()
+    flash("Logout realizado com sucesso.", "info")
+    return redirect(url_for('publico.index'))
+
+# ================================
+# UPLOADS
+# ================================
+@bp.route('/uploads/<filename>')
+def uploaded_file(filename):
+    resp = send_file(os.path.join(current_app.config['UPLOAD_FOLDER'], filename))
+    if resp.status_code == 200 and resp.content_length:
+        BYTES_UPLOADS.inc(resp.content_length)
+    return resp
@@ -0,0 +1,522 @@
+import os
+import csv
+from io import StringIO
+from datetime import datetime
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, jsonify
+from flask_login import login_required, current_user
+from werkzeug.utils import secure_filename
+from werkzeug.security import generate_password_hash
+from sqlalchemy import or_
+import desempenho
+from extensions import db
+from models import User, Membro, Evento, Ministerio, Compromisso
+from forms import UsuarioForm, MembroForm, EventoForm, MinisterioForm, CompromissoForm
+from utils import admin_required, secretaria_required, financeiro_required
+from cache_paginas import invalidar_paginas_publicas
+from painel import estatisticas_painel
+from opcoes import opcoes_membros, muitos_membros, nome_membro, buscar_membros
+
+bp = Blueprint('secretaria', __name__)
+
+# ================================
+# SECRETARIA
+# ================================
+@bp.route('/secretaria')
+@login_required
+def secretaria():
+    if current_user.nivel_acesso > 2:
+        flash("Acesso restrito.", "danger")
+        return redirect(url_for('publico.index'))
+
+    # Os números e listas chegam por /secretaria/painel/dados (ver painel.py)
+    return render_template('secretaria/secretaria_dashboard.html')
+
+@bp.route('/secretaria/painel/dados')
+@secretaria_required
+@login_required
+def painel_dados():
+    dados = dict(estatisticas_painel())
+    dados['eventos_recentes'] = [
+        {**e, 'url': url_for('secretaria.editar_evento', id=e['id'])} for e in dados['eventos_recentes']
+    ]
+    dados['compromissos_proximos'] = [
+        {**c, 'url': url_for('secretaria.detalhes_compromisso', id=c['id'])} for c in dados['compromissos_proximos']
+    ]
+    return jsonify(dados)
+
+# ================================
+# LEA DASHBOARD (NOVA PÁGINA PERSONALIZADA)
+# ================================
+@bp.route('/lea')
+@login_required
+@secretaria_required
+def lea_dashboard():
+    # Verifica se o usuário atual é "Lea" (baseado no nome ou email; ajuste conforme necessário)
+    if not current_user.is_admin and current_user.nome.lower() != 'lea' and current_user.email.lower() != 'lea@example.com':
+        flash("Acesso restrito a Lea.", "danger")
+        return redirect(url_for('secretaria.secretaria'))
+
+    # Mesmo snapshot do dashboard padrão, carregado por /secretaria/painel/dados
+    return render_template('secretaria/lea_dashboard.html')
+
+# ================================
+# EVENTOS - NOVA ROTA PARA LISTAGEM (POIS NÃO EXISTIA ANTES)
+# ================================
+@bp.route('/secretaria/eventos')
+@secretaria_required
+@login_required
+def listar_eventos():
+    eventos = Evento.query.order_by(Evento.data.desc()).all()
+    return render_template('secretaria/eventos_list.html', eventos=eventos)
+
+@bp.route('/secretaria/eventos/editar/<int:id>', methods=['GET', 'POST'])
+@secretaria_required
+@login_required
+def editar_evento(id):
+    evento = Evento.query.get_or_404(id)
+    form = EventoForm(obj=evento)
+    if form.validate_on_submit():
+        evento.titulo = form.titulo.data
+        evento.descricao = form.descricao.data
+        evento.data = form.data.data
+        if form.imagem.data:
+            filename = secure_filename(form.imagem.data.filename)
+            form.imagem.data.save(os.path.join(current_app.config['UPLOAD_FOLDER'], filename))
+            evento.imagem = filename
+        db.session.commit()
+        invalidar_paginas_publicas()
+        flash("Evento atualizado com sucesso!", "success")
+        return redirect(url_for('secretaria.listar_eventos'))
+    return render_template('secretaria/eventos_form.html', form=form, title="Editar Evento")
+
+@bp.route('/secretaria/eventos/excluir/<int:id>', methods=['POST'])
+@secretaria_required
+@login_required
+def excluir_evento(id):
+    evento = Evento.query.get_or_404(id)
+    db.session.delete(evento)
+    db.session.commit()
+    invalidar_paginas_publicas()
+    flash("Evento excluído com sucesso!", "info")
+    return redirect(url_for('secretaria.listar_eventos'))
+
+
+
+# ================================
+# USUÁRIOS
+# ================================
+@bp.route('/secretaria/usuarios/novo', methods=['GET', 'POST'])
+@admin_required
+@login_required
+def novo_usuario():
+    form = UsuarioForm()
+    if form.validate_on_submit():
+        if User.query.filter_by(email=form.email.data).first():
+            flash("Este email já está cadastrado.", "danger")
+            return redirect(url_for('secretaria.novo_usuario'))
+        hashed = generate_password_hash(form.senha.data)
+        user = User(
+            nome=form.nome.data,
+            email=form.email.data,
+            senha=hashed,
+            nivel_acesso=form.nivel_acesso.data,
+            is_secretaria=(form.nivel_acesso.data <= 2),
+            is_admin=(form.nivel_acesso.data == 1)
+        )
+        if form.membro_id.data and form.membro_id.data != 0:
+            user.membro_id = form.membro_id.data
+        db.session.add(user)
+        db.session.commit()
+        flash("Usuário criado com sucesso!", "success")
+        return redirect(url_for('secretaria.secretaria'))
+    return render_template('secretaria/usuarios_form.html', form=form)
+
+@bp.route('/secretaria/usuarios')
+@admin_required
+@login_required
+def listar_usuarios():
+    usuarios = User.query.order_by(User.nivel_acesso, User.nome).all()
+    return render_template('secretaria/usuarios_list.html', usuarios=usuarios)
+
+# ================================
+# MINISTÉRIOS
+# ================================
+@bp.route('/secretaria/ministerios')
+@secretaria_required
+@login_required
+def listar_ministerios():
+    ministerios = Ministerio.query.order_by(Ministerio.nome).all()
+    return render_template('secretaria/ministerios_list.html', ministerios=ministerios)
+
+@bp.route('/secretaria/ministerios/novo', methods=['GET', 'POST'])
+@secretaria_required
+@login_required
+def novo_ministerio():
+    form = MinisterioForm()
+    if form.validate_on_submit():
+        ministerio = Ministerio(nome=form.nome.data, lider=form.lider.data, descricao=form.descricao.data)
+        db.session.add(ministerio)
+        db.session.commit()
+        invalidar_paginas_publicas()
+        flash("Ministério criado com sucesso!", "success")
+        return redirect(url_for('secretaria.listar_ministerios'))
+    return render_template('secretaria/ministerios_form.html', form=form, title="Novo Ministério")
+
+@bp.route('/secretaria/ministerios/editar/<int:id>', methods=['GET', 'POST'])
+@secretaria_required
+@login_required
+def editar_ministerio(id):
+    ministerio = Ministerio.query.get_or_404(id)
+    form = MinisterioForm(obj=ministerio)
+    if form.validate_on_submit():
+        ministerio.nome = form.nome.data
+        ministerio.lider = form.lider.data
+        ministerio.descricao = form.descricao.data
+        db.session.commit()
+        invalidar_paginas_publicas()
+        flash("Ministério atualizado!", "success")
+        return redirect(url_for('secretaria.listar_ministerios'))
+    return render_template('secretaria/ministerios_form.html', form=form, title="Editar Ministério")
+
+
+@bp.route('/secretaria/ministerios/excluir/<int:id>')
+@secretaria_required
+@login_required
+def excluir_ministerio(id):
+    ministerio = Ministerio.query.get_or_404(id)
+    db.session.delete(ministerio)
+    db.session.commit()
+    invalidar_paginas_publicas()
+    flash("Ministério excluído.", "info")
+    return redirect(url_for('secretaria.listar_ministerios'))
+
+
+# ================================
+# MEMBROS
+# ================================
+@bp.route('/membros')
+@login_required
+def listar_membros():
+    if current_user.nivel_acesso > 4:
+        flash("Acesso negado.", "danger")
+        return redirect(url_for('publico.index'))
+
+    query = request.args.get('q', '').strip()
+    ministerios = Ministerio.query.order_by(Ministerio.nome).all()
+    if query:
+        search = f"%{query}%"
+        membros = Membro.query.filter(
+            or_(Membro.nome.ilike(search), Membro.celular.ilike(search), Membro.email.ilike(search))
+        ).order_by(Membro.nome).all()
+    else:
+        membros = Membro.query.order_by(Membro.nome).all()
+    return render_template('secretaria/membros_list.html', membros=membros, ministerios=ministerios)
+
+@bp.route('/membros/buscar')
+@financeiro_required
+@login_required
+def buscar_membros_json():
+    """Autocomplete dos selects de membro quando a lista é grande demais para o HTML."""
+    limite = min(request.args.get('limite', 20, type=int), 50)
+    return jsonify([{'id': id, 'nome': nome} for id, nome in buscar_membros(request.args.get('q', ''), limite)])
+
+@bp.route('/membro/editar/<int:id>', methods=['GET', 'POST'])
+@secretaria_required
+@login_required
+def editar_membro(id):
+    membro = Membro.query.get_or_404(id)
+    if request.method == 'POST':
+        membro.nome = request.form.get('nome')
+        membro.email = request.form.get('email') or None
+        membro.celular = request.form.get('celular')
+        membro.ministerio = request.form.get('ministerio')
+        membro.estado_civil = request.form.get('estado_civil') or None
+        membro.status = request.form.get('status')
+        if 'foto' in request.files and request.files['foto'].filename:
+            filename = secure_filename(request.files['foto'].filename)
+            request.files['foto'].save(os.path.join(current_app.config['UPLOAD_FOLDER'], filename))
+            membro.foto = filename
+        membro.ativo = (membro.status == 'ativo')
+        db.session.commit()
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return jsonify({'success': True, 'membro': {
+                'id': membro.id, 'nome': membro.nome, 'email': membro.email,
+                'celular': membro.celular, 'ministerio': membro.ministerio,
+                'status': membro.status, 'foto': membro.foto
+            }})
+        flash("Membro atualizado com sucesso!", "success")
+        return redirect(url_for('secretaria.listar_membros'))
+    return "Método não permitido", 405
+
+@bp.route('/membro/novo', methods=['GET', 'POST'])
+@login_required
+def novo_membro():
+    if current_user.nivel_acesso > 4:
+        flash("Acesso negado.", "danger")
+        return redirect(url_for('publico.index'))
+
+    form = MembroForm()
+    if form.validate_on_submit():
+        filename = 'default.jpg'
+        if form.foto.data:
+            filename = secure_filename(form.foto.data.filename)
+            form.foto.data.save(os.path.join(current_app.config['UPLOAD_FOLDER'], filename))
+        membro = Membro(
+            nome=form.nome.data,
+            email=form.email.data or None,
+            telefone=form.telefone.data or None,
+            celular=form.celular.data,
+            cep=form.cep.data or None,
+            endereco=form.endereco.data or None,
+            bairro=form.bairro.data or None,
+            cidade=form.cidade.data or "São Paulo",
+            estado=form.estado.data or "SP",
+            data_nascimento=form.data_nascimento.data,
+            estado_civil=form.estado_civil.data or None,
+            conjuge=form.conjuge.data or None,
+            filhos=form.filhos.data or 0,
+            batizado=form.batizado.data,
+            data_batismo=form.data_batismo.data,
+            ministerio=form.ministerio.data,
+            foto=filename,
+            status=form.status.data,
+            ativo=(form.status.data == 'ativo')
+        )
+        db.session.add(membro)
+        db.session.commit()
+        flash("Membro cadastrado com sucesso!", "success")
+        return redirect(url_for('secretaria.listar_membros'))
+    return render_template('secretaria/membros_form.html', form=form, title="Novo Membro")
+
+@bp.route('/membro/excluir/<int:id>', methods=['POST'])
+@secretaria_required
+@login_required
+def excluir_membro(id):
+    membro = Membro.query.get_or_404(id)
+    db.session.delete(membro)
+    db.session.commit()
+    flash(f"Membro {membro.nome} excluído!", "info")
+    return redirect(url_for('secretaria.listar_membros'))
+
+# ================================
+# COMPROMISSOS
+# ================================
+
+@bp.route('/compromisso/<int:id>')
+def detalhes_compromisso(id):
+    compromisso = Compromisso.query.get_or_404(id)
+    return render_template('secretaria/detalhes_compromisso.html', compromisso=compromisso)
+
+# ================================
+# IMPORTAR MEMBROS
+# ================================
+@bp.route('/membros/importar', methods=['GET', 'POST'])
+@secretaria_required
+@login_required
+def importar_membros():
+    if request.method == 'POST':
+        file = request.files['csv_file']
+        if file and file.filename.endswith('.csv'):
+            stream = StringIO(file.stream.read().decode("UTF-8"))
+            csv_reader = csv.DictReader(stream)
+            count = 0
+            for row in csv_reader:
+                try:
+                    celulares = [c.strip() for c in row.get('celular', '').split('|') if c.strip()]
+                    celular = celulares[0] if celulares else ''
+                    dn = row.get('data_nascimento', '')
+                    data_nasc = datetime.strptime(dn, '%d/%m/%Y') if dn and len(dn) == 10 else None
+                    dbat = row.get('data_batismo', '')
+                    data_bat = datetime.strptime(dbat, '%d/%m/%Y') if dbat and len(dbat) == 10 else None
+                    membro = Membro(
+                        nome=row.get('nome', '').strip(),
+                        email=row.get('email', '').strip(),
+                        celular=celular,
+                        data_nascimento=data_nasc,
+                        estado_civil=row.get('estado_civil', '').strip().lower(),
+                        batizado=row.get('batizado', 'nao').lower() == 'sim',
+                        data_batismo=data_bat,
+                        ministerio=row.get('ministerio', '').strip(),
+                        endereco=row.get('endereco', '').strip(),
+                        cep=row.get('cep', '').strip(),
+                        bairro=row.get('bairro', '').strip(),
+                        cidade=row.get('cidade', '').strip() or 'São Paulo',
+                        estado=row.get('estado', '').strip() or 'SP',
+                        conjuge=row.get('conjuge', '').strip(),
+                        ativo=True,
+                        status='ativo'
+                    )
+                    db.session.add(membro)
+                    count += 1
+                except Exception as e:
+                    flash(f"Erro na linha: {row} → {e}", "danger")
+            db.session.commit()
+            flash(f"{count} membros importados com sucesso!", "success")
+            return redirect(url_for('secretaria.listar_membros'))
+    return render_template('secretaria/importar_membros.html')
+
+# ================================
+# AGENDA DE COMPROMISSOS
+# ================================
+@bp.route('/secretaria/agenda')
+@secretaria_required
+@login_required
+def agenda():
+    compromissos = Compromisso.query.order_by(Compromisso.data.desc()).all()
+    return render_template('secretaria/agenda.html', compromissos=compromissos)
+
+@bp.route('/secretaria/agenda/novo', methods=['GET', 'POST'])
+@secretaria_required
+@login_required
+def novo_compromisso():
+    form = CompromissoForm()
+    if form.validate_on_submit():
+        compromisso = Compromisso(
+            titulo=form.titulo.data,
+            descricao=form.descricao.data,
+            data=form.data.data,
+            hora=form.hora.data,
+            local=form.local.data,
+            membro_id=form.membro_id.data if form.membro_id.data != 0 else None,
+            user_id=current_user.id
+        )
+        db.session.add(compromisso)
+        db.session.commit()
+        flash("Compromisso registrado com sucesso!", "success")
+        return redirect(url_for('secretaria.agenda'))
+    return render_template('secretaria/compromisso_form.html', form=form, title="Novo Compromisso")
+
+@bp.route('/secretaria/agenda/editar/<int:id>', methods=['GET', 'POST'])
+@secretaria_required
+@login_required
+def editar_compromisso(id):
+    compromisso = Compromisso.query.get_or_404(id)
+    form = CompromissoForm(obj=compromisso)
+    if form.validate_on_submit():
+        compromisso.titulo = form.titulo.data
+        compromisso.descricao = form.descricao.data
+        compromisso.data = form.data.data
+        compromisso.hora = form.hora.data
+        compromisso.local = form.local.data
+        compromisso.membro_id = form.membro_id.data if form.membro_id.data != 0 else None
+        db.session.commit()
+        flash("Compromisso atualizado!", "success")
+        return redirect(url_for('secretaria.agenda'))
+    return render_template('secretaria/compromisso_form.html', form=form, title="Editar Compromisso")
+
+@bp.route('/secretaria/agenda/excluir/<int:id>', methods=['POST'])
+@secretaria_required
+@login_required
+def excluir_compromisso(id):
+    compromisso = Compromisso.query.get_or_404(id)
+    db.session.delete(compromisso)
+    db.session.commit()
+    flash("Compromisso excluído.", "info")
+    return redirect(url_for('secretaria.agenda'))
+
+# ================================
+# EVENTOS
+# ================================
+@bp.route('/secretaria/eventos/novo', methods=['GET', 'POST'])
+@secretaria_required
+@login_required
+def novo_evento():
+    form = EventoForm()
+    if form.validate_on_submit():
+        filename = None
+        if form.imagem.data:
+            filename = secure_filename(form.imagem.data.filename)
+            form.imagem.data.save(os.path.join(current_app.config['UPLOAD_FOLDER'], filename))
+        evento = Evento(
+            titulo=form.titulo.data,
+            descricao=form.descricao.data,
+            data=form.data.data,
+            imagem=filename
+        )
+        db.session.add(evento)
+        db.session.commit()
+        invalidar_paginas_publicas()
+        flash("Evento criado com sucesso!", "success")
+        return redirect(url_for('secretaria.secretaria'))
+    return render_template('secretaria/eventos_form.html', form=form)
+
+# ================================
+# PDV (stub)
+# ================================
+@bp.route('/pdv')
+@login_required
+def pdv():
+    return render_template('secretaria/pdv.html')
+
+# ================================
+# GERENCIAMENTO DE USUÁRIOS
+# ================================
+@bp.route('/secretaria/usuarios/listar')
+@login_required
+def usuarios_listar():
+    if current_user.nivel_acesso > 3:
+        flash("Acesso negado.", "danger")
+        return redirect(url_for('publico.index'))
+    usuarios = User.query.order_by(User.nome.asc()).all()
+    return render_template('secretaria/usuarios_list.html', usuarios=usuarios)
+
+@bp.route('/secretaria/usuarios/editar/<int:id>', methods=['GET', 'POST'])
+@login_required
+def usuarios_editar(id):
+    if current_user.nivel_acesso > 3:
+        flash("Acesso negado.", "danger")
+        return redirect(url_for('publico.index'))
+    usuario = User.query.get_or_404(id)
+    busca_membros = muitos_membros()
+    if busca_membros:
+        # Só o membro vinculado vai no HTML; os demais chegam pela busca
+        atual = nome_membro(usuario.membro_id)
+        membros = [(usuario.membro_id, atual)] if atual else []
+    else:
+        membros = opcoes_membros()
+    if request.method == 'POST':
+        usuario.nome = request.form.get('nome')
+        usuario.email = request.form.get('email')
+        usuario.nivel_acesso = int(request.form.get('nivel_acesso', usuario.nivel_acesso))
+        usuario.membro_id = int(request.form.get('membro_id')) if request.form.get('membro_id') else None
+        nova_senha = request.form.get('senha')
+        if nova_senha:
+            usuario.senha = generate_password_hash(nova_senha)
+        db.session.commit()
+        flash("Usuário atualizado com sucesso!", "success")
+        return redirect(url_for('secretaria.usuarios_listar'))
+    return render_template('secretaria/usuarios_edit.html', usuario=usuario, membros=membros,
+                           busca_membros=busca_membros)
+
+@bp.route('/secretaria/usuarios/excluir/<int:id>', methods=['POST'])
+@login_required
+def usuarios_excluir(id):
+    if current_user.nivel_acesso != 1:
+        flash("Apenas o Administrador pode excluir usuários.", "danger")
+        return redirect(url_for('secretaria.usuarios_listar'))
+    usuario = User.query.get_or_404(id)
+    db.session.delete(usuario)
+    db.session.commit()
+    flash("Usuário excluído com sucesso!", "info")
+    return redirect(url_for('secretaria.usuarios_listar'))
+
+# ================================
+# DESEMPENHO (tempo e consultas SQL por rota)
+# ================================
+@bp.route('/secretaria/perf')
+@admin_required
+@login_required
+def desempenho_rotas():
+    return render_template('secretaria/perf.html',
+                           rotas=desempenho.resumo_por_endpoint(),
+                           consultas_lentas=desempenho.consultas_lentas(),
+                           sql_lenta_ms=desempenho.SQL_LENTA_MS,
+                           pid=os.getpid())
+
+@bp.route('/secretaria/perf/limpar', methods=['POST'])
+@admin_required
+@login_required
+def limpar_desempenho():
+    desempenho.limpar_amostras()
+    flash("Amostras de desempenho zeradas (neste worker).", "info")
+    return redirect(url_for('secretaria.desempenho_rotas'))
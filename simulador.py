@@ -0,0 +1,133 @@
+import math
+import time
+from statistics import NormalDist
+import numpy as np
+from sqlalchemy import select
+from extensions import db
+from dinheiro import Dinheiro
+from models import Configuracao
+from resumo_financeiro import SALARIO_MEDIO_PADRAO, PERCENTUAL_DIZIMO
+from retrato_financeiro import mes_numero
+
+# ================================
+# SIMULADOR "E SE" DE DIZIMISTAS NECESSÁRIOS
+# ================================
+# O /financeiro calcula dizimistas_necessarios com um salário médio e o mês
+# atual. Aqui a mesma conta é feita de uma vez, com broadcasting do NumPy, para
+# todas as combinações de salário, taxa de contribuição, provisão e variação dos
+# custos fixos, sobre cada um dos últimos meses do histórico (lido do retrato
+# colunar). A resposta traz, por combinação, os percentis entre os meses; a
+# página só recorta essa grade, sem voltar ao servidor a cada ajuste.
+#
+# Os salários seguem uma lognormal (mediana informada, dispersão sigma). Com n
+# dizimistas, a soma dos dízimos tem média n*a e desvio sqrt(n)*b; o número
+# necessário é o menor n com n*a - z*sqrt(n)*b >= despesa, em que z vem do nível
+# de confiança. Com dispersão 0 ou confiança de 50% a conta é a do /financeiro.
+SIMULADOR_MAX_MESES = 36
+SIMULADOR_MAX_CELULAS = 2_000_000   # combinações x meses calculadas por requisição
+PERCENTIS = (50, 90, 100)
+TAXAS_PADRAO = tuple(round(t, 3) for t in np.arange(0.05, 0.1501, 0.01))
+VARIACOES_PADRAO = (-0.3, -0.2, -0.1, 0.0, 0.1, 0.2, 0.3)
+
+
+def parametros_atuais():
+    """(salário médio, provisão) da configuração, com os mesmos padrões do /financeiro."""
+    config = db.session.execute(
+        select(Configuracao.salario_medio, Configuracao.provisao_extras).order_by(Configuracao.id).limit(1)
+    ).first()
+    salario, provisao = config if config else (None, None)
+    return salario or SALARIO_MEDIO_PADRAO, provisao or Dinheiro()
+
+def eixos_padrao(salario, provisao):
+    """Valores de cada eixo da grade (reais), a partir da configuração atual."""
+    base = float(salario)
+    salarios = sorted({round(s / 50) * 50 for s in np.linspace(max(500.0, base * 0.4), base * 2.5, 25)})
+    p = float(provisao)
+    provisoes = sorted({0.0, p / 2, p, p * 1.5, p * 2}) if p else [0.0, 1000.0, 2000.0, 3000.0, 5000.0]
+    return {
+        'salarios': salarios,
+        'taxas': list(TAXAS_PADRAO),
+        'provisoes': provisoes,
+        'variacoes_fixos': list(VARIACOES_PADRAO),
+    }
+
+def meses_anteriores(meses, hoje):
+    """Número (ver mes_numero) do primeiro dos `meses` meses completos antes do mês de `hoje`."""
+    return mes_numero(hoje.year, hoje.month) - meses
+
+def necessarios(despesas, salarios, taxas, dispersao=0.0, confianca=0.5):
+    """Dizimistas necessários para cada despesa e cada (salário, taxa), por broadcasting.
+
+    despesas: array (..., meses) em reais; salarios e taxas: arrays 1-D.
+    Retorna um array (salarios, taxas, ..., meses) de inteiros.
+    """
+    mediana = np.asarray(salarios, dtype=float).reshape(-1, 1)
+    taxas = np.asarray(taxas, dtype=float).reshape(1, -1)
+    media = mediana * math.exp(dispersao ** 2 / 2)
+    desvio = media * math.sqrt(math.exp(dispersao ** 2) - 1)
+    a = (taxas * media).reshape(mediana.shape[0], taxas.shape[1], *([1] * np.ndim(despesas)))
+    b = (taxas * desvio).reshape(a.shape)
+    z = NormalDist().inv_cdf(confianca)
+    d = np.maximum(np.asarray(despesas, dtype=float), 0.0)
+    # Raiz positiva de a*x**2 - z*b*x - d = 0, com x = sqrt(n)
+    x = (z * b + np.sqrt((z * b) ** 2 + 4 * a * d)) / (2 * a)
+    # Tolerância para a conta em float não virar um dizimista a mais quando é exata
+    return np.where(d > 0, np.ceil(np.square(x) - 1e-9), 0).astype(np.int64)
+
+def simular(retrato, hoje, meses=12, salarios=None, taxas=None, provisoes=None, variacoes_fixos=None,
+            dispersao=0.0, confianca=0.5):
+    """Grade completa de cenários sobre os `meses` meses completos antes de `hoje`.
+
+    Valores em reais nas entradas e na saída. "necessarios" tem a forma
+    [salário][taxa][provisão][variação dos fixos][percentil].
+    """
+    t = time.perf_counter()
+    salario_atual, provisao_atual = parametros_atuais()
+    eixos = eixos_padrao(salario_atual, provisao_atual)
+    for nome, valores in (('salarios', salarios), ('taxas', taxas), ('provisoes', provisoes),
+                          ('variacoes_fixos', variacoes_fixos)):
+        if valores:
+            eixos[nome] = sorted(set(valores))
+    if not 1 <= meses <= SIMULADOR_MAX_MESES:
+        raise ValueError(f"meses deve estar entre 1 e {SIMULADOR_MAX_MESES}")
+    if not all(np.isfinite(v).all() for v in eixos.values()):
+        raise ValueError("valores inválidos")
+    if min(eixos['salarios']) <= 0 or min(eixos['taxas']) <= 0:
+        raise ValueError("salários e taxas devem ser maiores que zero")
+    if not 0 <= dispersao <= 2 or not 0.5 <= confianca < 1:
+        raise ValueError("dispersão entre 0 e 2 e confiança entre 0,5 e 1")
+    celulas = meses * math.prod(len(v) for v in eixos.values())
+    if celulas > SIMULADOR_MAX_CELULAS:
+        raise ValueError("combinações demais; reduza os valores de algum eixo")
+
+    primeiro = meses_anteriores(meses, hoje)
+    serie = retrato.serie_mensal(primeiro, meses)
+    saidas, fixos = serie['saidas'] / 100, serie['fixos'] / 100
+    provisoes_ = np.asarray(eixos['provisoes'], dtype=float)
+    variacoes = np.asarray(eixos['variacoes_fixos'], dtype=float)
+    # despesa[provisão, variação, mês] = saídas + fixos * (1 + variação) + provisão
+    despesas = (saidas + fixos * (1 + variacoes[:, None]))[None, :, :] + provisoes_[:, None, None]
+    grade = necessarios(despesas, eixos['salarios'], eixos['taxas'], dispersao, confianca)
+    # method='higher': o percentil é sempre o número de um mês real (inteiro)
+    percentis = np.moveaxis(np.percentile(grade, PERCENTIS, axis=-1, method='higher'), 0, -1)
+
+    nomes_meses = [f"{1970 + (primeiro + i) // 12}-{(primeiro + i) % 12 + 1:02d}" for i in range(meses)]
+    dizimistas = retrato.dizimistas_por_mes(primeiro, meses)
+    return {
+        'meses': nomes_meses,
+        'historico': {
+            'entradas': (serie['entradas'] / 100).tolist(),
+            'saidas': saidas.tolist(),
+            'fixos': fixos.tolist(),
+            'dizimistas': dizimistas.tolist(),
+        },
+        'eixos': eixos,
+        'atual': {'salario': float(salario_atual), 'provisao': float(provisao_atual),
+                  'taxa': float(PERCENTUAL_DIZIMO), 'dizimistas_medio': float(dizimistas.mean()) if meses else 0.0},
+        'dispersao': dispersao,
+        'confianca': confianca,
+        'percentis': list(PERCENTIS),
+        'necessarios': percentis.astype(int).tolist(),
+        'combinacoes': celulas // meses,
+        'tempo_ms': round((time.perf_counter() - t) * 1000, 1),
+    }
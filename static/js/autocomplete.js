@@ -0,0 +1,40 @@
+// Selects de membro com data-autocomplete="<url>": quando a lista de membros é
+// grande, o HTML traz só a opção atual e este script busca o resto por nome.
+document.addEventListener('DOMContentLoaded', () => {
+  document.querySelectorAll('select[data-autocomplete]').forEach((select) => {
+    const url = select.dataset.autocomplete;
+    const busca = document.createElement('input');
+    busca.type = 'search';
+    busca.className = 'form-control form-control-sm mb-1';
+    busca.placeholder = 'Buscar membro pelo nome...';
+    busca.autocomplete = 'off';
+    select.parentNode.insertBefore(busca, select);
+
+    let timer = null;
+    let controle = null;
+    busca.addEventListener('input', () => {
+      clearTimeout(timer);
+      timer = setTimeout(async () => {
+        const termo = busca.value.trim();
+        if (termo.length < 2) return;
+        if (controle) controle.abort();
+        controle = new AbortController();
+        try {
+          const resp = await fetch(`${url}?q=${encodeURIComponent(termo)}`, { signal: controle.signal });
+          if (!resp.ok) return;
+          const membros = await resp.json();
+          // Mantém a opção "nenhum" (primeira) e a selecionada; troca o resto pelos resultados
+          const manter = [select.options[0], select.selectedIndex > 0 ? select.options[select.selectedIndex] : null]
+            .filter(Boolean);
+          const valores = new Set(manter.map((o) => o.value));
+          select.replaceChildren(...manter);
+          membros.filter((m) => !valores.has(String(m.id)))
+            .forEach((m) => select.add(new Option(m.nome, m.id)));
+          if (membros.length && select.selectedIndex <= 0) select.selectedIndex = manter.length;
+        } catch (e) {
+          if (e.name !== 'AbortError') console.error(e);
+        }
+      }, 250);
+    });
+  });
+});
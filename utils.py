@@ -0,0 +1,76 @@
+from datetime import datetime
+from functools import wraps
+from flask import redirect, url_for, flash
+from flask_login import current_user
+from sqlalchemy import String, case, cast, func, select
+from extensions import db
+from models import Transacao, TIPOS_ENTRADA
+
+
+# ================================
+# DECORADORES DE PERMISSÃO
+# ================================
+def admin_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not current_user.is_authenticated or current_user.nivel_acesso != 1:
+            flash("Acesso negado. Apenas Admin.", "danger")
+            return redirect(url_for('secretaria.secretaria'))
+        return f(*args, **kwargs)
+    return decorated
+
+def secretaria_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not current_user.is_authenticated or current_user.nivel_acesso > 2:
+            flash("Acesso negado. Apenas Secretária/Admin.", "danger")
+            return redirect(url_for('secretaria.secretaria'))
+        return f(*args, **kwargs)
+    return decorated
+
+def financeiro_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not current_user.is_authenticated or current_user.nivel_acesso > 3:
+            flash("Acesso negado. Apenas Financeiro ou superior.", "danger")
+            return redirect(url_for('secretaria.secretaria'))
+        return f(*args, **kwargs)
+    return decorated
+
+# ================================
+# FUNÇÕES AUXILIARES
+# ================================
+def intervalo_periodo(mes=None, ano=None):
+    """Converte 'YYYY-MM' ou 'YYYY' em (início, fim exclusivo) para filtrar datas em qualquer banco."""
+    if mes:
+        a, m = map(int, mes.split('-'))
+        inicio = datetime(a, m, 1)
+        fim = datetime(a + 1, 1, 1) if m == 12 else datetime(a, m + 1, 1)
+        return inicio, fim
+    a = int(ano)
+    return datetime(a, 1, 1), datetime(a + 1, 1, 1)
+
+def gerar_dados_grafico():
+    """Saldo (entradas - saídas) de cada um dos últimos 12 meses, numa única consulta."""
+    hoje = datetime.now()
+    periodos = []
+    for i in range(11, -1, -1):
+        a, m = divmod(hoje.year * 12 + hoje.month - 1 - i, 12)
+        periodos.append(intervalo_periodo(mes=f"{a}-{m + 1:02d}"))
+
+    # 'YYYY-MM' do texto da data: funciona igual no SQLite e no PostgreSQL
+    mes = func.substr(cast(Transacao.data, String), 1, 7)
+    saldo = func.sum(case(
+        (Transacao.tipo.in_(TIPOS_ENTRADA), Transacao.valor),
+        (Transacao.tipo == 'despesa', -Transacao.valor),
+        else_=0))
+    por_mes = dict(db.session.execute(
+        select(mes, saldo)
+        .where(Transacao.data >= periodos[0][0], Transacao.data < periodos[-1][1])
+        .group_by(mes)
+    ).all())
+
+    meses = [inicio.strftime('%b') for inicio, _ in periodos]
+    # vai para o Chart.js via tojson
+    saldos = [float(por_mes.get(inicio.strftime('%Y-%m')) or 0) for inicio, _ in periodos]
+    return meses, saldos